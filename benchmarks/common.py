@@ -0,0 +1,70 @@
+# benchmarks/common.py
+import glob
+import os
+import re
+import numpy as np
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """p50/p95/p99 and mean of a list of measurements"""
+    if not values:
+        return {}
+    data = np.asarray(values, dtype=np.float64)
+    return {
+        "mean": float(data.mean()),
+        "p50": float(np.percentile(data, 50)),
+        "p95": float(np.percentile(data, 95)),
+        "p99": float(np.percentile(data, 99)),
+    }
+
+def load_corpus(corpus_dir: str, sample_rate: int = 16000) -> list[tuple[str, np.ndarray]]:
+    """Load every mono WAV file of a directory as float32 samples"""
+    from scipy.io import wavfile
+
+    utterances = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.wav"))):
+        rate, data = wavfile.read(path)
+        if rate != sample_rate:
+            raise ValueError(f"{path}: expected {sample_rate} Hz, got {rate} Hz")
+        if data.ndim > 1:
+            data = data.mean(axis=1)
+        if data.dtype == np.int16:
+            data = data.astype(np.float32) / 32768.0
+        utterances.append((path, data.astype(np.float32, copy=False)))
+    return utterances
+
+def load_references(paths: list[str]) -> list[str]:
+    """Reference transcript of each WAV file, from the .txt file of the same name"""
+    references = []
+    for path in paths:
+        with open(os.path.splitext(path)[0] + ".txt") as f:
+            references.append(f.read().strip())
+    return references
+
+def synthetic_corpus(durations: list[float], sample_rate: int = 16000, seed: int = 0) -> list[tuple[str, np.ndarray]]:
+    """Deterministic noise-plus-tone utterances, for latency runs without a corpus"""
+    rng = np.random.default_rng(seed)
+    utterances = []
+    for duration in durations:
+        t = np.arange(int(duration * sample_rate), dtype=np.float32) / sample_rate
+        audio = 0.1 * np.sin(2 * np.pi * 220 * t) + 0.01 * rng.standard_normal(t.shape[0])
+        utterances.append((f"synthetic_{duration:.1f}s", audio.astype(np.float32)))
+    return utterances
+
+def normalize_words(text: str) -> list[str]:
+    """Lowercase words without punctuation, for scoring transcripts"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_error_rate(references: list[str], hypotheses: list[str]) -> float:
+    """Corpus WER: word edits (substitutions, insertions, deletions) over reference words"""
+    edits = words = 0
+    for reference, hypothesis in zip(references, hypotheses):
+        ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+        # One row of the Levenshtein table at a time
+        row = list(range(len(hyp) + 1))
+        for i, ref_word in enumerate(ref, 1):
+            previous, row[0] = row[0], i
+            for j, hyp_word in enumerate(hyp, 1):
+                previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ref_word != hyp_word))
+        edits += row[-1]
+        words += len(ref)
+    return edits / words if words else 0.0
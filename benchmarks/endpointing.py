@@ -0,0 +1,168 @@
+# benchmarks/endpointing.py
+"""Replay a corpus through the VAD and compare endpointers: average endpoint delay
+against premature-cutoff rate, printed as JSON.
+
+Each turn joins `--sentences` consecutive files with `--pause` seconds of silence, so
+it has pauses inside that an endpointer must not take for the end. The reference end
+of a turn is its last chunk the VAD scores as speech; the delay is the time from there
+to the endpoint, and an endpoint before it is a premature cutoff. Run from the
+repository root:
+    python -m benchmarks.endpointing --corpus DIR [--pause 0.5] [--whisper] [--output report.json]
+
+With --whisper, the utterance so far is transcribed once at the start of every pause
+and the text is given to the endpointers as the partial transcript, as streaming
+transcription would.
+"""
+import argparse
+import json
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from benchmarks.common import load_corpus, percentiles
+from core.endpointing import AdaptiveEndpointer, Endpointer, FixedSilenceEndpointer
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 512
+
+def build_turns(corpus: list[np.ndarray], sentences: int, pause: float) -> list[np.ndarray]:
+    gap = np.zeros(int(pause * SAMPLE_RATE), dtype=np.float32)
+    turns = []
+    for start in range(0, len(corpus), sentences):
+        parts: list[np.ndarray] = []
+        for samples in corpus[start:start + sentences]:
+            if parts:
+                parts.append(gap)
+            parts.append(samples)
+        turns.append(np.concatenate(parts))
+    return turns
+
+def score_turn(vad, samples: np.ndarray, tail_seconds: float) -> tuple[np.ndarray, np.ndarray]:
+    """Chunks of a turn followed by `tail_seconds` of silence, and their speech probabilities"""
+    tail = np.zeros(int(tail_seconds * SAMPLE_RATE), dtype=np.float32)
+    audio = np.concatenate([samples, tail])
+    chunks = audio[:len(audio) // CHUNK_SIZE * CHUNK_SIZE].reshape(-1, CHUNK_SIZE)
+    vad.reset_states()
+    return chunks, vad.speech_probs(chunks, SAMPLE_RATE)
+
+def run_endpointer(endpointer: Endpointer,
+                   chunks: np.ndarray,
+                   probs: np.ndarray,
+                   threshold: float,
+                   transcribe: Optional[Callable[[np.ndarray], str]],
+                   partials: dict[int, str]) -> tuple[Optional[int], Optional[int]]:
+    """(onset chunk, endpoint chunk) of the first utterance, like VoiceAssistant.run"""
+    onset: Optional[int] = None
+    partial: Optional[str] = None
+    for i, (chunk, prob) in enumerate(zip(chunks, probs)):
+        is_speech = bool(prob > threshold)
+        if onset is None:
+            if not is_speech:
+                continue
+            onset = i
+            endpointer.start(SAMPLE_RATE)
+        if is_speech:
+            partial = None
+        elif transcribe is not None and partial is None:
+            # Transcripts are shared by all endpointers: same audio, same text
+            if i not in partials:
+                partials[i] = transcribe(chunks[onset:i].reshape(-1))
+            partial = partials[i]
+        if endpointer.update(chunk, float(prob), is_speech, partial):
+            return onset, i
+    return onset, None
+
+def evaluate(name: str,
+             factory: Callable[[], Endpointer],
+             scored: list[tuple[np.ndarray, np.ndarray]],
+             threshold: float,
+             transcribe: Optional[Callable[[np.ndarray], str]],
+             partials: list[dict[int, str]]) -> dict[str, Any]:
+    chunk_ms = CHUNK_SIZE / SAMPLE_RATE * 1000
+    delays: list[float] = []
+    premature = missed = 0
+    for (chunks, probs), turn_partials in zip(scored, partials):
+        speech = np.flatnonzero(probs > threshold)
+        if len(speech) == 0:
+            continue
+        _, endpoint = run_endpointer(factory(), chunks, probs, threshold, transcribe, turn_partials)
+        if endpoint is None:
+            missed += 1
+        elif endpoint < speech[-1]:
+            premature += 1
+        else:
+            delays.append((endpoint - speech[-1]) * chunk_ms)
+    turns = len(delays) + premature + missed
+    return {
+        "endpointer": name,
+        "turns": turns,
+        "premature_cutoff_rate": premature / turns if turns else 0.0,
+        "missed": missed,
+        "endpoint_delay_ms": percentiles(delays),
+    }
+
+def candidates(args: argparse.Namespace) -> list[tuple[str, Callable[[], Endpointer]]]:
+    configs: list[tuple[str, Callable[[], Endpointer]]] = [
+        (f"fixed_{seconds:.1f}s", lambda seconds=seconds: FixedSilenceEndpointer(seconds))
+        for seconds in args.fixed
+    ]
+    for bounds in args.adaptive:
+        low, high = (float(v) for v in bounds.split(":"))
+        configs.append((
+            f"adaptive_{low:.1f}-{high:.1f}s",
+            lambda low=low, high=high: AdaptiveEndpointer(low, high, threshold=args.threshold)
+        ))
+    return configs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", required=True, help="directory of 16 kHz mono WAV files")
+    parser.add_argument("--sentences", type=int, default=2, help="files joined into one turn")
+    parser.add_argument("--pause", type=float, default=0.5, help="seconds of silence between joined files")
+    parser.add_argument("--vad", choices=["torch", "onnx"], default="onnx")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--fixed", type=float, nargs="*", default=[0.3, 0.5, 0.7, 1.0],
+                        help="fixed silence timeouts to compare, in seconds")
+    parser.add_argument("--adaptive", nargs="*", default=["0.3:1.0", "0.2:0.8", "0.4:1.2"],
+                        help="adaptive endpointer bounds as MIN:MAX seconds")
+    parser.add_argument("--whisper", action="store_true", help="give partial transcripts to the endpointers")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    corpus = [samples for _, samples in load_corpus(args.corpus, SAMPLE_RATE)]
+    if not corpus:
+        raise SystemExit(f"No .wav files in {args.corpus}")
+
+    if args.vad == "onnx":
+        from providers.vad.silero_onnx_provider import SileroOnnxVAD
+        vad = SileroOnnxVAD(threshold=args.threshold)
+    else:
+        from providers.vad.silero_provider import SileroVAD
+        vad = SileroVAD(threshold=args.threshold)
+
+    transcribe: Optional[Callable[[np.ndarray], str]] = None
+    if args.whisper:
+        from providers.transcription.whisper_provider import WhisperProvider
+        transcribe = WhisperProvider(language="en").transcribe
+
+    # Longest silence any endpointer may wait for, plus a margin
+    tail = max(args.fixed + [float(b.split(":")[1]) for b in args.adaptive]) + 0.5
+    scored = [score_turn(vad, samples, tail) for samples in build_turns(corpus, args.sentences, args.pause)]
+    partials: list[dict[int, str]] = [{} for _ in scored]
+
+    report = {
+        "turns": len(scored),
+        "pause_seconds": args.pause,
+        "results": [
+            evaluate(name, factory, scored, args.threshold, transcribe, partials)
+            for name, factory in candidates(args)
+        ],
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
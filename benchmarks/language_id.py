@@ -0,0 +1,85 @@
+# benchmarks/language_id.py
+"""Latency overhead and accuracy of per-utterance language detection, printed as JSON.
+
+Every utterance is transcribed twice: with its language fixed, as a single-language
+instance does, and with language=None through transcribe_with_language(), which reads
+the language from Whisper's language token. The corpus has one subdirectory of 16 kHz
+mono WAV files per language code (e.g. en/, it/). Run from the repository root:
+    python -m benchmarks.language_id --corpus DIR [--whisper-model base] [--output report.json]
+
+`routed_accuracy` counts the utterances that would be answered with the right
+LANGUAGE_CONFIGS entry; a detected language without an entry keeps the current one, and
+counts as wrong here.
+"""
+import argparse
+import collections
+import json
+import os
+from time import perf_counter
+
+from benchmarks.common import load_corpus, percentiles
+from config.language_config import LANGUAGE_CONFIGS
+
+SAMPLE_RATE = 16000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", required=True, help="directory with one subdirectory of WAV files per language")
+    parser.add_argument("--whisper-model", default="base", help="Whisper model size (multilingual)")
+    parser.add_argument("--device", default="auto")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    corpus = []
+    for language in sorted(os.listdir(args.corpus)):
+        if os.path.isdir(os.path.join(args.corpus, language)):
+            corpus.extend((language, samples) for _, samples in load_corpus(os.path.join(args.corpus, language), SAMPLE_RATE))
+    if not corpus:
+        raise SystemExit(f"No language subdirectories with .wav files in {args.corpus}")
+
+    from providers.transcription.whisper_provider import WhisperProvider
+    model = f"openai/whisper-{args.whisper_model}"
+    fixed = {
+        language: WhisperProvider(language=language, device=args.device, model=model)
+        for language in sorted({language for language, _ in corpus})
+    }
+    detecting = WhisperProvider(language=None, device=args.device, model=model)
+    for provider in [*fixed.values(), detecting]:
+        provider.warmup()
+
+    fixed_ms, auto_ms, overhead_ms = [], [], []
+    confusion: dict[str, collections.Counter] = collections.defaultdict(collections.Counter)
+    correct = routed = 0
+    for language, samples in corpus:
+        start = perf_counter()
+        fixed[language].transcribe(samples)
+        fixed_time = perf_counter() - start
+
+        start = perf_counter()
+        _, detected = detecting.transcribe_with_language(samples)
+        auto_time = perf_counter() - start
+
+        fixed_ms.append(fixed_time * 1000)
+        auto_ms.append(auto_time * 1000)
+        overhead_ms.append((auto_time - fixed_time) * 1000)
+        confusion[language][detected or "none"] += 1
+        correct += detected == language
+        routed += detected == language and detected in LANGUAGE_CONFIGS
+
+    report = {
+        "utterances": len(corpus),
+        "fixed_language_ms": percentiles(fixed_ms),
+        "detected_language_ms": percentiles(auto_ms),
+        "detection_overhead_ms": percentiles(overhead_ms),
+        "detection_accuracy": correct / len(corpus),
+        "routed_accuracy": routed / len(corpus),
+        "confusion": {language: dict(counts) for language, counts in confusion.items()},
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
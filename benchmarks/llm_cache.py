@@ -0,0 +1,72 @@
+# benchmarks/llm_cache.py
+"""Hit rate and latency saved by CachedLLM on a voice-style query mix.
+
+Queries are drawn from a Zipf distribution over short requests (with transcription
+variants in case and punctuation), mixed with follow-ups that must bypass the cache.
+Uses Ollama by default, or StubLLM with `--stub`. Run from the repository root:
+    python -m benchmarks.llm_cache [--queries 300] [--stub] [--embeddings nomic-embed-text]
+"""
+import argparse
+import json
+import random
+from time import perf_counter
+
+from benchmarks.common import percentiles
+from config.language_config import LANGUAGE_CONFIGS
+from providers.llm.cached_provider import CachedLLM, ResponseCache, ollama_embedder
+
+COMMON = [
+    "What time is it?", "Hello!", "Good morning.", "What's the weather like?",
+    "Tell me a joke.", "How are you?", "Thank you.", "What day is it today?",
+    "Set a timer for five minutes.", "What can you do?", "Good night.",
+    "How do I make an espresso?", "Who wrote the Divine Comedy?",
+]
+FOLLOWUPS = ["Repeat that.", "Why?", "Tell me more about that.", "And what about my appointment?"]
+
+def variants(query: str, rng: random.Random) -> str:
+    """What Whisper might return for the same words"""
+    text = query.lower() if rng.random() < 0.3 else query
+    return text.rstrip(".!?") if rng.random() < 0.3 else text
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--followup-share", type=float, default=0.15)
+    parser.add_argument("--stub", action="store_true", help="use StubLLM instead of Ollama")
+    parser.add_argument("--embeddings", metavar="MODEL", help="Ollama embedding model for similarity matching")
+    args = parser.parse_args()
+
+    if args.stub:
+        from providers.llm.stub_provider import StubLLM
+        llm = StubLLM()
+    else:
+        from providers.llm.ollama_provider import OllamaLLM
+        llm = OllamaLLM()
+    embed = ollama_embedder(args.embeddings) if args.embeddings else None
+    cached = CachedLLM(llm, ResponseCache(embed=embed))
+
+    rng = random.Random(0)
+    weights = [1 / (rank + 1) for rank in range(len(COMMON))]
+    system_prompt = LANGUAGE_CONFIGS["en"].llm_system_prompt
+    latencies: dict[str, list[float]] = {"cached": [], "llm": []}
+    for _ in range(args.queries):
+        if rng.random() < args.followup_share:
+            query = rng.choice(FOLLOWUPS)
+        else:
+            query = variants(rng.choices(COMMON, weights)[0], rng)
+        hits_before = cached.cache.stats["exact_hits"] + cached.cache.stats["semantic_hits"]
+        start = perf_counter()
+        cached.get_response(query, system_prompt)
+        elapsed = (perf_counter() - start) * 1000
+        hits = cached.cache.stats["exact_hits"] + cached.cache.stats["semantic_hits"]
+        latencies["cached" if hits > hits_before else "llm"].append(elapsed)
+
+    print(json.dumps({
+        "queries": args.queries,
+        "hit_rate": cached.cache.hit_rate,
+        "stats": cached.cache.stats,
+        "latency_ms": {name: percentiles(values) for name, values in latencies.items()},
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
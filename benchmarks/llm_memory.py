@@ -0,0 +1,70 @@
+# benchmarks/llm_memory.py
+"""Prompt size and prompt-eval latency over a long conversation with OllamaLLM.
+
+Runs `--turns` scripted user turns against a local Ollama server and prints, per block
+of turns, the mean prompt tokens, Ollama's prompt_eval_count and prompt-eval time and
+the time to first token. With a bounded memory these stay flat; `--budget 0` disables
+the budget (everything is kept verbatim) for comparison. Run from the repository root:
+    python -m benchmarks.llm_memory [--turns 120] [--budget 1024] [--model llama2]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import percentiles
+from config.language_config import LANGUAGE_CONFIGS
+from providers.llm.ollama_provider import OllamaLLM
+
+QUESTIONS = [
+    "My name is Anna and I live in Palermo. What's a good weekend trip from here?",
+    "How long would it take by train?",
+    "Remind me to buy coffee tomorrow morning.",
+    "What's the difference between espresso and ristretto?",
+    "Can you suggest a quick dinner with pasta and zucchini?",
+    "What did I say my name was?",
+    "Give me a fun fact about octopuses.",
+    "How do I say good evening in Spanish?",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=120)
+    parser.add_argument("--budget", type=int, default=1024, help="history token budget, 0 for unbounded")
+    parser.add_argument("--recent-turns", type=int, default=4)
+    parser.add_argument("--block", type=int, default=20, help="turns per reported block")
+    parser.add_argument("--model", default="llama2")
+    parser.add_argument("--output", help="write the per-turn stats as JSON lines to this file")
+    args = parser.parse_args()
+
+    llm = OllamaLLM(
+        model_name=args.model,
+        max_history_tokens=args.budget or 10 ** 9,
+        recent_turns=args.recent_turns
+    )
+    system_prompt = LANGUAGE_CONFIGS["en"].llm_system_prompt
+    for i in range(args.turns):
+        for _ in llm.stream_response(QUESTIONS[i % len(QUESTIONS)], system_prompt):
+            pass
+        # Leave the summarizer time to run, as the user listening to the reply would
+        time.sleep(0.5)
+
+    stats = list(llm.prompt_stats)
+    if args.output:
+        with open(args.output, "w") as f:
+            for record in stats:
+                f.write(json.dumps(record) + "\n")
+
+    blocks = []
+    for start in range(0, len(stats), args.block):
+        block = stats[start:start + args.block]
+        blocks.append({
+            "turns": f"{block[0]['turn']}-{block[-1]['turn']}",
+            **{
+                name: percentiles([r[name] for r in block if r[name] is not None])
+                for name in ("prompt_tokens", "prompt_eval_count", "prompt_eval_ms", "first_token_ms")
+            },
+        })
+    print(json.dumps({"budget": args.budget, "blocks": blocks}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# benchmarks/load_test.py
+"""Load test for the assistant server: N concurrent speakers streaming WAV files in
+real time, with per-session and overall latency percentiles printed as JSON.
+
+Start the server first (e.g. `python server.py --llm stub --tts stub`), then from the
+repository root:
+    python -m benchmarks.load_test --corpus DIR --sessions 8 [--utterances 3]
+
+`first_audio_ms` is measured by the client, from the last sample of an utterance to
+the first reply audio received, so it includes endpointing; the other stages come
+from the traces the server sends at the end of each turn.
+"""
+import argparse
+import asyncio
+import json
+from time import perf_counter
+from typing import Any, Optional
+
+import numpy as np
+
+from benchmarks.common import load_corpus, percentiles
+from core.protocol import AUDIO, BYE, EVENT, HELLO, encode_frame, encode_json, read_frame
+
+SAMPLE_RATE = 16000
+SERVER_STAGES = ("transcription_ms", "llm_first_token_ms", "tts_first_audio_ms", "end_to_end_ms", "total_ms")
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+class Speaker:
+    """One simulated user: streams utterances separated by silence and times the replies"""
+
+    def __init__(self, index: int, utterances: list[np.ndarray], args: argparse.Namespace):
+        self.index = index
+        self.utterances = utterances
+        self.args = args
+        self.utterance_ends: list[float] = []
+        self.first_audio: list[Optional[float]] = []
+        self.traces: list[dict[str, Any]] = []
+        self.audio_bytes = 0
+        self.error: Optional[str] = None
+
+    async def _receive(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                kind, payload = await read_frame(reader)
+                now = perf_counter()
+                if kind == AUDIO:
+                    self.audio_bytes += len(payload)
+                    # Reply audio belongs to the last utterance that has ended
+                    if self.first_audio and self.first_audio[-1] is None:
+                        self.first_audio[-1] = now
+                elif kind == EVENT:
+                    event = json.loads(payload)
+                    if event["type"] == "turn":
+                        self.traces.append(event)
+                    elif event["type"] == "error":
+                        self.error = event["message"]
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def _stream(self, writer: asyncio.StreamWriter, samples: np.ndarray, chunk_size: int) -> None:
+        """Send samples paced in real time"""
+        start = perf_counter()
+        for offset in range(0, len(samples), chunk_size):
+            chunk = samples[offset:offset + chunk_size]
+            writer.write(encode_frame(AUDIO, to_pcm16(chunk)))
+            await writer.drain()
+            delay = start + (offset + len(chunk)) / SAMPLE_RATE - perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def run(self) -> None:
+        await asyncio.sleep(self.index * self.args.stagger)
+        reader, writer = await asyncio.open_connection(self.args.host, self.args.port)
+        writer.write(encode_json(HELLO, language=self.args.language, sample_rate=SAMPLE_RATE))
+        await writer.drain()
+        kind, payload = await read_frame(reader)
+        ready = json.loads(payload)
+        if kind != EVENT or ready.get("type") != "ready":
+            self.error = ready.get("message", "no ready event")
+            writer.close()
+            return
+
+        chunk_size = ready["chunk_size"]
+        silence = np.zeros(int(self.args.gap * SAMPLE_RATE), dtype=np.float32)
+        receiver = asyncio.create_task(self._receive(reader))
+        try:
+            for samples in self.utterances:
+                await self._stream(writer, samples, chunk_size)
+                self.utterance_ends.append(perf_counter())
+                self.first_audio.append(None)
+                await self._stream(writer, silence, chunk_size)
+
+            # Keep the line open with silence until the last reply is complete
+            deadline = perf_counter() + self.args.drain_timeout
+            tail = np.zeros(chunk_size, dtype=np.float32)
+            while len(self.traces) < len(self.utterances) and perf_counter() < deadline:
+                await self._stream(writer, tail, chunk_size)
+
+            writer.write(encode_frame(BYE))
+            await writer.drain()
+        except ConnectionError as e:
+            self.error = str(e)
+        finally:
+            writer.close()
+            receiver.cancel()
+
+    def report(self) -> dict[str, Any]:
+        first_audio_ms = [
+            (audio - end) * 1000
+            for end, audio in zip(self.utterance_ends, self.first_audio) if audio is not None
+        ]
+        report: dict[str, Any] = {
+            "session": self.index,
+            "utterances": len(self.utterances),
+            "completed_turns": len(self.traces),
+            "audio_seconds_received": self.audio_bytes / 2 / SAMPLE_RATE,
+            "first_audio_ms": percentiles(first_audio_ms),
+        }
+        for stage in SERVER_STAGES:
+            report[stage] = percentiles([t[stage] for t in self.traces if t.get(stage) is not None])
+        if self.error:
+            report["error"] = self.error
+        return report
+
+async def run_load(args: argparse.Namespace, corpus: list[np.ndarray]) -> dict[str, Any]:
+    speakers = [
+        # Every speaker starts at a different file, so they don't say the same thing at once
+        Speaker(i, [corpus[(i + n) % len(corpus)] for n in range(args.utterances)], args)
+        for i in range(args.sessions)
+    ]
+    start = perf_counter()
+    await asyncio.gather(*(speaker.run() for speaker in speakers))
+    sessions = [speaker.report() for speaker in speakers]
+
+    overall: dict[str, Any] = {
+        "sessions": args.sessions,
+        "failed_sessions": sum(1 for s in sessions if "error" in s),
+        "utterances": sum(s["utterances"] for s in sessions),
+        "completed_turns": sum(s["completed_turns"] for s in sessions),
+        "wall_seconds": perf_counter() - start,
+        "first_audio_ms": percentiles([
+            (audio - end) * 1000
+            for speaker in speakers
+            for end, audio in zip(speaker.utterance_ends, speaker.first_audio) if audio is not None
+        ]),
+    }
+    for stage in SERVER_STAGES:
+        overall[stage] = percentiles([
+            t[stage] for speaker in speakers for t in speaker.traces if t.get(stage) is not None
+        ])
+    return {"overall": overall, "sessions": sessions}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", required=True, help="directory of 16 kHz mono WAV files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--utterances", type=int, default=3, help="utterances per session")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--gap", type=float, default=4.0, help="seconds of silence after each utterance")
+    parser.add_argument("--stagger", type=float, default=0.25, help="seconds between session starts")
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    corpus = [samples for _, samples in load_corpus(args.corpus, SAMPLE_RATE)]
+    if not corpus:
+        raise SystemExit(f"No .wav files in {args.corpus}")
+
+    output = json.dumps(asyncio.run(run_load(args, corpus)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/long_form.py
+"""Latency and word error rate of long recordings: one Whisper call on the whole
+buffer (today's path) against LongFormTranscriber with VAD pause cuts and with fixed
+overlapping windows, printed as JSON.
+
+Recordings of `--minutes` minutes are built by joining consecutive corpus files with
+`--pause` seconds of silence; the corpus is a directory of 16 kHz mono WAV files, each
+with its reference transcript in a .txt file of the same name. Run from the
+repository root:
+    python -m benchmarks.long_form --corpus DIR [--minutes 1 3 5] [--workers 1] [--output report.json]
+"""
+import argparse
+import json
+from time import perf_counter
+from typing import Any
+
+import numpy as np
+
+from benchmarks.common import load_corpus, load_references, percentiles, word_error_rate
+from core.long_form import LongFormTranscriber
+
+SAMPLE_RATE = 16000
+
+def build_recordings(corpus: list[tuple[np.ndarray, str]], minutes: float,
+                     pause: float) -> list[tuple[np.ndarray, str]]:
+    """Consecutive files joined until each recording is `minutes` long; the corpus is
+    reused from the start if it is too short"""
+    gap = np.zeros(int(pause * SAMPLE_RATE), dtype=np.float32)
+    target = int(minutes * 60 * SAMPLE_RATE)
+    recordings = []
+    i = 0
+    # One recording per pass over the corpus, at least one
+    for _ in range(max(sum(len(samples) for samples, _ in corpus) // target, 1)):
+        parts: list[np.ndarray] = []
+        texts: list[str] = []
+        length = 0
+        while length < target:
+            samples, text = corpus[i % len(corpus)]
+            i += 1
+            parts.extend([samples, gap])
+            texts.append(text)
+            length += len(samples) + len(gap)
+        recordings.append((np.concatenate(parts), " ".join(texts)))
+    return recordings
+
+def evaluate(name: str, transcribe, recordings: list[tuple[np.ndarray, str]]) -> dict[str, Any]:
+    latencies = []
+    hypotheses = []
+    for audio, _ in recordings:
+        start = perf_counter()
+        hypotheses.append(transcribe(audio))
+        latencies.append(perf_counter() - start)
+    audio_seconds = sum(len(audio) for audio, _ in recordings) / SAMPLE_RATE
+    return {
+        "name": name,
+        "latency_seconds": percentiles(latencies),
+        "real_time_factor": sum(latencies) / audio_seconds,
+        "wer": word_error_rate([text for _, text in recordings], hypotheses),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", required=True, help="directory of 16 kHz WAV files with .txt references")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 3, 5], help="recording lengths")
+    parser.add_argument("--pause", type=float, default=0.6, help="seconds of silence between joined files")
+    parser.add_argument("--overlap", type=float, default=2.0, help="overlap of fixed windows, in seconds")
+    parser.add_argument("--batch-size", type=int, default=8, help="windows per transcribe_batch call")
+    parser.add_argument("--workers", type=int, default=1, help="decode windows on a thread pool instead")
+    parser.add_argument("--vad", choices=["torch", "onnx"], default="onnx")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    files = load_corpus(args.corpus, SAMPLE_RATE)
+    if not files:
+        raise SystemExit(f"No .wav files in {args.corpus}")
+    corpus = list(zip((samples for _, samples in files), load_references([path for path, _ in files])))
+
+    from providers.transcription.whisper_provider import WhisperProvider
+    if args.vad == "onnx":
+        from providers.vad.silero_onnx_provider import SileroOnnxVAD
+        vad = SileroOnnxVAD()
+    else:
+        from providers.vad.silero_provider import SileroVAD
+        vad = SileroVAD()
+    whisper = WhisperProvider(language="en")
+    whisper.warmup()
+
+    options = {"overlap_seconds": args.overlap, "batch_size": args.batch_size, "workers": args.workers}
+    paths = {
+        "single_call": whisper.transcribe,
+        "vad_pauses": LongFormTranscriber(whisper, vad=vad, **options).transcribe,
+        "fixed_windows": LongFormTranscriber(whisper, **options).transcribe,
+    }
+
+    report = {"results": []}
+    for minutes in args.minutes:
+        recordings = build_recordings(corpus, minutes, args.pause)
+        report["results"].append({
+            "minutes": minutes,
+            "recordings": len(recordings),
+            "paths": [evaluate(name, transcribe, recordings) for name, transcribe in paths.items()],
+        })
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
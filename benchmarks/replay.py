@@ -0,0 +1,134 @@
+# benchmarks/replay.py
+"""Replay a corpus of utterances through the real VoiceAssistant run loop and report
+per-stage and end-to-end latency percentiles, real-time factor and dropped chunks as JSON.
+
+Audio comes from FileAudioProvider, VAD and Whisper are real, LLM and TTS are the
+deterministic stubs. Run from the repository root:
+    python -m benchmarks.replay --corpus DIR [--fast] [--vad onnx] [--output report.json]
+
+In --fast mode audio is not paced by a clock, so latencies measured from the end of an
+utterance are not meaningful; use it for throughput and real-time factor.
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+from time import perf_counter
+
+from benchmarks.common import percentiles
+from core.assistant import VoiceAssistant, LogLevel
+from core.turn import Turn
+from providers.audio.file_provider import FileAudioProvider
+from providers.filter.speech_filter import SpeechFilter
+from providers.llm.stub_provider import StubLLM
+from providers.tts.stub_provider import StubTTS
+from providers.transcription.whisper_provider import WhisperProvider
+
+def build_vad(name: str):
+    if name == "onnx":
+        from providers.vad.silero_onnx_provider import SileroOnnxVAD
+        return SileroOnnxVAD()
+    from providers.vad.silero_provider import SileroVAD
+    return SileroVAD()
+
+def stage_latencies(turns: list[Turn], audio: FileAudioProvider) -> dict[str, dict[str, float]]:
+    """Per-stage latencies in ms; each turn is matched to the last file that ended before it"""
+    stages: dict[str, list[float]] = {
+        "endpoint": [], "transcription": [], "llm_first_token": [],
+        "tts_first_audio": [], "end_to_end": [], "turn_total": []
+    }
+    asr_rtf = []
+    ends = audio.utterance_end_times
+    for turn in turns:
+        earlier = [(t, i) for i, t in enumerate(ends) if t <= turn.speech_end]
+        if not earlier or turn.transcribed is None or turn.first_token is None or turn.first_audio is None:
+            continue
+        utterance_end, index = earlier[-1]
+        start, end, _ = audio.utterances[index]
+        stages["endpoint"].append((turn.speech_end - utterance_end) * 1000)
+        stages["transcription"].append((turn.transcribed - turn.speech_end) * 1000)
+        stages["llm_first_token"].append((turn.first_token - turn.transcribed) * 1000)
+        stages["tts_first_audio"].append((turn.first_audio - turn.first_token) * 1000)
+        stages["end_to_end"].append((turn.first_audio - utterance_end) * 1000)
+        if turn.completed is not None:
+            stages["turn_total"].append((turn.completed - utterance_end) * 1000)
+        asr_rtf.append((turn.transcribed - turn.speech_end) / ((end - start) / audio.sample_rate))
+
+    report = {name: percentiles(values) for name, values in stages.items()}
+    report["asr_real_time_factor"] = percentiles(asr_rtf)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", required=True, help="directory of 16 kHz WAV or .raw int16 files")
+    parser.add_argument("--fast", action="store_true", help="replay as fast as possible")
+    parser.add_argument("--vad", choices=["torch", "onnx"], default="onnx")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--gap", type=float, default=2.0, help="seconds of silence between utterances")
+    parser.add_argument("--llm-first-token", type=float, default=0.3)
+    parser.add_argument("--llm-token-delay", type=float, default=0.02)
+    parser.add_argument("--tts-delay", type=float, default=0.1)
+    parser.add_argument("--drain-timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.corpus, "*.wav")) +
+                   glob.glob(os.path.join(args.corpus, "*.raw")))
+    if not paths:
+        raise SystemExit(f"No .wav or .raw files in {args.corpus}")
+
+    audio = FileAudioProvider(paths, realtime=not args.fast, gap_seconds=args.gap)
+    turns: list[Turn] = []
+    done = threading.Event()
+
+    def on_turn_complete(turn: Turn) -> None:
+        turns.append(turn)
+        if len(turns) >= len(paths):
+            done.set()
+
+    assistant = VoiceAssistant(
+        audio_provider=audio,
+        vad_provider=build_vad(args.vad),
+        transcription_provider=WhisperProvider(language="en", device=args.device),
+        llm_provider=StubLLM(first_token_delay=args.llm_first_token, token_delay=args.llm_token_delay),
+        text_filter_provider=SpeechFilter(),
+        tts_provider=StubTTS(synthesis_delay=args.tts_delay),
+        language="en",
+        log_level=LogLevel.WARNING,
+        # Fast replay outruns the pipeline: queue everything instead of dropping
+        queue_size=len(paths) if args.fast else 2,
+        barge_in=False,
+        on_turn_complete=on_turn_complete
+    )
+
+    runner = threading.Thread(target=assistant.run, name="assistant")
+    start = perf_counter()
+    runner.start()
+    audio.finished.wait()
+    replay_seconds = perf_counter() - start
+    done.wait(timeout=args.drain_timeout)
+    wall_seconds = perf_counter() - start
+    assistant.is_running = False
+    runner.join()
+
+    audio_seconds = audio.total_samples / audio.sample_rate
+    report = {
+        "utterances": len(paths),
+        "completed_turns": len(turns),
+        "audio_seconds": audio_seconds,
+        "wall_seconds": wall_seconds,
+        "real_time_factor": wall_seconds / audio_seconds,
+        "capture_real_time_factor": replay_seconds / audio_seconds,
+        "dropped_chunks": audio.dropped_chunks,
+        "dropped_utterances": assistant.stats["dropped_utterances"],
+        "latency_ms": stage_latencies(turns, audio),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/residency.py
+"""Memory given back by unloading a model and the latency of reloading it, printed as JSON.
+
+Each model is loaded through a ModelResidencyManager, then unloaded and reloaded (with
+its warmup) `--cycles` times. The process RSS is read before the first load, after each
+load and after each unload; the first utterance after a reload is timed against one on
+the model that was already loaded. Run from the repository root:
+    python -m benchmarks.residency [--models whisper,silero] [--whisper-model base] [--output report.json]
+
+Every model runs in its own process, so one model's allocations don't blur another's
+RSS. `rss_kept_mb` is what unloading did not give back to the OS (allocator caches,
+imported modules).
+"""
+import argparse
+import json
+import subprocess
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from benchmarks.common import percentiles
+
+SAMPLE_RATE = 16000
+
+def build(model: str, whisper_model: str):
+    if model == "whisper":
+        from providers.transcription.whisper_provider import WhisperProvider
+        return WhisperProvider(model=f"openai/whisper-{whisper_model}")
+    if model == "silero":
+        from providers.vad.silero_provider import SileroVAD
+        return SileroVAD()
+    from providers.vad.silero_onnx_provider import SileroOnnxVAD
+    return SileroOnnxVAD()
+
+def run(model: str, whisper_model: str, cycles: int) -> dict:
+    from core.residency import MB, ModelResidencyManager, process_rss_bytes
+    if model == "whisper":
+        audio = np.random.default_rng(0).normal(0, 0.05, 3 * SAMPLE_RATE).astype(np.float32)
+        call = lambda m: m.transcribe(audio)
+    else:
+        audio = np.zeros((32, 512), dtype=np.float32)
+        call = lambda m: m.speech_probs(audio, SAMPLE_RATE)
+
+    manager = ModelResidencyManager(idle_seconds=0)
+    baseline = process_rss_bytes()
+    manager.register(model, lambda: build(model, whisper_model))
+    with manager.use(model) as loaded:
+        loaded.warmup()
+        call(loaded)
+    footprint = manager.stats["models"][model]["footprint_mb"]
+
+    loaded_mb, unloaded_mb, reload_s, first_call_ms, warm_call_ms = [], [], [], [], []
+    for _ in range(cycles):
+        loaded_mb.append((process_rss_bytes() - baseline) / MB)
+        with manager.use(model) as loaded:
+            start = perf_counter()
+            call(loaded)
+            warm_call_ms.append((perf_counter() - start) * 1000)
+        manager.unload(model)
+        unloaded_mb.append((process_rss_bytes() - baseline) / MB)
+
+        # use() reloads the model and warms it up
+        with manager.use(model) as loaded:
+            reload_s.append(manager.stats["models"][model]["last_reload_seconds"])
+            start = perf_counter()
+            call(loaded)
+            first_call_ms.append((perf_counter() - start) * 1000)
+    manager.close()
+
+    return {
+        "footprint_mb": footprint,
+        "rss_loaded_mb": percentiles(loaded_mb),
+        "rss_kept_mb": percentiles(unloaded_mb),
+        "reload_seconds": percentiles(reload_s),
+        "first_call_after_reload_ms": percentiles(first_call_ms),
+        "warm_call_ms": percentiles(warm_call_ms),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", default="whisper,silero", help="comma separated: whisper, silero, silero-onnx")
+    parser.add_argument("--whisper-model", default="base")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run(args.worker, args.whisper_model, args.cycles)))
+        return
+
+    report = {}
+    for model in args.models.split(","):
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.residency", "--worker", model,
+             "--whisper-model", args.whisper_model, "--cycles", str(args.cycles)],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            report[model] = {"error": result.stderr.strip().splitlines()[-1:]}
+        else:
+            report[model] = json.loads(result.stdout.strip().splitlines()[-1])
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
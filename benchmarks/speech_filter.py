@@ -0,0 +1,134 @@
+# benchmarks/speech_filter.py
+"""Microbenchmark of SpeechFilter on long LLM outputs, with an equivalence check
+against the previous multi-pass implementation.
+
+The check covers a corpus of LLM-like replies plus random strings built from the
+characters the patterns care about, filtered both in one call and in streaming mode
+with random chunk boundaries. Run from the repository root:
+    python -m benchmarks.speech_filter [--fuzz 200000]
+"""
+import argparse
+import json
+import random
+import re
+from timeit import timeit
+
+from providers.filter.speech_filter import SpeechFilter
+
+LEGACY_PATTERNS = [
+    r'[\U00010000-\U0010ffff]',
+    r'[:;=]-?[)(/\\|dpDP]',
+    r'[xX]-?[dD]',
+    r':[oO]',
+    r'\^[_-]?\^',
+    r'>?[_-]?<',
+    r'[oO][._][oO]',
+    r'\*[^*]+\*',
+    r':[a-zA-Z_]+:',
+    r'<3',
+    r'</3',
+    r'\(y\)',
+    r'\(n\)',
+    r'\s+'
+]
+
+def legacy_filter(text: str) -> str:
+    """The previous SpeechFilter.filter(): one re.sub per pattern"""
+    for pattern in LEGACY_PATTERNS:
+        text = re.sub(pattern, ' ', text)
+    text = ' '.join(text.split())
+    return text.strip()
+
+SENTENCES = [
+    "Sure! Here's what I found about your question :)",
+    "*smiles warmly* That's a great idea, let's do it :thumbs_up:",
+    "The meeting is at 3.30 pm, don't forget it ;-) 😀",
+    "Honestly? I think xD it depends on the context ^_^ and the timing.",
+    "Wow :O that's surprising... o.O I didn't expect that <3",
+    "Let me think about it (y) - first, check the settings; then restart.",
+    "*nods* Okay. Here is a list: apples, pears, oranges >_< and grapes.",
+    "Ciao! Come stai? Spero tutto bene :D a presto 👋",
+]
+
+def llm_corpus(n_replies: int, sentences_per_reply: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(SENTENCES) for _ in range(sentences_per_reply))
+        for _ in range(n_replies)
+    ]
+
+FUZZ_ALPHABET = list(":;=-)(/\\|dpDPxXoO^_<>.*3yn abc\n") + ["😀", "é"]
+
+def fuzz_strings(count: int, max_length: int = 24, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(0, max_length)))
+        for _ in range(count)
+    ]
+
+def stream_filter(speech_filter: SpeechFilter, text: str, rng: random.Random) -> str:
+    stream = speech_filter.begin_stream()
+    out = []
+    i = 0
+    while i < len(text):
+        step = rng.randint(1, 6)
+        out.append(stream.feed(text[i:i + step]))
+        i += step
+    out.append(stream.flush())
+    return "".join(out)
+
+def check_equivalence(speech_filter: SpeechFilter, texts: list[str]) -> int:
+    """Return the number of texts checked; raise on the first mismatch"""
+    rng = random.Random(2)
+    for text in texts:
+        expected = legacy_filter(text)
+        for name, actual in (("filter", speech_filter.filter(text)),
+                             ("stream", stream_filter(speech_filter, text, rng))):
+            if actual != expected:
+                raise AssertionError(f"{name} mismatch for {text!r}: {actual!r} != {expected!r}")
+    return len(texts)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fuzz", type=int, default=200000, help="random strings to check")
+    parser.add_argument("--sentences", type=int, default=200, help="sentences per long reply")
+    args = parser.parse_args()
+
+    speech_filter = SpeechFilter()
+    checked = check_equivalence(speech_filter, llm_corpus(200, 12) + fuzz_strings(args.fuzz))
+
+    long_reply = llm_corpus(1, args.sentences)[0]
+    tokens = re.findall(r'\S+\s*', long_reply)
+    runs = 20
+    legacy_ms = timeit(lambda: legacy_filter(long_reply), number=runs) / runs * 1000
+    filter_ms = timeit(lambda: speech_filter.filter(long_reply), number=runs) / runs * 1000
+
+    def legacy_per_sentence():
+        # What streaming cost before: the whole pattern list once per sentence
+        for sentence in re.split(r'(?<=[.!?])\s+', long_reply):
+            legacy_filter(sentence)
+
+    def incremental():
+        stream = speech_filter.begin_stream()
+        for token in tokens:
+            stream.feed(token)
+        stream.flush()
+
+    legacy_stream_ms = timeit(legacy_per_sentence, number=runs) / runs * 1000
+    stream_ms = timeit(incremental, number=runs) / runs * 1000
+
+    print(json.dumps({
+        "equivalence_checked": checked,
+        "reply_chars": len(long_reply),
+        "reply_tokens": len(tokens),
+        "ms_per_reply": {
+            "legacy_filter": legacy_ms,
+            "filter": filter_ms,
+            "legacy_per_sentence": legacy_stream_ms,
+            "stream_per_token": stream_ms,
+        },
+        "speedup_filter": legacy_ms / filter_ms,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/vad_cpu.py
+"""CPU seconds spent in VAD per second of audio: the old per-chunk torch path, the
+batched torch path and the ONNX Runtime backend.
+
+Run from the repository root:
+    python -m benchmarks.vad_cpu [--seconds 60] [--batch 8] [--threads 1]
+"""
+import argparse
+import json
+from time import process_time
+
+import numpy as np
+import torch
+
+from benchmarks.common import synthetic_corpus
+from providers.vad.silero_provider import SileroVAD
+from providers.vad.silero_onnx_provider import SileroOnnxVAD
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 512
+
+def legacy_is_speech(vad: SileroVAD, chunk: np.ndarray) -> bool:
+    """The previous is_speech(): copy, new FloatTensor, one forward pass per chunk"""
+    with torch.no_grad():
+        audio_data = np.array(chunk, dtype=np.float32, copy=True)
+        tensor = torch.FloatTensor(audio_data)
+        return vad.model(tensor, SAMPLE_RATE).item() > 0.5
+
+def cpu_per_audio_second(run, chunks: np.ndarray) -> float:
+    start = process_time()
+    run(chunks)
+    return (process_time() - start) / (chunks.size / SAMPLE_RATE)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--batch", type=int, default=8, help="chunks per speech_probs call")
+    parser.add_argument("--threads", type=int, default=1, help="ONNX intra-op threads")
+    args = parser.parse_args()
+
+    audio = synthetic_corpus([args.seconds])[0][1]
+    n_chunks = len(audio) // CHUNK_SIZE
+    chunks = audio[:n_chunks * CHUNK_SIZE].reshape(n_chunks, CHUNK_SIZE)
+
+    torch_vad = SileroVAD()
+    onnx_vad = SileroOnnxVAD(intra_op_threads=args.threads)
+
+    def legacy(frames):
+        for chunk in frames:
+            legacy_is_speech(torch_vad, chunk)
+
+    def batched(vad):
+        def run(frames):
+            vad.reset_states()
+            for i in range(0, len(frames), args.batch):
+                vad.speech_probs(frames[i:i + args.batch], SAMPLE_RATE)
+        return run
+
+    report = {
+        "audio_seconds": chunks.size / SAMPLE_RATE,
+        "cpu_per_audio_second": {
+            "torch_per_chunk": cpu_per_audio_second(legacy, chunks),
+            "torch_batched": cpu_per_audio_second(batched(torch_vad), chunks),
+            "onnx_batched": cpu_per_audio_second(batched(onnx_vad), chunks),
+        },
+        "torch_threads": torch.get_num_threads(),
+        "onnx_intra_op_threads": args.threads,
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/vad_gate.py
+"""CPU saved by the GatedVAD pre-gate on idle audio, and its detection accuracy on a
+replay corpus against the ungated VAD, printed as JSON.
+
+Idle audio is synthetic room noise (low-passed hiss plus mains hum). With --corpus,
+the WAV files are joined with `--gap` seconds of the same noise and every chunk is
+scored by both paths; the gated path is compared chunk by chunk with the ungated one,
+and so are the speech segments (onset to the next `--min-silence` of non-speech).
+Run from the repository root:
+    python -m benchmarks.vad_gate [--idle-seconds 300] [--corpus DIR] [--vad onnx]
+"""
+import argparse
+import json
+from time import process_time
+from typing import Any
+
+import numpy as np
+
+from benchmarks.common import load_corpus
+from providers.vad.gated_provider import GatedVAD
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 512
+
+def room_noise(seconds: float, level_db: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    # Moving average: most room noise energy sits in the lower frequencies
+    hiss = np.convolve(rng.standard_normal(n), np.ones(8) / 8, mode="same")
+    hum = np.sin(2 * np.pi * 50 * np.arange(n) / SAMPLE_RATE)
+    noise = hiss / np.std(hiss) + 0.5 * hum
+    return (noise * 10 ** (level_db / 20) / np.std(noise)).astype(np.float32)
+
+def to_chunks(audio: np.ndarray) -> np.ndarray:
+    n_chunks = len(audio) // CHUNK_SIZE
+    return audio[:n_chunks * CHUNK_SIZE].reshape(n_chunks, CHUNK_SIZE)
+
+def score(vad, chunks: np.ndarray, batch: int) -> tuple[np.ndarray, float]:
+    """Speech probabilities and CPU seconds, fed like the capture loop"""
+    vad.reset_states()
+    start = process_time()
+    probs = np.concatenate([vad.speech_probs(chunks[i:i + batch], SAMPLE_RATE)
+                            for i in range(0, len(chunks), batch)])
+    return probs, process_time() - start
+
+def segments(speech: np.ndarray, min_silence_chunks: int) -> list[tuple[int, int]]:
+    """(first, last) speech chunk of every utterance"""
+    found: list[tuple[int, int]] = []
+    start = last = -1
+    for i in np.flatnonzero(speech):
+        if start >= 0 and i - last > min_silence_chunks:
+            found.append((start, last))
+            start = -1
+        if start < 0:
+            start = i
+        last = i
+    if start >= 0:
+        found.append((start, last))
+    return found
+
+def accuracy(reference: np.ndarray, gated: np.ndarray, min_silence_chunks: int) -> dict[str, Any]:
+    chunk_ms = CHUNK_SIZE / SAMPLE_RATE * 1000
+    ref_segments = segments(reference, min_silence_chunks)
+    gated_segments = segments(gated, min_silence_chunks)
+    # Every reference utterance should overlap a gated one
+    matched = [
+        next((g for g in gated_segments if g[0] <= r[1] and r[0] <= g[1]), None) for r in ref_segments
+    ]
+    onset_shift = [(g[0] - r[0]) * chunk_ms for r, g in zip(ref_segments, matched) if g is not None]
+    end_shift = [(g[1] - r[1]) * chunk_ms for r, g in zip(ref_segments, matched) if g is not None]
+    speech_chunks = int(reference.sum())
+    return {
+        "chunk_agreement": float((reference == gated).mean()),
+        "speech_chunk_recall": float((reference & gated).sum() / speech_chunks) if speech_chunks else 1.0,
+        "false_speech_chunks": int((gated & ~reference).sum()),
+        "utterances": len(ref_segments),
+        "utterances_detected": sum(1 for g in matched if g is not None),
+        "utterances_gated": len(gated_segments),
+        "mean_onset_shift_ms": float(np.mean(onset_shift)) if onset_shift else 0.0,
+        "mean_end_shift_ms": float(np.mean(end_shift)) if end_shift else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--idle-seconds", type=float, default=300.0)
+    parser.add_argument("--noise-db", type=float, default=-55.0, help="room noise level in dBFS")
+    parser.add_argument("--corpus", help="directory of 16 kHz mono WAV files")
+    parser.add_argument("--gap", type=float, default=3.0, help="seconds of room noise between files")
+    parser.add_argument("--min-silence", type=float, default=0.5, help="silence that ends a segment")
+    parser.add_argument("--vad", choices=["torch", "onnx"], default="onnx")
+    parser.add_argument("--batch", type=int, default=1, help="chunks per speech_probs call")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.vad == "onnx":
+        from providers.vad.silero_onnx_provider import SileroOnnxVAD
+        vad = SileroOnnxVAD()
+    else:
+        from providers.vad.silero_provider import SileroVAD
+        vad = SileroVAD()
+    gated = GatedVAD(vad.fork())
+
+    idle = to_chunks(room_noise(args.idle_seconds, args.noise_db))
+    _, ungated_cpu = score(vad, idle, args.batch)
+    _, gated_cpu = score(gated, idle, args.batch)
+    per_hour = 3600.0 / args.idle_seconds
+    report: dict[str, Any] = {
+        "idle": {
+            "audio_seconds": args.idle_seconds,
+            "noise_db": args.noise_db,
+            "skip_rate": gated.skip_rate,
+            "cpu_seconds_per_idle_hour": {
+                "ungated": ungated_cpu * per_hour,
+                "gated": gated_cpu * per_hour,
+                "saved": (ungated_cpu - gated_cpu) * per_hour,
+            },
+        },
+    }
+
+    if args.corpus:
+        corpus = [samples for _, samples in load_corpus(args.corpus, SAMPLE_RATE)]
+        if not corpus:
+            raise SystemExit(f"No .wav files in {args.corpus}")
+        gap = room_noise(args.gap, args.noise_db, seed=1)
+        audio = np.concatenate([part for samples in corpus for part in (gap, samples)] + [gap])
+        # Speech over the same room noise
+        audio += room_noise(len(audio) / SAMPLE_RATE, args.noise_db, seed=2)[:len(audio)]
+        chunks = to_chunks(audio)
+        gated.stats = {"chunks": 0, "skipped": 0}
+        reference, ungated_cpu = score(vad, chunks, args.batch)
+        gated_probs, gated_cpu = score(gated, chunks, args.batch)
+        threshold = gated.threshold
+        min_silence_chunks = int(args.min_silence * SAMPLE_RATE / CHUNK_SIZE)
+        report["replay"] = {
+            "audio_seconds": len(audio) / SAMPLE_RATE,
+            "skip_rate": gated.skip_rate,
+            "cpu_seconds": {"ungated": ungated_cpu, "gated": gated_cpu},
+            **accuracy(reference > threshold, gated_probs > threshold, min_silence_chunks),
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
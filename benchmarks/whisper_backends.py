@@ -0,0 +1,122 @@
+# benchmarks/whisper_backends.py
+"""Real-time factor, memory footprint and word error rate of every Whisper backend on
+a fixed local corpus, printed as JSON.
+
+The corpus is a directory of 16 kHz mono WAV files, each with its reference transcript
+in a .txt file of the same name. Every backend runs in its own process, so its memory
+is measured alone: `rss_mb` after loading and warm-up, `peak_rss_mb` at the end.
+Run from the repository root:
+    python -m benchmarks.whisper_backends --corpus DIR [--model-size base] [--threads 4]
+        [--backends torch torch-int8 ctranslate2:int8 ctranslate2:float32]
+
+A backend is NAME or NAME:COMPUTE_TYPE. Backends whose runtime is not installed are
+reported with an error.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from time import perf_counter
+from typing import Any
+
+from benchmarks.common import load_corpus, load_references, percentiles, word_error_rate
+from config.whisper_config import WhisperConfig
+
+SAMPLE_RATE = 16000
+
+def rss_mb(field: str = "VmRSS") -> float:
+    """Resident memory of this process from /proc (Linux)"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def run_backend(args: argparse.Namespace) -> dict[str, Any]:
+    """Worker: load one backend and transcribe the corpus"""
+    from providers.transcription.backends import create_whisper
+
+    name, _, compute_type = args.worker.partition(":")
+    corpus = load_corpus(args.corpus, SAMPLE_RATE)
+    references = load_references([path for path, _ in corpus])
+
+    baseline = rss_mb()
+    start = perf_counter()
+    transcriber = create_whisper(WhisperConfig(
+        backend=name,
+        model_size=args.model_size,
+        device="cpu",
+        compute_type=compute_type or "default",
+        intra_op_threads=args.threads,
+        inter_op_threads=1,
+        language=args.language
+    ))
+    transcriber.warmup()
+    load_seconds = perf_counter() - start
+    loaded = rss_mb()
+
+    hypotheses = []
+    rtf = []
+    total_decode = 0.0
+    for _, samples in corpus:
+        start = perf_counter()
+        hypotheses.append(transcriber.transcribe(samples))
+        elapsed = perf_counter() - start
+        total_decode += elapsed
+        rtf.append(elapsed / (len(samples) / SAMPLE_RATE))
+
+    audio_seconds = sum(len(samples) for _, samples in corpus) / SAMPLE_RATE
+    return {
+        "backend": args.worker,
+        "load_seconds": load_seconds,
+        "rss_mb": loaded,
+        "model_rss_mb": loaded - baseline,
+        "peak_rss_mb": rss_mb("VmHWM"),
+        "real_time_factor": total_decode / audio_seconds,
+        "real_time_factor_per_file": percentiles(rtf),
+        "wer": word_error_rate(references, hypotheses),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", required=True, help="directory of 16 kHz WAV files with .txt references")
+    parser.add_argument("--backends", nargs="+",
+                        default=["torch", "torch-int8", "ctranslate2:int8", "ctranslate2:float32"])
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--threads", type=int, default=4, help="intra-op threads")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_backend(args)))
+        return
+
+    results = []
+    for backend in args.backends:
+        command = [
+            sys.executable, "-m", "benchmarks.whisper_backends", "--worker", backend,
+            "--corpus", args.corpus, "--model-size", args.model_size,
+            "--threads", str(args.threads), "--language", args.language
+        ]
+        process = subprocess.run(command, capture_output=True, text=True)
+        lines = process.stdout.strip().splitlines()
+        if process.returncode == 0 and lines:
+            results.append(json.loads(lines[-1]))
+        else:
+            error = process.stderr.strip().splitlines()
+            results.append({"backend": backend, "error": error[-1] if error else f"exit code {process.returncode}"})
+
+    output = json.dumps({
+        "model_size": args.model_size,
+        "threads": args.threads,
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
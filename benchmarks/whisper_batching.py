@@ -0,0 +1,79 @@
+# benchmarks/whisper_batching.py
+"""Throughput against added latency of BatchingTranscriber at different loads.
+
+Utterances arrive as a Poisson process at each offered load (utterances per second)
+and are transcribed through BatchingTranscriber with several batch configurations;
+`--batch-configs 1:0` is the sequential baseline. Run from the repository root:
+    python -m benchmarks.whisper_batching [--corpus DIR] [--loads 1 2 4 8] [--batch-configs 1:0 4:50 8:50]
+"""
+import argparse
+import json
+import random
+import threading
+from time import perf_counter, sleep
+
+from benchmarks.common import load_corpus, percentiles, synthetic_corpus
+from core.batching import BatchingTranscriber
+from providers.transcription.whisper_provider import WhisperProvider
+
+def run_load(provider: WhisperProvider, corpus: list, load: float, count: int,
+             max_batch_size: int, max_wait_ms: float, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    batcher = BatchingTranscriber(provider, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    latencies: list[float] = []
+    lock = threading.Lock()
+    callers = []
+
+    def call(audio) -> None:
+        start = perf_counter()
+        batcher.transcribe(audio)
+        with lock:
+            latencies.append((perf_counter() - start) * 1000)
+
+    start = perf_counter()
+    for i in range(count):
+        caller = threading.Thread(target=call, args=(corpus[i % len(corpus)][1],))
+        caller.start()
+        callers.append(caller)
+        sleep(rng.expovariate(load))
+    for caller in callers:
+        caller.join()
+    wall = perf_counter() - start
+
+    # The provider is reused by the next run
+    batcher.close()
+    stats = batcher.stats
+    return {
+        "offered_load": load,
+        "max_batch_size": max_batch_size,
+        "max_wait_ms": max_wait_ms,
+        "throughput": count / wall,
+        "mean_batch_size": stats["utterances"] / max(stats["batches"], 1),
+        "latency_ms": percentiles(latencies),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="directory of 16 kHz mono WAV files")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--loads", type=float, nargs="+", default=[1.0, 2.0, 4.0, 8.0],
+                        help="offered loads in utterances per second")
+    parser.add_argument("--batch-configs", nargs="+", default=["1:0", "4:50", "8:50", "8:100"],
+                        help="max_batch_size:max_wait_ms pairs")
+    parser.add_argument("--count", type=int, default=40, help="utterances per run")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus([1.0, 2.0, 3.0, 5.0])
+    provider = WhisperProvider(language="en", device=args.device)
+    # Warm-up, batched too, so lazy initialisation is not measured
+    provider.transcribe_batch([audio for _, audio in corpus[:2]])
+
+    results = []
+    for load in args.loads:
+        for config in args.batch_configs:
+            size, wait = config.split(":")
+            results.append(run_load(provider, corpus, load, args.count, int(size), float(wait)))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/whisper_inmemory.py
+"""Per-utterance latency of the in-memory Whisper path against the old temp.wav path.
+
+Run from the repository root:
+    python -m benchmarks.whisper_inmemory [--corpus DIR] [--device cpu]
+"""
+import argparse
+import json
+import os
+import tempfile
+from time import perf_counter
+
+from scipy.io import wavfile
+
+from benchmarks.common import load_corpus, percentiles, synthetic_corpus
+from providers.transcription.whisper_provider import WhisperProvider
+
+def file_based(provider: WhisperProvider, audio, path: str) -> str:
+    """The previous transcribe(): write a WAV file and let the pipeline decode it again"""
+    wavfile.write(path, provider.sample_rate, audio)
+    return provider.stt(path, batch_size=1)["text"].strip()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="directory of 16 kHz mono WAV files")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = synthetic_corpus([1.0, 2.0, 4.0, 8.0])
+
+    provider = WhisperProvider(language="en", device=args.device)
+    # Warm-up so that the first measurement doesn't include lazy initialisation
+    provider.transcribe(corpus[0][1])
+
+    timings = {"file": [], "memory": []}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "temp.wav")
+        for _ in range(args.repeat):
+            for _, audio in corpus:
+                start = perf_counter()
+                file_based(provider, audio, path)
+                timings["file"].append((perf_counter() - start) * 1000)
+
+                start = perf_counter()
+                provider.transcribe(audio)
+                timings["memory"].append((perf_counter() - start) * 1000)
+
+    report = {name: percentiles(values) for name, values in timings.items()}
+    report["speedup_p50"] = report["file"]["p50"] / report["memory"]["p50"]
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
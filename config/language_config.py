@@ -8,6 +8,12 @@ class LanguageConfig:
     whisper_language: str
     error_messages: Dict[str, str]
     llm_system_prompt: str
+    # Words that make a query depend on the conversation (follow-ups, references to
+    # earlier replies or to the user): such queries bypass the LLM response cache
+    followup_pattern: str = ""
+    # Words that make the answer depend on when it is asked (time, date, weather,
+    # news): such queries bypass the LLM response cache too
+    volatile_pattern: str = ""
 
 LANGUAGE_CONFIGS = {
     "en": LanguageConfig(
@@ -17,7 +23,15 @@ LANGUAGE_CONFIGS = {
             "not_understood": "I didn't understand. Could you repeat that?",
             "processing_error": "Sorry, I encountered an error processing your request."
         },
-        llm_system_prompt="You are a friendly voice assistant. Keep responses concise and natural."
+        llm_system_prompt="You are a friendly voice assistant. Keep responses concise and natural.",
+        followup_pattern=(
+            r"\b(that|this|those|these|again|repeat|previous|last|earlier|before|above|more|"
+            r"another|else|also|too|then|why|he|she|they|him|her|them|his|their|my|mine)\b"
+        ),
+        volatile_pattern=(
+            r"\b(time|clock|date|day|today|tonight|tomorrow|yesterday|now|current|currently|"
+            r"latest|week|month|year|weather|forecast|news)\b"
+        )
     ),
     "it": LanguageConfig(
         code="it",
@@ -26,6 +40,14 @@ LANGUAGE_CONFIGS = {
             "not_understood": "Non ho capito. Potresti ripetere?",
             "processing_error": "Mi dispiace, ho avuto un problema nell'elaborare la richiesta."
         },
-        llm_system_prompt="Sei un assistente vocale amichevole che parla in italiano. Mantieni le risposte concise e naturali."
+        llm_system_prompt="Sei un assistente vocale amichevole che parla in italiano. Mantieni le risposte concise e naturali.",
+        followup_pattern=(
+            r"\b(quello|quella|quelli|questo|questa|questi|ancora|ripeti|ripetere|prima|"
+            r"precedente|ultimo|ultima|altro|altra|anche|poi|perché|lui|lei|loro|mio|mia|miei|mie)\b"
+        ),
+        volatile_pattern=(
+            r"\b(ora|ore|orario|data|giorno|oggi|stasera|domani|ieri|adesso|attuale|attualmente|"
+            r"ultime|settimana|mese|anno|meteo|tempo|previsioni|notizie)\b"
+        )
     )
 }
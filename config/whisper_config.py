@@ -0,0 +1,38 @@
+# config/whisper_config.py
+from dataclasses import dataclass
+from typing import Optional
+
+# "torch": transformers pipeline in fp32 (fp16 on GPU with compute_type="float16")
+# "torch-int8": the same model with its Linear layers dynamically quantized to int8 (CPU)
+# "ctranslate2": faster-whisper on CTranslate2, compute_type int8 / int8_float32 / float32 ...
+WHISPER_BACKENDS = ("torch", "torch-int8", "ctranslate2")
+
+@dataclass
+class WhisperConfig:
+    backend: str = "torch"
+    # tiny, base, small, medium, large-v3 ...
+    model_size: str = "base"
+    # Explicit model (Hugging Face repo or local path); overrides model_size
+    model: str = ""
+    # "auto" picks cuda, then mps, then cpu
+    device: str = "auto"
+    compute_type: str = "default"
+    # 0 keeps the library default
+    intra_op_threads: int = 0
+    inter_op_threads: int = 0
+    # "auto" detects the language of every utterance
+    language: str = "en"
+    cache_dir: str = ""
+
+    def __post_init__(self):
+        if self.backend not in WHISPER_BACKENDS:
+            raise ValueError(f"Unknown Whisper backend {self.backend!r}, expected one of {WHISPER_BACKENDS}")
+
+    @property
+    def whisper_language(self) -> Optional[str]:
+        return None if self.language == "auto" else self.language
+
+    @property
+    def model_id(self) -> str:
+        """Model for the torch backends"""
+        return self.model or f"openai/whisper-{self.model_size}"
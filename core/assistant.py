@@ -1,15 +1,29 @@
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
 import numpy as np
-from time import sleep
+import itertools
+import queue
+import threading
+import time
+from time import perf_counter
 from providers.base import (
     AudioProvider,
     VADProvider,
     LLMProvider,
     TTSProvider,
     TextFilterProvider,
-    TranscriptionProvider
+    StreamingTextFilterProvider,
+    TranscriptionProvider,
+    StreamingTranscriptionProvider,
+    TranscriptionStream
 )
 from config.language_config import LANGUAGE_CONFIGS, LanguageConfig
+from core.turn import Turn
+from core.segmenter import SentenceSegmenter
+from core.ring_buffer import AudioRingBuffer
+from core.metrics import Metrics
+from core.endpointing import Endpointer, AdaptiveEndpointer
+from core.speculation import Speculation
+from core.long_form import LongFormTranscriber
 import logging
 from enum import Enum
 
@@ -28,7 +42,23 @@ class VoiceAssistant:
                  text_filter_provider: TextFilterProvider,
                  tts_provider: TTSProvider,
                  language: str = "en",
-                 log_level: LogLevel = LogLevel.INFO):
+                 log_level: LogLevel = LogLevel.INFO,
+                 queue_size: int = 2,
+                 barge_in: bool = False,
+                 barge_in_chunks: int = 3,
+                 streaming_transcription: bool = True,
+                 pre_roll_seconds: float = 0.3,
+                 max_utterance_seconds: float = 30.0,
+                 max_chunks_per_read: int = 8,
+                 on_turn_complete: Optional[Callable[[Turn], None]] = None,
+                 metrics: Optional[Metrics] = None,
+                 endpointer: Optional[Endpointer] = None,
+                 speculative: bool = False,
+                 speculation_pause: float = 0.25,
+                 speculative_llm: bool = False,
+                 long_form: bool = False,
+                 detect_language: bool = False,
+                 shared_providers: Iterable[object] = ()):
 
         # Setup logging
         logging.basicConfig(
@@ -43,13 +73,94 @@ class VoiceAssistant:
         self.llm = llm_provider
         self.text_filter = text_filter_provider
         self.tts = tts_provider
+        # Providers owned by the caller (e.g. a server sharing models across sessions)
+        # are left alone by cleanup()
+        self._shared_providers = [id(provider) for provider in shared_providers]
+
+        # Transcribe while the user is still speaking when the provider supports it.
+        # Not in long-form mode: a stream re-decodes its whole uncommitted window, so
+        # utterances longer than one Whisper window go to the LongFormTranscriber instead
+        self.streaming_transcription = (
+            streaming_transcription
+            and not long_form
+            and isinstance(self.transcriber, StreamingTranscriptionProvider)
+        )
+
+        # Utterance capture buffer, preallocated once
+        self.ring = AudioRingBuffer(
+            self.audio.sample_rate,
+            max_utterance_seconds=max_utterance_seconds,
+            pre_roll_seconds=pre_roll_seconds
+        )
+
+        # End of utterance: adaptive trailing silence instead of a fixed second
+        self.endpointer = endpointer if endpointer is not None else AdaptiveEndpointer()
+        # Speculation: on a short pause, transcribe (and optionally answer) the audio so
+        # far; reused if the endpoint follows, cancelled if the user keeps talking.
+        # A transcription stream already decodes during speech, so it takes precedence
+        self.speculative = speculative and not self.streaming_transcription
+        self.speculation_pause = speculation_pause
+        self.speculative_llm = speculative_llm
+        self._llm_busy = threading.Event()
+        # Both Silero providers expose their threshold; 0/1 scores work with any value
+        self.vad_threshold = getattr(self.vad, "threshold", 0.5)
+
+        # Chunks the capture loop drains and scores at once when it falls behind
+        self.max_chunks_per_read = max_chunks_per_read
 
         # Set language configuration
         self.lang_config = self._get_language_config(language)
+        # Per-utterance language from the transcriber (Whisper's language token): each
+        # turn is answered and spoken in its own language, which becomes the current one
+        self.detect_language = detect_language
 
         # State
         self.is_running = False
 
+        # Pipeline: capture/VAD runs in run(), the other stages on workers
+        # connected by bounded queues
+        self.on_turn_complete = on_turn_complete
+        self.barge_in = barge_in
+        self.barge_in_chunks = barge_in_chunks
+        self._utterance_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._transcript_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._speech_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._workers: list[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._speaking = threading.Event()
+        self._cleanup_lock = threading.Lock()
+        self._cleaned_up = False
+        self._generation = 0
+        self._turn_ids = itertools.count(1)
+
+        # Stage timers, counters and per-turn traces
+        self.metrics = metrics if metrics is not None else Metrics()
+
+        # Long-form mode: utterances longer than one Whisper window are split at pauses
+        # and decoded window by window; raise max_utterance_seconds to allow dictation
+        self.long_form = (
+            LongFormTranscriber(
+                self.transcriber,
+                vad=self.vad.fork(),
+                sample_rate=self.audio.sample_rate,
+                chunk_size=self.audio.chunk_size,
+                metrics=self.metrics
+            )
+            if long_form else None
+        )
+        self._recording_transcriber = self.long_form if self.long_form is not None else self.transcriber
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Pipeline counters"""
+        counters = {"turns": 0, "dropped_utterances": 0, "stale_turns": 0, "barge_ins": 0}
+        counters.update(self.metrics.counters())
+        counters["audio_overflows"] = self.audio.overflow_count
+        counters["audio_underflows"] = self.audio.underflow_count
+        if counters.get("speculations"):
+            counters["speculation_hit_rate"] = counters.get("speculation_hits", 0) / counters["speculations"]
+        return counters
+
     def _get_language_config(self, language: str) -> LanguageConfig:
         if language not in LANGUAGE_CONFIGS:
             print(f"Language {language} not supported, falling back to English")
@@ -58,99 +169,481 @@ class VoiceAssistant:
 
     def process_audio_chunk(self, audio_chunk: np.ndarray) -> bool:
         """Process single audio chunk and return True if speech was detected"""
+        return self.speech_probability(audio_chunk) > self.vad_threshold
+
+    def speech_probability(self, audio_chunk: np.ndarray) -> float:
+        """VAD speech probability of a single chunk (0 on error)"""
+        return float(self.speech_probabilities(audio_chunk[np.newaxis])[0])
+
+    def speech_probabilities(self, chunks: np.ndarray) -> np.ndarray:
+        """VAD speech probabilities of consecutive chunks in one call (0 on error)"""
+        start = perf_counter()
         try:
-            if self.vad.is_speech(audio_chunk, self.audio.sample_rate):
+            probs = self.vad.speech_probs(chunks, self.audio.sample_rate)
+            if self.logger.isEnabledFor(logging.DEBUG) and (probs > self.vad_threshold).any():
                 self.logger.debug("Speech detected!")
-                return True
+            return probs
         except Exception as e:
             self.logger.error(f"Error processing audio chunk: {e}")
-        return False
+            return np.zeros(len(chunks), dtype=np.float32)
+        finally:
+            # Per chunk, so batched and single reads compare
+            per_chunk = (perf_counter() - start) / max(len(chunks), 1)
+            for _ in range(len(chunks)):
+                self.metrics.observe("vad", per_chunk)
 
-    def process_recording(self, audio_frames: list[np.ndarray]) -> Optional[str]:
+    def process_recording(self, audio: np.ndarray) -> Optional[str]:
         """Process complete recording and return transcription"""
+        return self.transcribe_recording(audio)[0]
+
+    def transcribe_recording(self, audio: np.ndarray) -> tuple[Optional[str], Optional[str]]:
+        """Transcription of a complete recording and, with detect_language, its language"""
         try:
-            if not audio_frames:
-                return None
-            # Concatena tutti i frame audio
-            full_audio = np.concatenate(audio_frames)
+            if audio is None or len(audio) == 0:
+                return None, None
             # Trascrivi l'audio
-            return self.transcriber.transcribe(full_audio)
+            with self.metrics.timer("transcription"):
+                if self.detect_language:
+                    return self._recording_transcriber.transcribe_with_language(audio)
+                return self._recording_transcriber.transcribe(audio), None
         except Exception as e:
             print(f"Error processing recording: {e}")
+            return None, None
+
+    def begin_transcription(self) -> Optional[TranscriptionStream]:
+        """Start incremental transcription of a new utterance"""
+        if not self.streaming_transcription:
+            return None
+        try:
+            return self.transcriber.begin_stream(
+                on_partial=lambda text: self.logger.debug(f"Partial: {text}")
+            )
+        except Exception as e:
+            self.logger.error(f"Error starting streaming transcription: {e}")
             return None
 
-    def get_response(self, text: str) -> str:
+    def finish_transcription(self, stream: TranscriptionStream) -> Optional[str]:
+        """Decode the uncommitted tail of a streamed utterance"""
+        try:
+            with self.metrics.timer("transcription_tail"):
+                return stream.finish() or None
+        except Exception as e:
+            print(f"Error processing recording: {e}")
+            return None
+
+    def _config(self, language: Optional[str]) -> LanguageConfig:
+        """Config of a turn's language; the current one if it has none"""
+        return LANGUAGE_CONFIGS.get(language, self.lang_config) if language else self.lang_config
+
+    def get_response(self, text: str, language: Optional[str] = None) -> str:
         """Get response from LLM"""
+        config = self._config(language)
+        try:
+            with self.metrics.timer("llm"):
+                return self.llm.get_response(text, config.llm_system_prompt)
+        except Exception as e:
+            print(f"Error getting response: {e}")
+            return config.error_messages["processing_error"]
+
+    def stream_response(self, text: str, language: Optional[str] = None) -> Iterator[str]:
+        """Stream response chunks from LLM"""
+        config = self._config(language)
         try:
-            return self.llm.get_response(text, self.lang_config.llm_system_prompt)
+            yield from self.llm.stream_response(text, config.llm_system_prompt)
         except Exception as e:
             print(f"Error getting response: {e}")
-            return self.lang_config.error_messages["processing_error"]
+            yield config.error_messages["processing_error"]
 
-    def speak_response(self, text: str) -> None:
+    def speak_response(self, text: str, language: Optional[str] = None) -> None:
         """Speak the response"""
+        self.speak_text(self.text_filter.filter(text), language)
+
+    def speak_text(self, text: str, language: Optional[str] = None) -> None:
+        """Speak text that has already been filtered"""
         try:
-            filtered_text = self.text_filter.filter(text)
-            self.tts.speak(filtered_text, self.lang_config.code)
+            with self.metrics.timer("tts"):
+                self.tts.speak(text, self._config(language).code)
 
         except Exception as e:
             print(f"Error speaking response: {e}")
 
+    def _speculate(self) -> Speculation:
+        """Start transcribing the utterance so far, and answering it if the LLM is idle"""
+        return Speculation(
+            self.ring.view().copy(),
+            self._recording_transcriber.transcribe_cancellable,
+            self._speculative_response if self.speculative_llm else None,
+            self.metrics
+        )
+
+    def _speculative_response(self, text: str) -> Optional[Iterator[str]]:
+        # A reply still in progress isn't in the LLM's memory yet: don't answer without it
+        if self._llm_busy.is_set() or not self._transcript_queue.empty():
+            return None
+        return self.llm.stream_response(text, self.lang_config.llm_system_prompt, record=False)
+
+    def _replay_response(self, chunks: Iterator[str], language: Optional[str] = None) -> Iterator[str]:
+        """Speculative reply, with the errors handled like stream_response"""
+        try:
+            yield from chunks
+        except Exception as e:
+            print(f"Error getting response: {e}")
+            yield self._config(language).error_messages["processing_error"]
+
+    def _route_language(self, turn: Turn) -> None:
+        """Give the turn the detected language if it is configured (it becomes the
+        current one), otherwise the current language"""
+        detected = turn.language if self.detect_language else None
+        if detected in LANGUAGE_CONFIGS:
+            if detected != self.lang_config.code:
+                self.logger.info(f"Language switched to {detected}")
+                self.metrics.increment("language_switches")
+                self.lang_config = LANGUAGE_CONFIGS[detected]
+        elif detected is not None:
+            self.metrics.increment("language_unsupported")
+        turn.language = self.lang_config.code
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up on shutdown, so backpressure propagates upstream"""
+        while not self._stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """Blocking get that returns None on shutdown"""
+        while not self._stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _is_stale(self, turn: Turn) -> bool:
+        if turn.generation < self._generation:
+            if not turn.stale:
+                turn.stale = True
+                if turn.speculation is not None:
+                    turn.speculation.cancel()
+                self.metrics.increment("stale_turns")
+                self.logger.debug(f"Dropping turn {turn.turn_id} interrupted by barge-in")
+            return True
+        return False
+
+    def _submit_utterance(self,
+                          stream: Optional[TranscriptionStream] = None,
+                          speculation: Optional[Speculation] = None) -> None:
+        """Hand a finished utterance to the transcription stage without blocking capture"""
+        # Capture keeps writing into the ring buffer, so the batch path needs its own
+        # copy; a transcription stream already holds the audio
+        audio = self.ring.view().copy() if stream is None else np.empty(0, dtype=np.float32)
+        self.ring.end_utterance()
+        turn = Turn(
+            turn_id=next(self._turn_ids),
+            audio=audio,
+            generation=self._generation,
+            speech_end=perf_counter(),
+            stream=stream,
+            speculation=speculation
+        )
+        try:
+            self._utterance_queue.put_nowait(turn)
+        except queue.Full:
+            # The microphone must never wait: drop the oldest pending utterance
+            try:
+                dropped = self._utterance_queue.get_nowait()
+                self.metrics.increment("dropped_utterances")
+                self.logger.warning(f"Pipeline busy, dropping utterance {dropped.turn_id}")
+                if dropped.stream is not None:
+                    dropped.stream.cancel()
+                if dropped.speculation is not None:
+                    dropped.speculation.cancel()
+            except queue.Empty:
+                pass
+            self._utterance_queue.put_nowait(turn)
+
+    def _interrupt(self) -> None:
+        """Barge-in: invalidate in-flight turns and stop playback"""
+        self._generation += 1
+        self.metrics.increment("barge_ins")
+        self.logger.info("Barge-in detected, interrupting response")
+        try:
+            self.tts.stop()
+        except Exception as e:
+            self.logger.error(f"Error stopping TTS: {e}")
+
+    def _transcription_worker(self) -> None:
+        while not self._stop_event.is_set():
+            turn = self._get(self._utterance_queue)
+            if turn is None:
+                continue
+            if self._is_stale(turn):
+                if turn.stream is not None:
+                    turn.stream.cancel()
+                continue
+            print("Processing speech...")
+            if turn.stream is not None:
+                turn.text = self.finish_transcription(turn.stream)
+                turn.language = turn.stream.language
+                turn.stream = None
+            elif turn.speculation is not None:
+                # Speculative transcripts keep the current language
+                with self.metrics.timer("transcription"):
+                    turn.text = turn.speculation.transcript()
+                if turn.text is None:
+                    turn.text, turn.language = self.transcribe_recording(turn.audio)
+            else:
+                turn.text, turn.language = self.transcribe_recording(turn.audio)
+            self._route_language(turn)
+            turn.audio = np.empty(0, dtype=np.float32)
+            turn.transcribed = perf_counter()
+            if turn.text:
+                print(f"You said: {turn.text}")
+                self._put(self._transcript_queue, turn)
+
+    def _llm_worker(self) -> None:
+        """Stream the reply and hand each finished sentence to TTS while generation continues"""
+        while not self._stop_event.is_set():
+            turn = self._get(self._transcript_queue)
+            if turn is None or self._is_stale(turn):
+                continue
+            self._llm_busy.set()
+
+            segmenter = SentenceSegmenter()
+            # A streaming filter cleans tokens once as they arrive; otherwise each
+            # sentence is filtered as a whole before it is queued
+            filter_stream = (self.text_filter.begin_stream()
+                             if isinstance(self.text_filter, StreamingTextFilterProvider) else None)
+
+            def queue_segments(segments: list[str]) -> None:
+                for segment in segments:
+                    if filter_stream is None:
+                        segment = self.text_filter.filter(segment)
+                    if segment:
+                        self._put(self._speech_queue, (turn, segment))
+
+            chunks = []
+            speculative = turn.speculation.response(turn.text or "") if turn.speculation is not None else None
+            stream = (self.stream_response(turn.text or "", turn.language) if speculative is None
+                      else self._replay_response(speculative, turn.language))
+            completed = False
+            try:
+                for chunk in stream:
+                    if self._stop_event.is_set() or self._is_stale(turn):
+                        break
+                    if turn.first_token is None:
+                        turn.first_token = perf_counter()
+                    chunks.append(chunk)
+                    if filter_stream is not None:
+                        chunk = filter_stream.feed(chunk)
+                    queue_segments(segmenter.feed(chunk))
+                else:
+                    if filter_stream is not None:
+                        queue_segments(segmenter.feed(filter_stream.flush()))
+                    tail = segmenter.flush()
+                    if tail:
+                        queue_segments([tail])
+                    completed = True
+            finally:
+                stream.close()
+                if turn.speculation is not None:
+                    turn.speculation.cancel()
+                    turn.speculation = None
+
+            turn.response = "".join(chunks).strip()
+            if speculative is not None and completed and turn.response:
+                # The speculative reply was generated with record=False
+                self.llm.record_turn(turn.text or "", turn.response)
+            self._llm_busy.clear()
+            if turn.transcribed is not None and turn.first_token is not None:
+                self.metrics.observe("llm_first_token", turn.first_token - turn.transcribed)
+                self.metrics.observe("llm", perf_counter() - turn.transcribed)
+            print(f"Assistant: {turn.response}")
+            # End-of-turn marker
+            self._put(self._speech_queue, (turn, None))
+
+    def _tts_worker(self) -> None:
+        while not self._stop_event.is_set():
+            item = self._get(self._speech_queue)
+            if item is None:
+                continue
+            turn, segment = item
+            if self._is_stale(turn):
+                continue
+            if segment is None:
+                turn.completed = perf_counter()
+                self.metrics.increment("turns")
+                self._trace_turn(turn)
+                if self.on_turn_complete is not None:
+                    self.on_turn_complete(turn)
+                continue
+
+            if turn.first_audio is None:
+                turn.first_audio = perf_counter()
+                self.metrics.observe("end_to_end", turn.first_audio - turn.speech_end)
+                self.logger.info(
+                    f"Turn {turn.turn_id}: {(turn.first_audio - turn.speech_end) * 1000:.0f} ms "
+                    "from end of speech to first audio"
+                )
+            self._speaking.set()
+            try:
+                self.speak_text(segment, turn.language)
+            finally:
+                self._speaking.clear()
+
+    def _trace_turn(self, turn: Turn) -> None:
+        """Record the per-turn trace: stage latencies in ms, measured from end of speech"""
+        self.metrics.record_trace({"time": time.time(), **turn.trace()})
+
+    def _prewarm_tts(self) -> None:
+        """Synthesize the fixed strings of every language (they are filtered before TTS too)"""
+        for config in LANGUAGE_CONFIGS.values():
+            texts = [self.text_filter.filter(text) for text in config.error_messages.values()]
+            try:
+                self.tts.prewarm(texts, config.code)
+            except Exception as e:
+                self.logger.error(f"Error prewarming TTS: {e}")
+
+    def _start_workers(self) -> None:
+        self._stop_event.clear()
+        # Prewarming may hit the network: don't hold up startup for it
+        threading.Thread(target=self._prewarm_tts, name="tts-prewarm", daemon=True).start()
+        self._workers = [
+            threading.Thread(target=worker, name=name, daemon=True)
+            for name, worker in (
+                ("transcription", self._transcription_worker),
+                ("llm", self._llm_worker),
+                ("tts", self._tts_worker),
+            )
+        ]
+        for worker in self._workers:
+            worker.start()
+
     def run(self) -> None:
-        """Main loop"""
+        """Main loop: capture and VAD; the other stages run on worker threads"""
         self.logger.info("Starting Voice Assistant. Press Ctrl+C to exit.")
 
         self.is_running = True
+        self._start_workers()
         self.audio.start_stream()
 
+        stream: Optional[TranscriptionStream] = None
+        speculation: Optional[Speculation] = None
         try:
-            frames = []
             is_recording = False
-            silence_counter = 0
+            # Consecutive speech chunks, for barge-in
+            speech_run = 0
+            # Set by a barge-in until its utterance ends: playback may not have stopped yet
+            barged = False
+            end_of_utterance = False
 
             while self.is_running:
-                # Read audio chunk
-                audio_chunk = self.audio.read_chunk()
-
-                # Check for speech
-                if self.process_audio_chunk(audio_chunk):
-                    is_recording = True
-                    silence_counter = 0
-                    frames.append(audio_chunk)
-                elif is_recording:
-                    silence_counter += 1
-                    frames.append(audio_chunk)
-
-                    # Stop recording after ~1 second of silence
-                    if silence_counter > int(self.audio.sample_rate / self.audio.chunk_size):
-                        print("Processing speech...")
-                        # Transcribe the recorded audio
-                        text = self.process_recording(frames)
-                        if text:
-                            print(f"You said: {text}")
-
-                            response = self.get_response(text)
-                            print(f"Assistant: {response}")
-
-                            self.speak_response(response)
+                # Everything captured since the last read, scored by the VAD in one call;
+                # read_chunks blocks until there is audio, so no polling sleep is needed
+                chunks = self.audio.read_chunks(self.max_chunks_per_read)
+                capture_time = self.audio.capture_time
+                if capture_time is not None:
+                    self.metrics.observe("capture_delay", perf_counter() - capture_time)
+                speech_probs = self.speech_probabilities(chunks)
+
+                for audio_chunk, speech_prob in zip(chunks, speech_probs):
+                    is_speech = speech_prob > self.vad_threshold
+                    speech_run = speech_run + 1 if is_speech else 0
+                    if is_speech and self._speaking.is_set() and not barged:
+                        # Open speakers feed the assistant's own voice back: while it talks,
+                        # speech only counts once it interrupts playback (barge-in)
+                        if self.barge_in and speech_run >= self.barge_in_chunks:
+                            self._interrupt()
+                            barged = True
+                        elif not is_recording:
+                            is_speech = False
+                    if is_speech:
+                        if not is_recording:
+                            # Speech onset: the utterance starts with the pre-roll
+                            is_recording = True
+                            self.endpointer.start(self.audio.sample_rate)
+                            self.ring.start_utterance()
+                            self.ring.write(audio_chunk)
+                            stream = self.begin_transcription()
+                            if stream is not None:
+                                stream.feed(self.ring.view())
+                        else:
+                            self.ring.write(audio_chunk)
+                            if stream is not None:
+                                stream.feed(audio_chunk)
+                            if speculation is not None:
+                                # The user kept talking: the speculative work is stale
+                                speculation.cancel()
+                                speculation = None
+                                self.metrics.increment("speculation_cancelled")
+                    elif is_recording:
+                        self.ring.write(audio_chunk)
+                        if stream is not None:
+                            stream.feed(audio_chunk)
+                    else:
+                        # Keep the ring buffer filled for the next pre-roll
+                        self.ring.write(audio_chunk)
+
+                    partial = None
+                    if not is_speech:
+                        if stream is not None:
+                            partial = stream.partial
+                        elif speculation is not None:
+                            partial = speculation.text
+                    if is_recording and self.endpointer.update(audio_chunk, speech_prob, is_speech, partial):
+                        self.metrics.observe("endpoint_silence", self.endpointer.silence_seconds)
+                        end_of_utterance = True
+                    elif (is_recording and not is_speech and self.speculative and speculation is None
+                            and self.endpointer.silence_seconds >= self.speculation_pause):
+                        speculation = self._speculate()
+
+                    if is_recording and self.ring.space_left < len(audio_chunk):
+                        self.logger.warning("Maximum utterance length reached")
+                        end_of_utterance = True
+
+                    if end_of_utterance:
+                        self._submit_utterance(stream, speculation)
 
                         # Reset for next interaction
-                        frames = []
+                        stream = None
+                        speculation = None
                         is_recording = False
-                        silence_counter = 0
-
-                # Small sleep to prevent CPU overload
-                sleep(0.001)
+                        barged = False
+                        end_of_utterance = False
 
         except KeyboardInterrupt:
             print("\nStopping...")
         finally:
+            if stream is not None:
+                stream.cancel()
+            if speculation is not None:
+                speculation.cancel()
             self.cleanup()
 
     def cleanup(self) -> None:
-        """Cleanup all providers"""
+        """Stop the pipeline workers and cleanup all providers"""
+        with self._cleanup_lock:
+            if self._cleaned_up:
+                return
+            self._cleaned_up = True
+
         self.is_running = False
-        self.audio.cleanup()
-        self.vad.cleanup()
-        self.transcriber.cleanup()
-        self.tts.cleanup()
+        self._stop_event.set()
+        try:
+            self.tts.stop()
+        except Exception as e:
+            self.logger.error(f"Error stopping TTS: {e}")
+        for worker in self._workers:
+            if worker is not threading.current_thread():
+                worker.join(timeout=5.0)
+        self._workers = []
+        self.logger.info(f"Pipeline stats: {self.stats}")
+
+        if self.long_form is not None:
+            self.long_form.cleanup()
+        for provider in (self.audio, self.vad, self.transcriber, self.tts):
+            if id(provider) not in self._shared_providers:
+                provider.cleanup()
@@ -0,0 +1,138 @@
+# core/batching.py
+import collections
+import threading
+from concurrent.futures import Future, TimeoutError
+from time import perf_counter
+from typing import Optional
+import numpy as np
+from providers.base import TranscriptionProvider
+from core.metrics import Metrics
+
+class BatchingTranscriber(TranscriptionProvider):
+    """Dynamic batching in front of a transcriber shared by concurrent callers.
+
+    Utterances are queued and decoded by one scheduler thread with a single
+    transcribe_batch() call. A batch is closed when it holds `max_batch_size`
+    utterances or when its oldest utterance has waited `max_wait_ms`, so batching adds
+    at most that much latency. Utterances that arrive while a batch is being decoded
+    go into the next one. Utterances queued with their language are decoded in the
+    same batches, with transcribe_batch_with_language().
+    """
+
+    def __init__(self,
+                 transcriber: TranscriptionProvider,
+                 max_batch_size: int = 8,
+                 max_wait_ms: float = 50.0,
+                 metrics: Optional[Metrics] = None):
+        self.transcriber = transcriber
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.metrics = metrics if metrics is not None else Metrics()
+        # (audio, future, arrival time, with language)
+        self._pending: collections.deque[tuple[np.ndarray, Future, float, bool]] = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self.stats = {"batches": 0, "utterances": 0, "largest_batch": 0}
+        self._thread = threading.Thread(target=self._schedule, name="transcription-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, audio_data: np.ndarray, with_language: bool = False) -> Future:
+        """Queue an utterance; the future resolves to its text, or with_language to
+        (text, language)"""
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("BatchingTranscriber is closed")
+            self._pending.append((audio_data, future, perf_counter(), with_language))
+            self._condition.notify()
+        return future
+
+    def transcribe(self, audio_data: np.ndarray) -> str:
+        return self.submit(audio_data).result()
+
+    def transcribe_batch(self, audio_batch: list[np.ndarray]) -> list[str]:
+        futures = [self.submit(audio_data) for audio_data in audio_batch]
+        return [future.result() for future in futures]
+
+    def transcribe_cancellable(self, audio_data: np.ndarray, cancel: threading.Event) -> Optional[str]:
+        """An utterance cancelled while queued is left out of its batch"""
+        if cancel.is_set():
+            return None
+        future = self.submit(audio_data)
+        while True:
+            try:
+                text = future.result(timeout=0.05)
+                return None if cancel.is_set() else text
+            except TimeoutError:
+                if cancel.is_set():
+                    future.cancel()
+                    return None
+
+    def transcribe_with_language(self, audio_data: np.ndarray) -> tuple[str, Optional[str]]:
+        return self.submit(audio_data, with_language=True).result()
+
+    def transcribe_batch_with_language(self, audio_batch: list[np.ndarray]) -> list[tuple[str, Optional[str]]]:
+        futures = [self.submit(audio_data, with_language=True) for audio_data in audio_batch]
+        return [future.result() for future in futures]
+
+    def warmup(self) -> None:
+        self.transcriber.warmup()
+
+    def _next_batch(self) -> list[tuple[np.ndarray, Future, float, bool]]:
+        """Wait for a full batch or for the oldest utterance's deadline; empty once closed"""
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return []
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            size = min(len(self._pending), self.max_batch_size)
+            batch = [self._pending.popleft() for _ in range(size)]
+            # Futures cancelled while queued are dropped here
+            return [item for item in batch if item[1].set_running_or_notify_cancel()]
+
+    def _schedule(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if self._closed and not self._pending:
+                    return
+                continue
+            start = perf_counter()
+            for _, _, arrival, _ in batch:
+                self.metrics.observe("transcription_batch_wait", start - arrival)
+            audio_batch = [audio for audio, _, _, _ in batch]
+            # The language comes from the same decode: one call for the whole batch
+            with_language = any(item[3] for item in batch)
+            try:
+                if with_language:
+                    results = self.transcriber.transcribe_batch_with_language(audio_batch)
+                else:
+                    results = [(text, None) for text in self.transcriber.transcribe_batch(audio_batch)]
+            except Exception as e:
+                for _, future, _, _ in batch:
+                    future.set_exception(e)
+                continue
+            self.metrics.observe("transcription_batch", perf_counter() - start)
+            for (_, future, _, language_wanted), (text, language) in zip(batch, results):
+                future.set_result((text, language) if language_wanted else text)
+
+            self.stats["batches"] += 1
+            self.stats["utterances"] += len(batch)
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+    def close(self) -> None:
+        """Decode what is still queued and stop the scheduler; the transcriber is kept"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def cleanup(self) -> None:
+        self.close()
+        self.transcriber.cleanup()
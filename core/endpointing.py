@@ -0,0 +1,154 @@
+# core/endpointing.py
+import re
+from abc import ABC, abstractmethod
+from typing import Optional
+import numpy as np
+
+def chunk_db(audio_chunk: np.ndarray) -> float:
+    """RMS level of a chunk in dBFS (floored at -100)"""
+    if len(audio_chunk) == 0:
+        return -100.0
+    rms = float(np.sqrt(np.dot(audio_chunk, audio_chunk) / len(audio_chunk)))
+    return 20.0 * np.log10(rms) if rms > 1e-5 else -100.0
+
+class Endpointer(ABC):
+    """Decides when the user has finished speaking.
+
+    start() is called at speech onset, then update() with every chunk of the utterance,
+    onset chunk included, until it returns True.
+    """
+
+    def __init__(self):
+        self._sample_rate = 16000
+        self.speech_seconds = 0.0
+        self.silence_seconds = 0.0
+
+    def start(self, sample_rate: int) -> None:
+        self._sample_rate = sample_rate
+        self.speech_seconds = 0.0
+        self.silence_seconds = 0.0
+
+    def _advance(self, audio_chunk: np.ndarray, is_speech: bool) -> float:
+        """Update the speech and trailing silence totals; returns the chunk duration"""
+        seconds = len(audio_chunk) / self._sample_rate
+        if is_speech:
+            self.speech_seconds += seconds
+            self.silence_seconds = 0.0
+        else:
+            self.silence_seconds += seconds
+        return seconds
+
+    @abstractmethod
+    def update(self,
+               audio_chunk: np.ndarray,
+               speech_prob: float,
+               is_speech: bool,
+               partial: Optional[str] = None) -> bool:
+        """True when the utterance has ended"""
+        pass
+
+class FixedSilenceEndpointer(Endpointer):
+    """End of utterance after a fixed amount of trailing silence"""
+
+    def __init__(self, silence_seconds: float = 1.0):
+        super().__init__()
+        self.required_silence = silence_seconds
+
+    def update(self,
+               audio_chunk: np.ndarray,
+               speech_prob: float,
+               is_speech: bool,
+               partial: Optional[str] = None) -> bool:
+        self._advance(audio_chunk, is_speech)
+        return self.silence_seconds > self.required_silence
+
+class AdaptiveEndpointer(Endpointer):
+    """End of utterance after a trailing silence between `min_silence` and `max_silence`.
+
+    The silence needed is recomputed at every chunk from how likely the pause is to
+    be the end of the turn (each cue scores 0 for "finished" and 1 for "still going"):
+    - VAD: mean speech probability of the pause relative to the threshold; a pause
+      that keeps hovering near it is a hesitation or a breath
+    - energy: level of the pause against the speech level; a small drop means
+      trailing off or background talk
+    - length: utterances shorter than `short_speech` are often false starts
+    - transcript: the partial transcript ending with terminal punctuation, or with a
+      comma, ellipsis or dash; without a transcript the cue is neutral
+    """
+
+    _TERMINAL = re.compile(r'[.!?…]["\')\]]*$')
+    _CONTINUATION = re.compile(r'(,|;|:|-|\.\.\.|…)$')
+
+    def __init__(self,
+                 min_silence: float = 0.3,
+                 max_silence: float = 1.0,
+                 threshold: float = 0.5,
+                 short_speech: float = 0.4,
+                 clear_drop_db: float = 25.0,
+                 weights: tuple[float, float, float, float] = (0.35, 0.25, 0.15, 0.25)):
+        super().__init__()
+        if not 0.0 <= min_silence <= max_silence:
+            raise ValueError("Expected 0 <= min_silence <= max_silence")
+        self.min_silence = min_silence
+        self.max_silence = max_silence
+        self.threshold = threshold
+        self.short_speech = short_speech
+        self.clear_drop_db = clear_drop_db
+        total = sum(weights)
+        self.weights = tuple(w / total for w in weights)
+        self.required_silence = max_silence
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._speech_db = 0.0
+        self._speech_chunks = 0
+        self._pause_db = 0.0
+        self._pause_prob = 0.0
+        self._pause_chunks = 0
+
+    def start(self, sample_rate: int) -> None:
+        super().start(sample_rate)
+        self.required_silence = self.max_silence
+        self._reset_stats()
+
+    def _transcript_score(self, partial: Optional[str]) -> float:
+        text = (partial or "").rstrip()
+        if not text:
+            return 0.5
+        if self._CONTINUATION.search(text):
+            return 1.0
+        if self._TERMINAL.search(text):
+            return 0.0
+        return 0.5
+
+    def patience(self, partial: Optional[str] = None) -> float:
+        """0 when every cue says the turn is over, 1 when none does"""
+        vad_score = min(self._pause_prob / self.threshold, 1.0) if self.threshold > 0 else 0.0
+        # Below ~6 dB the pause is as loud as the speech; past clear_drop_db it is clean silence
+        drop = self._speech_db - self._pause_db
+        energy_score = 1.0 - min(max((drop - 6.0) / (self.clear_drop_db - 6.0), 0.0), 1.0)
+        length_score = 1.0 if self.speech_seconds < self.short_speech else 0.0
+        w_vad, w_energy, w_length, w_text = self.weights
+        return (w_vad * vad_score + w_energy * energy_score
+                + w_length * length_score + w_text * self._transcript_score(partial))
+
+    def update(self,
+               audio_chunk: np.ndarray,
+               speech_prob: float,
+               is_speech: bool,
+               partial: Optional[str] = None) -> bool:
+        self._advance(audio_chunk, is_speech)
+        level = chunk_db(audio_chunk)
+        if is_speech:
+            # Running mean of the speech level; each pause starts from scratch
+            self._speech_chunks += 1
+            self._speech_db += (level - self._speech_db) / self._speech_chunks
+            self._pause_db = self._pause_prob = 0.0
+            self._pause_chunks = 0
+            return False
+
+        self._pause_chunks += 1
+        self._pause_db += (level - self._pause_db) / self._pause_chunks
+        self._pause_prob += (speech_prob - self._pause_prob) / self._pause_chunks
+        self.required_silence = self.min_silence + (self.max_silence - self.min_silence) * self.patience(partial)
+        return self.silence_seconds >= self.required_silence
@@ -0,0 +1,198 @@
+# core/long_form.py
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import numpy as np
+from providers.base import TranscriptionProvider, VADProvider
+from core.metrics import Metrics
+
+def _words(text: str) -> list[str]:
+    """Lower case words without punctuation, for matching only"""
+    return [re.sub(r"[^\w']", "", word.lower()) for word in text.split()]
+
+def merge_overlap(left: str, right: str, max_words: int = 10, min_match: int = 2) -> str:
+    """Join the transcripts of two windows whose audio overlaps.
+
+    The longest run of words shared by the last `max_words` of `left` and the first
+    `max_words` of `right` is the overlap: it is kept once, and the words each window
+    decoded past it (near its cut edge, where words are clipped) are dropped. Ties go
+    to the earliest run, so the result only depends on the two texts. Without a run of
+    at least `min_match` words the texts are concatenated.
+    """
+    a, b = left.split(), right.split()
+    if not a or not b:
+        return " ".join(a + b)
+    offset = max(len(a) - max_words, 0)
+    tail, head = _words(" ".join(a[offset:])), _words(" ".join(b[:max_words]))
+
+    # Longest common substring over words
+    length, end_a, end_b = 0, 0, 0
+    previous = [0] * (len(head) + 1)
+    for i in range(1, len(tail) + 1):
+        current = [0] * (len(head) + 1)
+        for j in range(1, len(head) + 1):
+            if tail[i - 1] and tail[i - 1] == head[j - 1]:
+                current[j] = previous[j - 1] + 1
+                if current[j] > length:
+                    length, end_a, end_b = current[j], i, j
+        previous = current
+
+    if length < min_match:
+        return " ".join(a + b)
+    return " ".join(a[:offset + end_a] + b[end_b:])
+
+class LongFormTranscriber(TranscriptionProvider):
+    """Transcribes utterances longer than one Whisper window.
+
+    Audio up to `max_window_seconds` goes to the transcriber as it is. Longer audio is
+    cut into windows at the latest pause the VAD finds before each window's limit (at
+    least `min_pause_seconds` of non-speech, cut in the middle); where there is no
+    pause, or no VAD, the window is cut at the limit and the next one starts
+    `overlap_seconds` earlier, and the two texts are joined with merge_overlap().
+    Windows are decoded `batch_size` at a time with transcribe_batch(), or on a pool
+    of `workers` threads for transcribers that decode in parallel.
+    """
+
+    def __init__(self,
+                 transcriber: TranscriptionProvider,
+                 vad: Optional[VADProvider] = None,
+                 sample_rate: int = 16000,
+                 chunk_size: int = 512,
+                 max_window_seconds: float = 28.0,
+                 overlap_seconds: float = 2.0,
+                 min_pause_seconds: float = 0.3,
+                 batch_size: int = 8,
+                 workers: int = 1,
+                 vad_batch_chunks: int = 32,
+                 metrics: Optional[Metrics] = None):
+        self.transcriber = transcriber
+        # Own stream state: the VAD runs on the transcription thread, not the capture loop
+        self.vad = vad
+        self.vad_threshold = getattr(vad, "threshold", 0.5)
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.max_window = int(max_window_seconds * sample_rate)
+        self.overlap = int(overlap_seconds * sample_rate)
+        self.min_pause_chunks = max(int(min_pause_seconds * sample_rate / chunk_size), 1)
+        self.vad_batch_chunks = vad_batch_chunks
+        # Words that can fall in the overlap, with a margin
+        self.merge_words = max(int(overlap_seconds * 5), 6)
+        self.batch_size = batch_size
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="long-form") if workers > 1 else None
+        self.metrics = metrics if metrics is not None else Metrics()
+
+    def find_pauses(self, audio: np.ndarray) -> list[int]:
+        """Sample positions in the middle of every long enough non-speech run"""
+        if self.vad is None:
+            return []
+        n_chunks = len(audio) // self.chunk_size
+        chunks = audio[:n_chunks * self.chunk_size].reshape(n_chunks, self.chunk_size)
+        self.vad.reset_states()
+        # In short calls: a VAD worker process shared with the capture loop serves one
+        # call at a time, and minutes of audio in one call would stall live capture
+        probs = [
+            self.vad.speech_probs(chunks[i:i + self.vad_batch_chunks], self.sample_rate)
+            for i in range(0, n_chunks, self.vad_batch_chunks)
+        ]
+        is_speech = np.concatenate(probs) > self.vad_threshold if probs else np.zeros(0, dtype=bool)
+        self.vad.reset_states()
+
+        pauses = []
+        run_start = None
+        for i, speech in enumerate(np.append(is_speech, True)):
+            if not speech and run_start is None:
+                run_start = i
+            elif speech and run_start is not None:
+                if i - run_start >= self.min_pause_chunks:
+                    pauses.append((run_start + i) * self.chunk_size // 2)
+                run_start = None
+        return pauses
+
+    def split(self, audio: np.ndarray) -> list[tuple[int, int]]:
+        """(start, end) samples of each window; a window starting before the previous
+        one ends overlaps it"""
+        pauses = self.find_pauses(audio) if len(audio) > self.max_window else []
+        windows = []
+        start = 0
+        while len(audio) - start > self.max_window:
+            limit = start + self.max_window
+            # Cuts in the first half would only make more windows
+            cuts = [p for p in pauses if start + self.max_window // 2 <= p <= limit]
+            if cuts:
+                windows.append((start, cuts[-1]))
+                start = cuts[-1]
+            else:
+                windows.append((start, limit))
+                start = limit - self.overlap
+        windows.append((start, len(audio)))
+        return windows
+
+    def _decode(self, windows: list[np.ndarray], cancel: Optional[threading.Event] = None) -> Optional[list[str]]:
+        texts = []
+        for i in range(0, len(windows), self.batch_size):
+            if cancel is not None and cancel.is_set():
+                return None
+            group = windows[i:i + self.batch_size]
+            if self._pool is not None:
+                texts.extend(self._pool.map(self.transcriber.transcribe, group))
+            else:
+                texts.extend(self.transcriber.transcribe_batch(group))
+        return texts
+
+    def _transcribe(self, audio_data: np.ndarray, cancel: Optional[threading.Event] = None,
+                    detect_language: bool = False) -> tuple[Optional[str], Optional[str]]:
+        with self.metrics.timer("long_form_split"):
+            bounds = self.split(audio_data)
+        self.metrics.increment("long_form_utterances")
+        self.metrics.increment("long_form_windows", len(bounds))
+        windows = [audio_data[start:end] for start, end in bounds]
+        language = None
+        if detect_language:
+            # The first window tells the language; the others are decoded as usual
+            first, language = self.transcriber.transcribe_with_language(windows[0])
+            rest = self._decode(windows[1:], cancel)
+            texts = None if rest is None else [first] + rest
+        else:
+            texts = self._decode(windows, cancel)
+        if texts is None:
+            return None, None
+
+        text = texts[0]
+        for (start, _), (_, previous_end), next_text in zip(bounds[1:], bounds, texts[1:]):
+            if start < previous_end:
+                text = merge_overlap(text, next_text, self.merge_words)
+            else:
+                text = " ".join(filter(None, (text, next_text)))
+        return text.strip(), language
+
+    def transcribe(self, audio_data: np.ndarray) -> str:
+        if len(audio_data) <= self.max_window:
+            return self.transcriber.transcribe(audio_data)
+        return self._transcribe(audio_data)[0] or ""
+
+    def transcribe_with_language(self, audio_data: np.ndarray) -> tuple[str, Optional[str]]:
+        if len(audio_data) <= self.max_window:
+            return self.transcriber.transcribe_with_language(audio_data)
+        text, language = self._transcribe(audio_data, detect_language=True)
+        return text or "", language
+
+    def transcribe_cancellable(self, audio_data: np.ndarray, cancel: threading.Event) -> Optional[str]:
+        """Checked between batches of windows"""
+        if len(audio_data) <= self.max_window:
+            return self.transcriber.transcribe_cancellable(audio_data, cancel)
+        text, _ = self._transcribe(audio_data, cancel)
+        return None if cancel.is_set() else text
+
+    def transcribe_batch(self, audio_batch: list[np.ndarray]) -> list[str]:
+        return [self.transcribe(audio_data) for audio_data in audio_batch]
+
+    def warmup(self) -> None:
+        self.transcriber.warmup()
+
+    def cleanup(self) -> None:
+        """The wrapped transcriber belongs to the caller"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        if self.vad is not None:
+            self.vad.cleanup()
@@ -0,0 +1,237 @@
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Iterator, Optional
+
+class Histogram:
+    """Latency histogram with fixed log-spaced buckets.
+
+    Recording is a bisect and an increment, with no allocation, so it can stay on in
+    the per-chunk hot path. Percentiles are accurate to the bucket width (~12% with
+    the default 20 buckets per decade).
+    """
+
+    def __init__(self, min_value: float = 1e-5, max_value: float = 100.0, buckets_per_decade: int = 20):
+        decades = math.log10(max_value / min_value)
+        n = int(math.ceil(decades * buckets_per_decade))
+        self.bounds = [min_value * 10 ** (i / buckets_per_decade) for i in range(n + 1)]
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (0 < q <= 100)"""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+class Metrics:
+    """In-process registry of stage timers, counters, model load times and per-turn traces"""
+
+    def __init__(self, enabled: bool = True, max_traces: int = 1000):
+        self.enabled = enabled
+        self._histograms: dict[str, Histogram] = {}
+        self._counters: dict[str, float] = {}
+        self._load_times: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self.time_to_ready: Optional[float] = None
+        self._traces: deque = deque(maxlen=max_traces)
+        self._trace_seq = 0
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def observe(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time a block into the `name` histogram"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def counter(self, name: str) -> float:
+        return self._counters.get(name, 0)
+
+    def counters(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Current value of a level, e.g. memory in use"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def gauges(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._gauges)
+
+    @contextmanager
+    def load_timer(self, model: str) -> Iterator[None]:
+        """Time a model load"""
+        start = perf_counter()
+        yield
+        self.record_load(model, perf_counter() - start)
+
+    def record_load(self, model: str, seconds: float) -> None:
+        with self._lock:
+            self._load_times[model] = seconds
+
+    def record_ready(self, seconds: float) -> None:
+        """Time from process start until the assistant can take the first utterance"""
+        self.time_to_ready = seconds
+
+    def record_trace(self, record: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._trace_seq += 1
+            self._traces.append((self._trace_seq, record))
+
+    def traces_since(self, seq: int) -> tuple[int, list[dict[str, Any]]]:
+        """Trace records newer than `seq`, with the sequence number of the last one"""
+        with self._lock:
+            records = [record for n, record in self._traces if n > seq]
+            return self._trace_seq, records
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            histograms = dict(self._histograms)
+            load_times = dict(self._load_times)
+        return {
+            "timestamp": time.time(),
+            "stages": {name: h.snapshot() for name, h in histograms.items()},
+            "counters": self.counters(),
+            "gauges": self.gauges(),
+            "model_load_seconds": load_times,
+            "time_to_ready_seconds": self.time_to_ready,
+        }
+
+    def to_prometheus(self, prefix: str = "voice_assistant") -> str:
+        """Render the registry in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent in each pipeline stage",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, values in sorted(snapshot["stages"].items()):
+            for quantile in ("p50", "p95", "p99"):
+                lines.append(
+                    f'{prefix}_stage_seconds{{stage="{stage}",quantile="0.{quantile[1:]}"}} {values[quantile]:.6g}'
+                )
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {values["sum"]:.6g}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {values["count"]}')
+
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value:.6g}")
+
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value:.6g}")
+
+        lines.append(f"# HELP {prefix}_model_load_seconds Time taken to load each model")
+        lines.append(f"# TYPE {prefix}_model_load_seconds gauge")
+        for model, seconds in sorted(snapshot["model_load_seconds"].items()):
+            lines.append(f'{prefix}_model_load_seconds{{model="{model}"}} {seconds:.6g}')
+        if snapshot["time_to_ready_seconds"] is not None:
+            lines.append(f"# HELP {prefix}_time_to_ready_seconds Time from process start to ready")
+            lines.append(f"# TYPE {prefix}_time_to_ready_seconds gauge")
+            lines.append(f"{prefix}_time_to_ready_seconds {snapshot['time_to_ready_seconds']:.6g}")
+        return "\n".join(lines) + "\n"
+
+class MetricsExporter:
+    """Periodically appends snapshots and new turn traces to a JSONL file and rewrites
+    a Prometheus text-format file (for node_exporter's textfile collector)"""
+
+    def __init__(self,
+                 metrics: Metrics,
+                 jsonl_path: Optional[str] = None,
+                 prometheus_path: Optional[str] = None,
+                 interval: float = 10.0):
+        self.metrics = metrics
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.interval = interval
+        self._trace_seq = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="metrics-exporter", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.export()
+
+    def export(self) -> None:
+        try:
+            if self.jsonl_path:
+                self._trace_seq, traces = self.metrics.traces_since(self._trace_seq)
+                with open(self.jsonl_path, "a") as f:
+                    for trace in traces:
+                        f.write(json.dumps({"type": "turn", **trace}) + "\n")
+                    f.write(json.dumps({"type": "snapshot", **self.metrics.snapshot()}) + "\n")
+            if self.prometheus_path:
+                # Write then rename, so scrapers never read a partial file
+                tmp_path = self.prometheus_path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    f.write(self.metrics.to_prometheus())
+                os.replace(tmp_path, self.prometheus_path)
+        except OSError as e:
+            print(f"Error exporting metrics: {e}")
+
+    def stop(self) -> None:
+        """Stop the exporter and write a final export"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.export()
@@ -0,0 +1,250 @@
+# core/process_stage.py
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from time import perf_counter
+from typing import Any, Callable, Optional
+import numpy as np
+from core.metrics import Metrics
+
+@dataclass(frozen=True)
+class StageBudget:
+    """Cores and threads of one pipeline stage"""
+    # Cores the stage may run on (Linux only); empty for all of them
+    cpus: tuple[int, ...] = ()
+    # Threads of torch, OpenMP and BLAS; 0 keeps the library default
+    threads: int = 0
+
+def apply_budget(budget: StageBudget) -> None:
+    """Pin the current process to the budget's cores and cap its math thread pools.
+
+    Call it before the libraries are imported: the environment variables are read when
+    their thread pools start. torch, if already imported, is capped directly.
+    """
+    if budget.cpus and hasattr(os, "sched_setaffinity"):
+        cpus = {cpu for cpu in budget.cpus if cpu < (os.cpu_count() or 1)}
+        if cpus:
+            os.sched_setaffinity(0, cpus)
+        else:
+            print(f"None of the cores {budget.cpus} exists: affinity left unchanged")
+    if budget.threads > 0:
+        for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ[variable] = str(budget.threads)
+        if "torch" in sys.modules:
+            sys.modules["torch"].set_num_threads(budget.threads)
+
+class SharedAudio:
+    """float32 samples in a multiprocessing.shared_memory block.
+
+    The creating process owns the block and unlinks it on close; worker processes
+    attach to it by name.
+    """
+
+    def __init__(self, samples: int = 0, name: Optional[str] = None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(samples, 1) * 4)
+        else:
+            self.shm = _attach(name)
+        self.array = np.ndarray((self.shm.size // 4,), dtype=np.float32, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self, unlink: bool = False) -> None:
+        # The array exports the buffer, which must be released first
+        self.array = np.empty(0, dtype=np.float32)
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach without tracking the block here; before Python 3.13 workers share their
+    parent's resource tracker, which only counts the block once"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+@dataclass(frozen=True)
+class _Shared:
+    """An array argument, passed as its place in the shared block"""
+    offset: int
+    shape: tuple[int, ...]
+
+# A threading.Event argument; the worker gets the stage's cancel event instead
+_CANCEL = "__cancel__"
+
+class StageCrashed(RuntimeError):
+    """The worker process died or hung during a call; it has been restarted"""
+
+class StageWorker:
+    """A provider running in a worker process of its own.
+
+    `builder` (a picklable top-level function, or a functools.partial of one) creates the
+    provider in the worker, after `budget` has been applied there. `call(method, *args)`
+    runs a method of the provider: numpy arguments (and lists of them) are copied into a
+    shared memory block of `buffer_samples` float32 samples, and only their offsets and
+    shapes go through the request queue; results come back pickled, so they should be
+    small. A threading.Event argument is mirrored by a process-wide event the worker
+    sees. Calls are serialized.
+
+    While waiting, the caller checks that the worker is alive: if it dies, or a call
+    exceeds `call_timeout`, the worker is killed if needed, started again (rebuilding the
+    provider) and the call raises StageCrashed. Restarts are counted in `restarts` and in
+    the "<name>_restarts" counter.
+    """
+
+    def __init__(self,
+                 name: str,
+                 builder: Callable[[], Any],
+                 budget: StageBudget = StageBudget(),
+                 buffer_samples: int = 16000 * 300,
+                 call_timeout: Optional[float] = 120.0,
+                 start_timeout: float = 600.0,
+                 metrics: Optional[Metrics] = None):
+        self.name = name
+        self.builder = builder
+        self.budget = budget
+        self.call_timeout = call_timeout
+        self.start_timeout = start_timeout
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.restarts = 0
+        # spawn: a fork of a process with torch and audio threads is not safe
+        self._context = multiprocessing.get_context("spawn")
+        self.audio = SharedAudio(buffer_samples)
+        self._cancel = self._context.Event()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._closed = False
+        self._start()
+
+    def _start(self) -> None:
+        # New queues: a worker that died while using them may have left them locked
+        self._requests = self._context.Queue()
+        self._responses = self._context.Queue()
+        self.process = self._context.Process(
+            target=_serve,
+            args=(self.builder, self.budget, self.audio.name, self._requests, self._responses, self._cancel),
+            name=f"{self.name}-stage",
+            daemon=True
+        )
+        self.process.start()
+        self._wait(0, self.start_timeout, None)
+
+    def _restart(self, reason: str) -> None:
+        print(f"{self.name} worker {reason}: restarting it")
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.restarts += 1
+        self.metrics.increment(f"{self.name}_restarts")
+        self._start()
+
+    def _pack(self, args: tuple) -> tuple[tuple, Optional[threading.Event]]:
+        offset = 0
+        cancel = None
+
+        def place(array: np.ndarray) -> _Shared:
+            nonlocal offset
+            array = np.asarray(array, dtype=np.float32)
+            if offset + array.size > len(self.audio.array):
+                raise ValueError(f"{self.name}: {offset + array.size} samples exceed the shared buffer")
+            self.audio.array[offset:offset + array.size].reshape(array.shape)[...] = array
+            shared = _Shared(offset, array.shape)
+            offset += array.size
+            return shared
+
+        packed = []
+        for arg in args:
+            if isinstance(arg, np.ndarray):
+                packed.append(place(arg))
+            elif isinstance(arg, list) and arg and all(isinstance(item, np.ndarray) for item in arg):
+                packed.append([place(item) for item in arg])
+            elif isinstance(arg, threading.Event):
+                cancel = arg
+                packed.append(_CANCEL)
+            else:
+                packed.append(arg)
+        return tuple(packed), cancel
+
+    def _wait(self, seq: int, timeout: Optional[float], cancel: Optional[threading.Event]) -> Any:
+        deadline = None if timeout is None else perf_counter() + timeout
+        while True:
+            try:
+                reply_seq, ok, result = self._responses.get(timeout=0.05)
+            except queue.Empty:
+                if cancel is not None and cancel.is_set():
+                    self._cancel.set()
+                if not self.process.is_alive():
+                    reason = f"exited with code {self.process.exitcode}"
+                elif deadline is not None and perf_counter() > deadline:
+                    reason = "timed out"
+                else:
+                    continue
+                if seq == 0:
+                    raise RuntimeError(f"{self.name} worker {reason} while starting")
+                self._restart(reason)
+                raise StageCrashed(f"{self.name} worker {reason}")
+            if reply_seq != seq:
+                continue
+            if not ok:
+                raise RuntimeError(f"{self.name} worker: {result}")
+            return result
+
+    def call(self, method: str, *args: Any) -> Any:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} worker is closed")
+            packed, cancel = self._pack(args)
+            self._seq += 1
+            self._cancel.clear()
+            self._requests.put((self._seq, method, packed))
+            return self._wait(self._seq, self.call_timeout, cancel)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._requests.put(None)
+            self.process.join(timeout=5.0)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+            self.audio.close(unlink=True)
+
+def _serve(builder: Callable[[], Any], budget: StageBudget, audio_name: str,
+           requests, responses, cancel) -> None:
+    """Worker process: build the provider, then run requests until None arrives"""
+    apply_budget(budget)
+    provider = builder()
+    apply_budget(StageBudget(threads=budget.threads))
+    audio = SharedAudio(name=audio_name)
+
+    def unpack(arg: Any) -> Any:
+        if isinstance(arg, _Shared):
+            size = int(np.prod(arg.shape))
+            return audio.array[arg.offset:arg.offset + size].reshape(arg.shape)
+        if isinstance(arg, list):
+            return [unpack(item) for item in arg]
+        if isinstance(arg, str) and arg == _CANCEL:
+            return cancel
+        return arg
+
+    responses.put((0, True, None))
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        seq, method, args = message
+        try:
+            result = getattr(provider, method)(*[unpack(arg) for arg in args])
+            responses.put((seq, True, result))
+        except Exception as e:
+            responses.put((seq, False, repr(e)))
+    audio.close()
@@ -0,0 +1,34 @@
+# core/protocol.py
+"""Framing of the assistant server protocol.
+
+Every frame is a 1-byte type, a 4-byte big-endian payload length and the payload.
+The client opens with HELLO, then streams AUDIO (little-endian 16-bit mono PCM at the
+sample rate announced by the server) and ends with BYE. The server answers with EVENT
+frames (JSON objects with a "type") and AUDIO frames carrying the spoken reply at the
+sample rate of the preceding "speech" event.
+"""
+import asyncio
+import json
+import struct
+from typing import Any
+
+HELLO = b"H"
+AUDIO = b"A"
+EVENT = b"E"
+BYE = b"B"
+
+MAX_PAYLOAD = 1 << 20
+_HEADER = struct.Struct(">cI")
+
+def encode_frame(kind: bytes, payload: bytes = b"") -> bytes:
+    return _HEADER.pack(kind, len(payload)) + payload
+
+def encode_json(kind: bytes, **fields: Any) -> bytes:
+    return encode_frame(kind, json.dumps(fields).encode("utf-8"))
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[bytes, bytes]:
+    """Next (type, payload); raises asyncio.IncompleteReadError at end of stream"""
+    kind, size = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if size > MAX_PAYLOAD:
+        raise ValueError(f"Frame of {size} bytes exceeds the {MAX_PAYLOAD} byte limit")
+    return kind, await reader.readexactly(size)
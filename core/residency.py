@@ -0,0 +1,317 @@
+# core/residency.py
+import collections
+import ctypes
+import ctypes.util
+import gc
+import itertools
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import monotonic, perf_counter
+from typing import Any, Callable, Iterator, Optional
+from core.metrics import Metrics
+
+MB = 1024 * 1024
+
+def process_rss_bytes() -> int:
+    """Resident memory of this process (peak RSS where the current one can't be read)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Bytes on macOS, kilobytes on Linux
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def tensor_bytes(obj: Any, depth: int = 3) -> int:
+    """Bytes of the torch parameters and buffers reachable from `obj`'s attributes"""
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return 0
+    seen: set[int] = set()
+    total = 0
+
+    def visit(value: Any, level: int) -> None:
+        nonlocal total
+        if id(value) in seen:
+            return
+        seen.add(id(value))
+        if isinstance(value, torch.nn.Module):
+            for tensor in itertools.chain(value.parameters(), value.buffers()):
+                if id(tensor) not in seen:
+                    seen.add(id(tensor))
+                    total += tensor.numel() * tensor.element_size()
+        elif level > 0 and hasattr(value, "__dict__"):
+            for attribute in vars(value).values():
+                visit(attribute, level - 1)
+
+    visit(obj, depth)
+    return total
+
+def release_memory() -> None:
+    """Collect the unloaded models and give their memory back: allocator caches of the
+    accelerators, and freed heap pages to the OS (glibc)"""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        mps = getattr(torch, "mps", None)
+        if mps is not None and torch.backends.mps.is_available():
+            mps.empty_cache()
+    if sys.platform.startswith("linux"):
+        try:
+            ctypes.CDLL(ctypes.util.find_library("c")).malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+@dataclass
+class _Entry:
+    name: str
+    builder: Callable[[], Any]
+    pinned: bool
+    model: Any = None
+    footprint: int = 0
+    loads: int = 0
+    unloads: int = 0
+    last_reload_seconds: Optional[float] = None
+    in_use: int = 0
+    last_used: float = 0.0
+    uses: collections.deque = field(default_factory=collections.deque)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+class ModelResidencyManager:
+    """Loads models on demand and unloads the ones nobody is using.
+
+    Each model is registered with a builder; use(name) yields the loaded model, loading
+    it first if it was unloaded (a reload also runs its warmup()). A model unused for
+    `idle_seconds` is unloaded by a background thread with its cleanup(). After each
+    load, while the loaded models' footprints exceed `budget_mb`, the least recently
+    used ones are unloaded. Models in use and pinned models are never unloaded. A model
+    is pinned when it was registered with pinned=True, or while it has been used at
+    least `pin_after_uses` times in the last `idle_seconds`.
+
+    A footprint is the size of the model's torch tensors, or else the growth of the
+    process RSS during its load (an estimate when other models load at the same time).
+    0 for `budget_mb` or `idle_seconds` disables that limit.
+    """
+
+    def __init__(self,
+                 budget_mb: float = 0,
+                 idle_seconds: float = 600.0,
+                 pin_after_uses: int = 0,
+                 check_interval: float = 10.0,
+                 metrics: Optional[Metrics] = None):
+        self.budget = int(budget_mb * MB)
+        self.idle_seconds = idle_seconds
+        self.pin_after_uses = pin_after_uses
+        self.check_interval = check_interval
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._reap, name="model-residency", daemon=True)
+        self._thread.start()
+
+    def register(self, name: str, builder: Callable[[], Any], pinned: bool = False, load: bool = True) -> None:
+        with self._lock:
+            if name in self._entries:
+                raise ValueError(f"Model {name!r} is already registered")
+            entry = self._entries[name] = _Entry(name, builder, pinned)
+        if load:
+            with entry.lock:
+                self._load(entry)
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(name, None)
+        if entry is not None:
+            with entry.lock:
+                self._unload(entry)
+
+    def pin(self, name: str, pinned: bool = True) -> None:
+        self._entries[name].pinned = pinned
+
+    def unload(self, name: str) -> bool:
+        """Unload the model now unless it is in use; it stays registered"""
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.model is None or entry.in_use:
+                return False
+            self._unload(entry)
+            return True
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.model is not None
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Any]:
+        """The loaded model, kept loaded until the block ends"""
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.model is None:
+                self._load(entry)
+            entry.in_use += 1
+            entry.last_used = monotonic()
+            # Only the last pin_after_uses uses matter: whether they all fall in the
+            # last idle_seconds. Pinned entries need no history
+            if self.pin_after_uses and not entry.pinned:
+                self._prune_uses(entry, entry.last_used)
+                if len(entry.uses) >= self.pin_after_uses:
+                    entry.uses.popleft()
+                entry.uses.append(entry.last_used)
+        try:
+            yield entry.model
+        finally:
+            with entry.lock:
+                entry.in_use -= 1
+                entry.last_used = monotonic()
+
+    def _is_pinned(self, entry: _Entry, now: float) -> bool:
+        if entry.pinned:
+            return True
+        if not self.pin_after_uses:
+            return False
+        self._prune_uses(entry, now)
+        return len(entry.uses) >= self.pin_after_uses
+
+    def _prune_uses(self, entry: _Entry, now: float) -> None:
+        while entry.uses and now - entry.uses[0] > self.idle_seconds:
+            entry.uses.popleft()
+
+    def _load(self, entry: _Entry) -> None:
+        """With entry.lock held"""
+        reload = entry.loads > 0
+        rss = process_rss_bytes()
+        start = perf_counter()
+        model = entry.builder()
+        warm = getattr(model, "warmup", None)
+        if reload and warm is not None:
+            warm()
+        seconds = perf_counter() - start
+        entry.footprint = tensor_bytes(model) or max(process_rss_bytes() - rss, 0)
+        entry.model = model
+        entry.loads += 1
+        entry.last_used = monotonic()
+        self.metrics.increment("model_loads")
+        self.metrics.record_load(entry.name, seconds)
+        if reload:
+            entry.last_reload_seconds = seconds
+            self.metrics.observe("model_reload", seconds)
+            print(f"Reloaded {entry.name} in {seconds:.2f}s")
+        self._enforce_budget(entry)
+        self._update_gauges()
+
+    def _unload(self, entry: _Entry) -> None:
+        """With entry.lock held"""
+        if entry.model is None:
+            return
+        model, entry.model = entry.model, None
+        try:
+            model.cleanup()
+        except Exception as e:
+            print(f"Error unloading {entry.name}: {e}")
+        del model
+        release_memory()
+        entry.unloads += 1
+        self.metrics.increment("model_unloads")
+        self._update_gauges()
+
+    def _evictable(self, now: float, exclude: Optional[_Entry] = None) -> list[_Entry]:
+        """Loaded models that may be unloaded, least recently used first"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return sorted(
+            (entry for entry in entries
+             if entry is not exclude and entry.model is not None and entry.in_use == 0
+             and not self._is_pinned(entry, now)),
+            key=lambda entry: entry.last_used
+        )
+
+    def _try_unload(self, entry: _Entry, idle_before: Optional[float] = None) -> bool:
+        # Never wait for another model's lock: its owner may be loading and evicting too
+        if not entry.lock.acquire(blocking=False):
+            return False
+        try:
+            if entry.model is None or entry.in_use:
+                return False
+            if idle_before is not None and entry.last_used > idle_before:
+                return False
+            self._unload(entry)
+            return True
+        finally:
+            entry.lock.release()
+
+    def _enforce_budget(self, loaded: _Entry) -> None:
+        if not self.budget:
+            return
+        for victim in self._evictable(monotonic(), exclude=loaded):
+            if self.resident_bytes <= self.budget:
+                return
+            if self._try_unload(victim):
+                self.metrics.increment("model_evictions")
+                print(f"Unloaded {victim.name} to stay within the memory budget")
+        if self.resident_bytes > self.budget:
+            self.metrics.increment("model_budget_exceeded")
+
+    def _reap(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            if not self.idle_seconds:
+                continue
+            now = monotonic()
+            for entry in self._evictable(now):
+                if now - entry.last_used >= self.idle_seconds and self._try_unload(entry, now - self.idle_seconds):
+                    print(f"Unloaded {entry.name} after {self.idle_seconds:.0f}s idle")
+            self._update_gauges()
+
+    @property
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.footprint for entry in self._entries.values() if entry.model is not None)
+
+    def _update_gauges(self) -> None:
+        with self._lock:
+            resident = [entry for entry in self._entries.values() if entry.model is not None]
+        self.metrics.set_gauge("process_rss_mb", process_rss_bytes() / MB)
+        self.metrics.set_gauge("resident_models", len(resident))
+        self.metrics.set_gauge("resident_models_mb", sum(entry.footprint for entry in resident) / MB)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Process RSS, budget and, per model, residency, footprint, loads and reload latency"""
+        now = monotonic()
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "rss_mb": process_rss_bytes() / MB,
+            "budget_mb": self.budget / MB,
+            "resident_mb": self.resident_bytes / MB,
+            "models": {
+                entry.name: {
+                    "resident": entry.model is not None,
+                    "pinned": self._is_pinned(entry, now),
+                    "footprint_mb": entry.footprint / MB,
+                    "loads": entry.loads,
+                    "unloads": entry.unloads,
+                    "last_reload_seconds": entry.last_reload_seconds,
+                    "idle_seconds": now - entry.last_used,
+                }
+                for entry in entries
+            },
+        }
+
+    def close(self) -> None:
+        """Stop the idle check and unload every model"""
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+        for name in list(self._entries):
+            self.unregister(name)
@@ -0,0 +1,160 @@
+import select
+import socket
+from typing import Optional
+import numpy as np
+
+class AudioRingBuffer:
+    """Fixed-capacity float32 buffer for utterance capture.
+
+    Audio is always written in place, so the samples preceding speech onset are still
+    available as pre-roll. Every sample is stored twice, at i and i + capacity, which
+    makes any window of up to `capacity` samples contiguous: the utterance is returned
+    as a view, without concatenating chunks.
+    """
+
+    def __init__(self, sample_rate: int, max_utterance_seconds: float = 30.0,
+                 pre_roll_seconds: float = 0.3):
+        self.sample_rate = sample_rate
+        self.pre_roll = int(pre_roll_seconds * sample_rate)
+        self.capacity = int(max_utterance_seconds * sample_rate) + self.pre_roll
+        self._buffer = np.zeros(2 * self.capacity, dtype=np.float32)
+        # Total number of samples written; positions are absolute
+        self._written = 0
+        self._start: Optional[int] = None
+
+    @property
+    def is_recording(self) -> bool:
+        return self._start is not None
+
+    @property
+    def utterance_length(self) -> int:
+        """Samples in the current utterance, pre-roll included"""
+        return 0 if self._start is None else self._written - self._start
+
+    @property
+    def space_left(self) -> int:
+        """Samples that can still be added before the utterance hits its maximum length"""
+        return self.capacity - self.utterance_length
+
+    def write(self, chunk: np.ndarray) -> None:
+        n = len(chunk)
+        if n > self.capacity:
+            raise ValueError(f"Chunk of {n} samples exceeds buffer capacity {self.capacity}")
+        if self.is_recording and n > self.space_left:
+            raise OverflowError("Utterance exceeds the maximum length")
+
+        pos = self._written % self.capacity
+        first = min(n, self.capacity - pos)
+        self._buffer[pos:pos + first] = chunk[:first]
+        self._buffer[pos + self.capacity:pos + self.capacity + first] = chunk[:first]
+        if first < n:
+            rest = n - first
+            self._buffer[:rest] = chunk[first:]
+            self._buffer[self.capacity:self.capacity + rest] = chunk[first:]
+        self._written += n
+
+    def start_utterance(self) -> None:
+        """Mark speech onset; the utterance starts with up to `pre_roll` earlier samples"""
+        self._start = max(self._written - self.pre_roll, 0)
+
+    def view(self) -> np.ndarray:
+        """Contiguous view of the current utterance, valid until the next write"""
+        if self._start is None:
+            return self._buffer[:0]
+        start = self._start % self.capacity
+        return self._buffer[start:start + self.utterance_length]
+
+    def end_utterance(self) -> None:
+        self._start = None
+
+class ChunkRingBuffer:
+    """Preallocated single-producer/single-consumer ring of fixed-size chunks.
+
+    Meant for an audio callback (producer) and the capture loop (consumer). The
+    producer only advances `_head` and the consumer only `_tail`, each after its slots
+    are copied; an int store is atomic in CPython, so neither side takes a lock. A
+    chunk written while the ring is full is dropped and counted in `overflows`.
+    Every chunk carries the timestamp it was written with.
+
+    A waiting consumer sleeps in select() on a socket pair, not on a threading
+    primitive: the producer wakes it by sending one byte (non-blocking), and only
+    while it is waiting, so the callback never takes a lock the consumer holds.
+    """
+
+    def __init__(self, chunk_size: int, capacity: int):
+        self.chunk_size = chunk_size
+        self.capacity = capacity
+        self._slots = np.zeros((capacity, chunk_size), dtype=np.float32)
+        self._times = np.zeros(capacity, dtype=np.float64)
+        # Chunks written and read so far; slots are positions modulo capacity
+        self._head = 0
+        self._tail = 0
+        self.overflows = 0
+        self._waiting = False
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._wake_send.setblocking(False)
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    def write(self, chunk: np.ndarray, timestamp: float) -> bool:
+        """Producer side; False if the ring was full and the chunk was dropped"""
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.overflows += 1
+            return False
+        slot = head % self.capacity
+        self._slots[slot] = chunk
+        self._times[slot] = timestamp
+        # Publish only once the data is in place
+        self._head = head + 1
+        if self._waiting:
+            try:
+                self._wake_send.send(b"\0")
+            except OSError:
+                # Full: the consumer has wake-ups pending already
+                pass
+        return True
+
+    def read(self, max_chunks: int) -> tuple[np.ndarray, np.ndarray]:
+        """Consumer side: copies of up to `max_chunks` chunks and their timestamps,
+        without waiting (possibly none)"""
+        tail = self._tail
+        n = min(self._head - tail, max_chunks)
+        start = tail % self.capacity
+        first = min(n, self.capacity - start)
+        if first == n:
+            chunks = self._slots[start:start + n].copy()
+            times = self._times[start:start + n].copy()
+        else:
+            chunks = np.concatenate((self._slots[start:], self._slots[:n - first]))
+            times = np.concatenate((self._times[start:], self._times[:n - first]))
+        # The slots can be reused only after the copy
+        self._tail = tail + n
+        return chunks, times
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Consumer side: wait until at least one chunk is available"""
+        if len(self):
+            return True
+        self._waiting = True
+        try:
+            # A write before _waiting was set sent no wake-up: it is caught here
+            if not len(self):
+                select.select([self._wake_recv], [], [], timeout)
+        finally:
+            self._waiting = False
+            self._drain_wakeups()
+        return len(self) > 0
+
+    def _drain_wakeups(self) -> None:
+        try:
+            while self._wake_recv.recv(64):
+                pass
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self._wake_recv.close()
+        self._wake_send.close()
@@ -0,0 +1,61 @@
+import re
+from typing import Optional
+
+class SentenceSegmenter:
+    """Split a stream of LLM tokens into sentences or clauses that can be spoken
+    while generation continues"""
+
+    # Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+    _SENTENCE_END = re.compile(r'[.!?…]+["\')\]]*\s+|\n+')
+    # Clause end: only used once the pending text is long enough
+    _CLAUSE_END = re.compile(r'[,;:]\s+')
+    # Words whose trailing dot does not end a sentence
+    _ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sig", "dott", "e.g", "i.e", "etc", "vs"}
+
+    def __init__(self, min_clause_chars: int = 40, max_chars: int = 200):
+        self.min_clause_chars = min_clause_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def _is_abbreviation(self, end: int) -> bool:
+        words = self._buffer[:end].split()
+        if not words or not words[-1].endswith("."):
+            return False
+        word = words[-1].rstrip(".").lower()
+        return word in self._ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+
+    def _next_cut(self) -> Optional[int]:
+        for match in self._SENTENCE_END.finditer(self._buffer):
+            if not self._is_abbreviation(match.start() + 1):
+                return match.end()
+
+        # Clauses shorter than min_clause_chars would sound choppy
+        for match in self._CLAUSE_END.finditer(self._buffer, self.min_clause_chars):
+            return match.end()
+
+        if len(self._buffer) >= self.max_chars:
+            # No boundary at all: cut at the last word break
+            cut = self._buffer.rfind(" ")
+            return cut + 1 if cut > 0 else len(self._buffer)
+
+        return None
+
+    def feed(self, token: str) -> list[str]:
+        """Add a token and return the segments completed by it"""
+        self._buffer += token
+        segments = []
+        while True:
+            cut = self._next_cut()
+            if cut is None:
+                break
+            segment = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left once generation is over"""
+        segment = self._buffer.strip()
+        self._buffer = ""
+        return segment or None
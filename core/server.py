@@ -0,0 +1,225 @@
+# core/server.py
+import asyncio
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+from providers.base import (
+    VADProvider,
+    LLMProvider,
+    TextFilterProvider,
+    TranscriptionProvider,
+    StreamingTTSProvider
+)
+from providers.audio.queue_provider import QueueAudioProvider
+from providers.tts.remote_provider import RemoteTTS
+from core.assistant import VoiceAssistant, LogLevel
+from core.metrics import Metrics
+from core.protocol import AUDIO, BYE, EVENT, HELLO, encode_frame, encode_json, read_frame
+from core.turn import Turn
+
+@dataclass
+class SharedModels:
+    """Providers loaded once and used by every session.
+
+    Each session forks its own VAD (stream state) and LLM (conversation memory); the
+    transcriber, text filter and synthesizer are used as they are and must be
+    thread-safe.
+    """
+    vad: VADProvider
+    transcriber: TranscriptionProvider
+    llm: LLMProvider
+    text_filter: TextFilterProvider
+    tts: StreamingTTSProvider
+
+class AssistantServer:
+    """Serves many concurrent voice sessions over TCP (see core/protocol.py).
+
+    Every connection gets its own VoiceAssistant, with its own capture ring buffer,
+    VAD state, conversation memory and language config, running on a thread of its
+    own; the event loop only moves frames between sockets and sessions.
+    """
+
+    def __init__(self,
+                 models: SharedModels,
+                 host: str = "0.0.0.0",
+                 port: int = 8765,
+                 max_sessions: int = 8,
+                 sample_rate: int = 16000,
+                 chunk_size: int = 512,
+                 streaming_transcription: bool = False,
+                 speculative: bool = False,
+                 speculative_llm: bool = False,
+                 barge_in: bool = False,
+                 long_form: bool = False,
+                 language: str = "en",
+                 detect_language: bool = False,
+                 max_utterance_seconds: float = 30.0,
+                 log_level: LogLevel = LogLevel.INFO,
+                 metrics: Optional[Metrics] = None):
+        self.models = models
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        # Every streaming decoder re-decodes its window every step on the one shared
+        # transcriber: off by default, so concurrent sessions don't starve each other
+        self.streaming_transcription = streaming_transcription
+        self.speculative = speculative
+        self.speculative_llm = speculative_llm
+        self.barge_in = barge_in
+        self.long_form = long_form
+        # Whisper's language: the shared transcriber decodes every session in it, unless
+        # it detects each utterance's, and then the HELLO language is only the first one
+        self.language = language
+        self.detect_language = detect_language
+        self.max_utterance_seconds = max_utterance_seconds
+        self.log_level = log_level
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.logger = logging.getLogger(__name__)
+        self.active_sessions = 0
+        self._session_ids = 0
+
+    async def serve_forever(self) -> None:
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.logger.info(f"Assistant server listening on {self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        outbox: asyncio.Queue = asyncio.Queue()
+        closed = False
+
+        def send(frame: bytes) -> None:
+            """Queue a frame from any thread"""
+            if not closed:
+                loop.call_soon_threadsafe(outbox.put_nowait, frame)
+
+        async def write_frames() -> None:
+            while True:
+                frame = await outbox.get()
+                if frame is None:
+                    break
+                writer.write(frame)
+                await writer.drain()
+
+        writer_task = asyncio.create_task(write_frames())
+        try:
+            try:
+                kind, payload = await asyncio.wait_for(read_frame(reader), timeout=10.0)
+                hello = json.loads(payload) if kind == HELLO else None
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                hello = None
+            if not isinstance(hello, dict):
+                outbox.put_nowait(encode_json(EVENT, type="error", message="expected HELLO"))
+                return
+            sample_rate = hello.get("sample_rate", self.sample_rate)
+            # Only the server's rate is supported; anything else (not an int too) is refused
+            if type(sample_rate) is not int or sample_rate != self.sample_rate:
+                outbox.put_nowait(encode_json(EVENT, type="error", message=f"sample rate must be {self.sample_rate}"))
+                return
+            language = str(hello.get("language", self.language))
+            if language != self.language and not self.detect_language:
+                outbox.put_nowait(encode_json(EVENT, type="error", message=f"language must be {self.language}"))
+                return
+            if self.active_sessions >= self.max_sessions:
+                self.metrics.increment("rejected_sessions")
+                outbox.put_nowait(encode_json(EVENT, type="error", message="server busy"))
+                return
+
+            self.active_sessions += 1
+            try:
+                await self._run_session(reader, hello, send)
+            finally:
+                self.active_sessions -= 1
+        finally:
+            closed = True
+            # Behind the frames the session threads already scheduled
+            loop.call_soon_threadsafe(outbox.put_nowait, None)
+            try:
+                await writer_task
+                writer.close()
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _run_session(self,
+                           reader: asyncio.StreamReader,
+                           hello: dict,
+                           send: Callable[[bytes], None]) -> None:
+        self._session_ids += 1
+        session_id = self._session_ids
+        language = str(hello.get("language", self.language))
+        audio = QueueAudioProvider(self.sample_rate, self.chunk_size)
+
+        def on_turn_complete(turn: Turn) -> None:
+            send(encode_json(EVENT, type="turn", text=turn.text, response=turn.response, **turn.trace()))
+
+        tts = RemoteTTS(
+            self.models.tts,
+            send_audio=lambda block: send(encode_frame(AUDIO, block.astype("<i2", copy=False).tobytes())),
+            on_speech=lambda rate: send(encode_json(EVENT, type="speech", sample_rate=rate)),
+            on_stop=lambda: send(encode_json(EVENT, type="stop"))
+        )
+        assistant = VoiceAssistant(
+            audio_provider=audio,
+            vad_provider=self.models.vad.fork(),
+            transcription_provider=self.models.transcriber,
+            llm_provider=self.models.llm.fork(),
+            text_filter_provider=self.models.text_filter,
+            tts_provider=tts,
+            language=language,
+            log_level=self.log_level,
+            streaming_transcription=self.streaming_transcription,
+            speculative=self.speculative,
+            speculative_llm=self.speculative_llm,
+            barge_in=self.barge_in,
+            long_form=self.long_form,
+            detect_language=self.detect_language,
+            max_utterance_seconds=self.max_utterance_seconds,
+            on_turn_complete=on_turn_complete,
+            metrics=self.metrics,
+            shared_providers=(self.models.transcriber,)
+        )
+
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+
+        def run() -> None:
+            try:
+                assistant.run()
+            finally:
+                loop.call_soon_threadsafe(finished.set_result, None)
+
+        # A thread per session rather than the default executor, which caps concurrency
+        threading.Thread(target=run, name=f"session-{session_id}", daemon=True).start()
+        self.metrics.increment("sessions")
+        self.logger.info(f"Session {session_id} started ({language}), {self.active_sessions} active")
+        send(encode_json(
+            EVENT,
+            type="ready",
+            session_id=session_id,
+            language=assistant.lang_config.code,
+            sample_rate=self.sample_rate,
+            chunk_size=self.chunk_size
+        ))
+
+        try:
+            while True:
+                kind, payload = await read_frame(reader)
+                if kind == AUDIO:
+                    audio.push_pcm16(payload)
+                elif kind == BYE:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            assistant.is_running = False
+            audio.close()
+            await finished
+            self.logger.info(
+                f"Session {session_id} closed, {audio.dropped_chunks} audio chunks dropped"
+            )
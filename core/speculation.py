@@ -0,0 +1,126 @@
+# core/speculation.py
+import queue
+import threading
+from time import perf_counter
+from typing import Callable, Iterator, Optional
+import numpy as np
+from core.metrics import Metrics
+
+# End of the speculative token stream
+_END = object()
+
+class Speculation:
+    """Transcription, and optionally the LLM reply, of an utterance that may not be over.
+
+    Started on a short pause with the audio captured so far. The work runs on its own
+    thread and stops as soon as cancel() is called (the user kept talking, or the turn
+    was dropped). Work that is cancelled before it is used is added to the
+    `speculation_wasted_seconds` counter.
+    """
+
+    def __init__(self,
+                 audio: np.ndarray,
+                 transcribe: Callable[[np.ndarray, threading.Event], Optional[str]],
+                 respond: Optional[Callable[[str], Optional[Iterator[str]]]] = None,
+                 metrics: Optional[Metrics] = None):
+        self.samples = len(audio)
+        self._transcribe = transcribe
+        self._respond = respond
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._cancel = threading.Event()
+        self._transcribed = threading.Event()
+        self._lock = threading.Lock()
+        self.text: Optional[str] = None
+        # Tokens of the speculative reply, or _END; None when no reply was started
+        self._tokens: Optional[queue.Queue] = None
+        self._error: Optional[Exception] = None
+        self._transcription_seconds = 0.0
+        self._llm_seconds = 0.0
+        self._transcript_used = False
+        self._reply_used = False
+        self._finished = False
+        self._settled = False
+        self.metrics.increment("speculations")
+        threading.Thread(target=self._run, args=(audio,), name="speculation", daemon=True).start()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _run(self, audio: np.ndarray) -> None:
+        start = perf_counter()
+        try:
+            self.text = self._transcribe(audio, self._cancel)
+        except Exception as e:
+            print(f"Error in speculative transcription: {e}")
+        self._transcription_seconds = perf_counter() - start
+        stream = None
+        if self.text and self._respond is not None and not self._cancel.is_set():
+            stream = self._respond(self.text)
+            if stream is not None:
+                self._tokens = queue.Queue()
+        self._transcribed.set()
+
+        if stream is not None:
+            start = perf_counter()
+            try:
+                for chunk in stream:
+                    if self._cancel.is_set():
+                        break
+                    self._tokens.put(chunk)
+            except Exception as e:
+                self._error = e
+            finally:
+                stream.close()
+                self._tokens.put(_END)
+                self._llm_seconds = perf_counter() - start
+
+        with self._lock:
+            self._finished = True
+        self._settle()
+
+    def _settle(self) -> None:
+        """Count the unused work once the thread is done and the speculation is cancelled"""
+        with self._lock:
+            if self._settled or not (self._finished and self._cancel.is_set()):
+                return
+            self._settled = True
+            wasted = ((0.0 if self._transcript_used else self._transcription_seconds)
+                      + (0.0 if self._reply_used else self._llm_seconds))
+        if wasted > 0:
+            self.metrics.increment("speculation_wasted_seconds", wasted)
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        self._settle()
+
+    def transcript(self) -> Optional[str]:
+        """Wait for the speculative transcript; None if it was cancelled"""
+        self._transcribed.wait()
+        if self._cancel.is_set() or self.text is None:
+            return None
+        with self._lock:
+            self._transcript_used = True
+        self.metrics.increment("speculation_hits")
+        return self.text
+
+    def response(self, text: str) -> Optional[Iterator[str]]:
+        """The speculative reply if it was generated for `text`; otherwise the reply is
+        cancelled and None is returned"""
+        self._transcribed.wait()
+        if self._tokens is None or self._cancel.is_set() or text != self.text:
+            self.cancel()
+            return None
+        with self._lock:
+            self._reply_used = True
+        self.metrics.increment("speculation_llm_hits")
+        return self._replay()
+
+    def _replay(self) -> Iterator[str]:
+        while True:
+            chunk = self._tokens.get()
+            if chunk is _END:
+                break
+            yield chunk
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,33 @@
+# core/startup.py
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from core.metrics import Metrics
+
+def load_parallel(builders: dict[str, Callable[[], Any]],
+                  metrics: Metrics,
+                  warmup: bool = True) -> dict[str, Any]:
+    """Build independent providers on parallel threads and warm each one up.
+
+    Each provider is warmed up on its own thread as soon as it is built, while the
+    others are still loading. Builds are timed as model loads under their name and
+    warm-ups as "<name>_warmup". A failed warm-up is printed and counted in
+    "warmup_failures", and the provider is returned anyway: it may still work once its
+    service is up. If a builder fails, its exception is raised once every other
+    builder has finished.
+    """
+    def build(name: str, builder: Callable[[], Any]) -> Any:
+        with metrics.load_timer(name):
+            provider = builder()
+        warm = getattr(provider, "warmup", None)
+        if warmup and warm is not None:
+            try:
+                with metrics.load_timer(f"{name}_warmup"):
+                    warm()
+            except Exception as e:
+                print(f"Error warming up {name}: {e}")
+                metrics.increment("warmup_failures")
+        return provider
+
+    with ThreadPoolExecutor(max_workers=max(len(builders), 1), thread_name_prefix="load") as pool:
+        futures = {name: pool.submit(build, name, builder) for name, builder in builders.items()}
+    return {name: future.result() for name, future in futures.items()}
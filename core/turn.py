@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+import numpy as np
+from providers.base import TranscriptionStream
+from core.speculation import Speculation
+
+@dataclass
+class Turn:
+    """A single user utterance travelling through the assistant pipeline"""
+    turn_id: int
+    audio: np.ndarray
+    # Barge-in generation the turn was captured in; stale turns are dropped
+    generation: int
+    # perf_counter() timestamps used for latency reporting
+    speech_end: float
+    # Incremental transcription started while the user was speaking, if any
+    stream: Optional[TranscriptionStream] = None
+    # Speculative transcription started on the last pause, if any
+    speculation: Optional[Speculation] = None
+    text: Optional[str] = None
+    # Language code the turn is answered and spoken in
+    language: Optional[str] = None
+    response: Optional[str] = None
+    transcribed: Optional[float] = None
+    first_token: Optional[float] = None
+    first_audio: Optional[float] = None
+    completed: Optional[float] = None
+    stale: bool = False
+
+    def trace(self) -> dict[str, Any]:
+        """Stage latencies in ms, measured from end of speech"""
+        def since(start: Optional[float], end: Optional[float]) -> Optional[float]:
+            if start is None or end is None:
+                return None
+            return round((end - start) * 1000, 1)
+
+        return {
+            "turn_id": self.turn_id,
+            "language": self.language,
+            "transcription_ms": since(self.speech_end, self.transcribed),
+            "llm_first_token_ms": since(self.transcribed, self.first_token),
+            "tts_first_audio_ms": since(self.first_token, self.first_audio),
+            "end_to_end_ms": since(self.speech_end, self.first_audio),
+            "total_ms": since(self.speech_end, self.completed),
+            "text_chars": len(self.text or ""),
+            "response_chars": len(self.response or ""),
+        }
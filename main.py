@@ -1,11 +1,44 @@
-from providers.vad.silero_provider import SileroVAD
-from providers.llm.ollama_provider import OllamaLLM
-from providers.tts.google_provider import GoogleTTS
-from providers.audio.pyaudio_provider import PyAudioProvider
-from providers.transcription.whisper_provider import WhisperProvider
-from providers.filter.speech_filter import SpeechFilter
+from time import perf_counter
+START = perf_counter()
 
 from core.assistant import VoiceAssistant, LogLevel
+from core.metrics import Metrics, MetricsExporter
+from core.startup import load_parallel
+from core.process_stage import StageBudget, apply_budget
+from core.residency import ModelResidencyManager
+from config.whisper_config import WhisperConfig
+
+# Backend, model size and threads of Whisper; device "auto" picks cuda, mps or cpu.
+# language "auto": every utterance is answered in the language it was spoken in
+WHISPER_CONFIG = WhisperConfig(language="auto")
+
+# With MULTIPROCESS the VAD and Whisper run in worker processes that get the audio
+# through shared memory, so their thread pools and the GIL leave the capture loop alone.
+# Each budget pins a stage to cores (e.g. cpus=(2, 3), Linux only) and caps its threads
+MULTIPROCESS = False
+STAGE_BUDGETS = {
+    "capture": StageBudget(),
+    "vad": StageBudget(threads=1),
+    "whisper": StageBudget(threads=4),
+}
+
+# Dictation up to 5 minutes, split into Whisper windows. Off: it turns off streaming
+# transcription, so every turn waits for the whole transcription after the endpoint
+LONG_FORM = False
+
+# Answer repeated queries from a cache instead of Ollama (off: cached answers can be stale)
+LLM_CACHE = False
+
+# Without MULTIPROCESS, Whisper is unloaded after IDLE_UNLOAD_SECONDS without utterances
+# and reloaded by the next one (0 never unloads it); the VAD is pinned. A model used
+# PIN_AFTER_USES times within that time stays loaded; MEMORY_BUDGET_MB > 0 also unloads
+# the least recently used model when the loaded ones exceed it
+MEMORY_BUDGET_MB = 0
+IDLE_UNLOAD_SECONDS = 900
+PIN_AFTER_USES = 20
+
+# Provider modules import torch, transformers and langchain: they are imported by the
+# builders below, on the loading threads, only when the provider is created
 
 def setup_warnings():
     import warnings
@@ -19,35 +52,105 @@ def setup_warnings():
     # Configura logging per transformers
     logging.set_verbosity_error()
 
+def build_silero():
+    from providers.vad.silero_provider import SileroVAD
+    return SileroVAD()
 
-def main():
+def build_vad(metrics: Metrics, residency: ModelResidencyManager):
+    from providers.vad.gated_provider import GatedVAD
+    if MULTIPROCESS:
+        from providers.vad.process_provider import ProcessVAD
+        vad = ProcessVAD(build_silero, STAGE_BUDGETS["vad"], metrics=metrics)
+    else:
+        from providers.vad.resident_provider import ResidentVAD
+        # Pinned: a reload would run on the capture loop at the next speech onset
+        vad = ResidentVAD(residency, "silero_vad", build_silero, pinned=True)
+    # Room silence doesn't need the network, nor the worker process
+    return GatedVAD(vad)
+
+def build_local_whisper():
     setup_warnings()
+    from providers.transcription.backends import create_whisper
+    return create_whisper(WHISPER_CONFIG)
+
+def build_whisper(metrics: Metrics, residency: ModelResidencyManager):
+    if MULTIPROCESS:
+        from providers.transcription.process_provider import ProcessTranscriber
+        return ProcessTranscriber(build_local_whisper, STAGE_BUDGETS["whisper"], metrics=metrics)
+    from providers.transcription.resident_provider import ResidentTranscriber
+    return ResidentTranscriber(residency, "whisper", build_local_whisper)
+
+def build_llm(metrics: Metrics):
+    from providers.llm.ollama_provider import OllamaLLM
+    llm = OllamaLLM()
+    if LLM_CACHE:
+        from providers.llm.cached_provider import CachedLLM, ResponseCache
+        llm = CachedLLM(llm, ResponseCache(metrics=metrics))
+    return llm
+
+def build_tts():
+    from providers.tts.google_provider import GoogleTTS
+    return GoogleTTS()
+
+def main():
+    metrics = Metrics()
+    exporter = MetricsExporter(
+        metrics,
+        jsonl_path="voice_assistant_metrics.jsonl",
+        prometheus_path="voice_assistant_metrics.prom"
+    )
+    residency = ModelResidencyManager(
+        budget_mb=MEMORY_BUDGET_MB,
+        idle_seconds=IDLE_UNLOAD_SECONDS,
+        pin_after_uses=PIN_AFTER_USES,
+        metrics=metrics
+    )
 
     try:
-        # Initialize providers
+        # Initialize providers: the models load and warm up in parallel
+        from providers.audio.pyaudio_provider import PyAudioProvider
+        from providers.filter.speech_filter import SpeechFilter
         audio_provider = PyAudioProvider(sample_rate=16000, chunk_size=512)
-        vad_provider = SileroVAD()
-        transcription_provider = WhisperProvider(language="en", device="mps")
-        llm_provider = OllamaLLM()
         text_filter_provider = SpeechFilter()
-        tts_provider = GoogleTTS()
+        providers = load_parallel({
+            "silero_vad": lambda: build_vad(metrics, residency),
+            "whisper": lambda: build_whisper(metrics, residency),
+            "ollama": lambda: build_llm(metrics),
+            "gtts": build_tts,
+        }, metrics)
 
         assistant = VoiceAssistant(
             audio_provider=audio_provider,
-            vad_provider=vad_provider,
-            transcription_provider=transcription_provider,
-            llm_provider=llm_provider,
+            vad_provider=providers["silero_vad"],
+            transcription_provider=providers["whisper"],
+            llm_provider=providers["ollama"],
             text_filter_provider=text_filter_provider,
-            tts_provider=tts_provider,
+            tts_provider=providers["gtts"],
             language="en",
-            log_level=LogLevel.INFO  # Mostra solo info e errori
+            log_level=LogLevel.INFO,  # Mostra solo info e errori
+            max_utterance_seconds=300.0 if LONG_FORM else 30.0,  # Dettatura fino a 5 minuti
+            long_form=LONG_FORM,
+            detect_language=WHISPER_CONFIG.language == "auto",
+            metrics=metrics
         )
 
+        if MULTIPROCESS:
+            # After the workers started: they would inherit the capture loop's cores
+            apply_budget(STAGE_BUDGETS["capture"])
+
+        time_to_ready = perf_counter() - START
+        metrics.record_ready(time_to_ready)
+        print(f"Ready in {time_to_ready:.1f}s (model loads: {metrics.snapshot()['model_load_seconds']})")
+
         # Run the assistant
+        exporter.start()
         assistant.run()
 
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        exporter.stop()
+        residency.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,203 @@
+# providers/audio/file_provider.py
+import os
+import struct
+import threading
+from time import perf_counter, sleep
+import numpy as np
+from typing import Optional
+from ..base import AudioProvider
+
+def read_wav_header(path: str) -> tuple[int, int, np.dtype, int, int]:
+    """Return (data offset, data bytes, sample dtype, channels, sample rate) of a PCM WAV file"""
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError(f"{path}: not a WAV file")
+
+        fmt: Optional[tuple[int, int, int, int]] = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk_id, size = header[:4], struct.unpack("<I", header[4:])[0]
+            if chunk_id == b"fmt ":
+                body = f.read(size + (size & 1))
+                audio_format, channels, rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                if audio_format == 0xFFFE:
+                    # WAVE_FORMAT_EXTENSIBLE: the real format is in the sub-format GUID
+                    audio_format = struct.unpack("<H", body[24:26])[0]
+                fmt = (audio_format, channels, rate, bits)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"{path}: data chunk before fmt chunk")
+                offset = f.tell()
+                # Streamed WAVs may carry a bogus size; trust the file length instead
+                size = min(size, os.path.getsize(path) - offset)
+                break
+            else:
+                f.seek(size + (size & 1), 1)
+
+    audio_format, channels, rate, bits = fmt
+    if audio_format == 1 and bits == 16:
+        dtype = np.dtype("<i2")
+    elif audio_format == 3 and bits == 32:
+        dtype = np.dtype("<f4")
+    else:
+        raise ValueError(f"{path}: unsupported WAV format {audio_format} with {bits} bits")
+    return offset, size, dtype, channels, rate
+
+class FileAudioProvider(AudioProvider):
+    """Replays WAV or raw PCM files as if they came from a microphone.
+
+    Files are memory-mapped and converted chunk by chunk, separated by `gap_seconds` of
+    silence. In real-time mode reads are paced by a simulated device clock and, like a
+    sound card, only `device_buffer_chunks` chunks are buffered: a consumer that falls
+    further behind loses audio, counted in `dropped_chunks`. Otherwise the files are
+    replayed as fast as they are read.
+    """
+
+    def __init__(self,
+                 paths: list[str],
+                 sample_rate: int = 16000,
+                 chunk_size: int = 512,
+                 realtime: bool = True,
+                 gap_seconds: float = 1.5,
+                 raw_dtype: str = "<i2",
+                 device_buffer_chunks: int = 16):
+        self._sample_rate = sample_rate
+        self._chunk_size = chunk_size
+        self.realtime = realtime
+        self.device_buffer_chunks = device_buffer_chunks
+
+        # Timeline of memory-mapped sources and silences
+        gap = int(gap_seconds * sample_rate)
+        self._segments: list[Optional[np.ndarray]] = []
+        self._lengths: list[int] = []
+        # (start sample, end sample, path) of every file on the timeline
+        self.utterances: list[tuple[int, int, str]] = []
+        position = gap
+        self._segments.append(None)
+        self._lengths.append(gap)
+        for path in paths:
+            samples = self._map(path, raw_dtype)
+            self._segments.append(samples)
+            self._lengths.append(len(samples))
+            self.utterances.append((position, position + len(samples), path))
+            position += len(samples)
+            self._segments.append(None)
+            self._lengths.append(gap)
+            position += gap
+        self.total_samples = position
+
+        self.position = 0
+        self.dropped_chunks = 0
+        # perf_counter() at which the last sample of each file was delivered
+        self.utterance_end_times: list[float] = []
+        self.finished = threading.Event()
+        self._start_time: Optional[float] = None
+        self._chunks_read = 0
+
+    @property
+    def overflow_count(self) -> int:
+        return self.dropped_chunks
+
+    @property
+    def capture_time(self) -> Optional[float]:
+        """Capture time of the last chunk on the simulated device clock"""
+        if not self.realtime or self._start_time is None or self._chunks_read == 0:
+            return None
+        return self._start_time + (self._chunks_read - 1) * self._chunk_size / self._sample_rate
+
+    def _map(self, path: str, raw_dtype: str) -> np.ndarray:
+        if path.lower().endswith(".wav"):
+            offset, size, dtype, channels, rate = read_wav_header(path)
+            if rate != self._sample_rate:
+                raise ValueError(f"{path}: expected {self._sample_rate} Hz, got {rate} Hz")
+        else:
+            offset, dtype, channels = 0, np.dtype(raw_dtype), 1
+            size = os.path.getsize(path)
+        frames = size // (dtype.itemsize * channels)
+        data = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(frames, channels))
+        # First channel only, still memory-mapped
+        return data[:, 0]
+
+    @property
+    def sample_rate(self) -> int:
+        return self._sample_rate
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    def start_stream(self) -> None:
+        """Start the simulated device clock"""
+        self._start_time = perf_counter()
+        self._chunks_read = 0
+
+    def _copy_timeline(self, out: np.ndarray, start: int) -> None:
+        """Fill `out` with the timeline from sample `start`, converting to float32"""
+        out[:] = 0.0
+        filled = 0
+        segment_start = 0
+        for segment, length in zip(self._segments, self._lengths):
+            segment_end = segment_start + length
+            if segment_end > start + filled and filled < len(out):
+                begin = start + filled - segment_start
+                count = min(length - begin, len(out) - filled)
+                if segment is not None:
+                    source = segment[begin:begin + count]
+                    if source.dtype == np.int16:
+                        out[filled:filled + count] = source * (1.0 / 32768.0)
+                    else:
+                        out[filled:filled + count] = source
+                filled += count
+            segment_start = segment_end
+            if filled >= len(out):
+                break
+
+    def _wait_for_chunk(self) -> None:
+        """Pace reads on the simulated device clock and drop what the device buffer lost"""
+        if self._start_time is None:
+            raise RuntimeError("Stream not started")
+        chunk_seconds = self._chunk_size / self._sample_rate
+        ready_at = self._start_time + (self._chunks_read + 1) * chunk_seconds
+        now = perf_counter()
+        if now < ready_at:
+            sleep(ready_at - now)
+            return
+
+        captured = int((now - self._start_time) / chunk_seconds)
+        behind = captured - self._chunks_read
+        if behind > self.device_buffer_chunks:
+            lost = behind - self.device_buffer_chunks
+            self.dropped_chunks += lost
+            self._chunks_read += lost
+            self.position += lost * self._chunk_size
+
+    def read_chunk(self) -> np.ndarray:
+        """Read the next chunk of the timeline; silence once every file was played"""
+        if self.realtime:
+            self._wait_for_chunk()
+        elif self._start_time is None:
+            raise RuntimeError("Stream not started")
+
+        chunk = np.empty(self._chunk_size, dtype=np.float32)
+        start = self.position
+        self._copy_timeline(chunk, start)
+        self.position += self._chunk_size
+        self._chunks_read += 1
+
+        now = perf_counter()
+        for _, end, _ in self.utterances[len(self.utterance_end_times):]:
+            if end > self.position:
+                break
+            self.utterance_end_times.append(now)
+        if self.position >= self.total_samples:
+            self.finished.set()
+        return chunk
+
+    def stop_stream(self) -> None:
+        self._start_time = None
+
+    def cleanup(self) -> None:
+        self.stop_stream()
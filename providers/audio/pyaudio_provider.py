@@ -1,19 +1,49 @@
 import pyaudio
 import numpy as np
+from time import perf_counter
 from typing import Optional
+from core.ring_buffer import ChunkRingBuffer
 from ..base import AudioProvider
 
 class PyAudioProvider(AudioProvider):
-    def __init__(self, sample_rate: int = 16000, chunk_size: int = 512):
+    """Microphone input through PortAudio.
+
+    In callback mode (the default) PortAudio's stream callback copies every buffer into
+    a preallocated ChunkRingBuffer holding `buffer_seconds` of audio, with its capture
+    time; reads never touch the device. If the consumer falls further behind, new audio
+    is dropped and counted in `overflow_count`, together with the overflows PortAudio
+    reports. A read that gets no audio within `read_timeout` returns silence and is
+    counted in `underflow_count`. With callback=False the stream is read blocking, and
+    a read that finds PortAudio's input buffer full counts as an overflow: the device
+    audio that didn't fit was lost, but the chunk read is kept.
+    """
+
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 chunk_size: int = 512,
+                 callback: bool = True,
+                 buffer_seconds: float = 2.0,
+                 read_timeout: float = 1.0):
         self._sample_rate = sample_rate
         self._chunk_size = chunk_size
         self.format = pyaudio.paFloat32
         self.channels = 1
+        self.callback = callback
+        self.read_timeout = read_timeout
 
         # Initialize PyAudio
         self.audio = pyaudio.PyAudio()
         self.stream: Optional[pyaudio.Stream] = None
 
+        capacity = max(int(buffer_seconds * sample_rate / chunk_size), 2)
+        self.ring = ChunkRingBuffer(chunk_size, capacity)
+        self._silence = np.zeros(chunk_size, dtype=np.float32)
+        self._device_overflows = 0
+        self._underflows = 0
+        self._capture_time: Optional[float] = None
+        # Frames PortAudio buffers for blocking reads, known once the stream is open
+        self._input_buffer_frames = 0
+
     @property
     def sample_rate(self) -> int:
         return self._sample_rate
@@ -22,6 +52,27 @@ class PyAudioProvider(AudioProvider):
     def chunk_size(self) -> int:
         return self._chunk_size
 
+    @property
+    def overflow_count(self) -> int:
+        return self.ring.overflows + self._device_overflows
+
+    @property
+    def underflow_count(self) -> int:
+        return self._underflows
+
+    @property
+    def capture_time(self) -> Optional[float]:
+        return self._capture_time
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio thread: copy the buffer into the ring, nothing else"""
+        if status & pyaudio.paInputOverflow:
+            self._device_overflows += 1
+        # frames_per_buffer is fixed, so every buffer is exactly one chunk
+        self.ring.write(np.frombuffer(in_data, dtype=np.float32),
+                        perf_counter() - frame_count / self._sample_rate)
+        return None, pyaudio.paContinue
+
     def start_stream(self) -> None:
         """Start the audio stream"""
         if self.stream is None:
@@ -30,21 +81,49 @@ class PyAudioProvider(AudioProvider):
                 channels=self.channels,
                 rate=self.sample_rate,
                 input=True,
-                frames_per_buffer=self.chunk_size
+                frames_per_buffer=self.chunk_size,
+                stream_callback=self._on_audio if self.callback else None
             )
             self.stream.start_stream()
+            if not self.callback:
+                self._input_buffer_frames = max(
+                    int(self.stream.get_input_latency() * self._sample_rate), self.chunk_size
+                )
+
+    def read_chunks(self, max_chunks: int, block: bool = True) -> np.ndarray:
+        """Drain up to `max_chunks` captured chunks; waits only if none is there"""
+        if not self.callback:
+            return super().read_chunks(max_chunks, block)
+        if self.stream is None:
+            raise RuntimeError("Stream not started")
+
+        if block and not self.ring.wait(self.read_timeout):
+            self._underflows += 1
+            self._capture_time = None
+            return self._silence[np.newaxis]
+        chunks, times = self.ring.read(max_chunks)
+        if len(times):
+            self._capture_time = float(times[-1])
+        return chunks
 
     def read_chunk(self) -> np.ndarray:
         """Read a chunk of audio data"""
         if self.stream is None:
             raise RuntimeError("Stream not started")
+        if self.callback:
+            return self.read_chunks(1)[0]
 
         try:
+            if self.stream.get_read_available() >= self._input_buffer_frames:
+                self._device_overflows += 1
+            # An overflow is recoverable: read what is there instead of dropping it
             data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+            self._capture_time = perf_counter() - self.chunk_size / self._sample_rate
             return np.frombuffer(data, dtype=np.float32)
-        except Exception as e:
+        except OSError as e:
             print(f"Error reading audio: {e}")
-            return np.zeros(self.chunk_size, dtype=np.float32)
+            self._underflows += 1
+            return self._silence
 
     def stop_stream(self) -> None:
         """Stop the audio stream"""
@@ -57,3 +136,4 @@ class PyAudioProvider(AudioProvider):
         """Cleanup resources"""
         self.stop_stream()
         self.audio.terminate()
+        self.ring.close()
@@ -0,0 +1,89 @@
+# providers/audio/queue_provider.py
+import collections
+import threading
+import numpy as np
+from ..base import AudioProvider
+
+class QueueAudioProvider(AudioProvider):
+    """Audio pushed by another thread, e.g. a network connection.
+
+    Pushed samples are cut into `chunk_size` chunks; a partial chunk waits for the next
+    push. Like a sound card only `max_chunks` chunks are buffered: if the consumer falls
+    further behind the oldest audio is dropped and counted in `dropped_chunks`. After
+    close() read_chunk() returns silence immediately, so the reader can notice and stop.
+    """
+
+    def __init__(self, sample_rate: int = 16000, chunk_size: int = 512, max_chunks: int = 64):
+        self._sample_rate = sample_rate
+        self._chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.dropped_chunks = 0
+        self._chunks: collections.deque = collections.deque()
+        self._partial = np.empty(0, dtype=np.float32)
+        self._condition = threading.Condition()
+        self._silence = np.zeros(chunk_size, dtype=np.float32)
+        self.closed = False
+
+    @property
+    def sample_rate(self) -> int:
+        return self._sample_rate
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    def push(self, samples: np.ndarray) -> None:
+        """Queue float32 samples"""
+        if len(self._partial):
+            samples = np.concatenate((self._partial, samples))
+        usable = len(samples) - len(samples) % self._chunk_size
+        self._partial = samples[usable:].copy()
+        with self._condition:
+            for start in range(0, usable, self._chunk_size):
+                if len(self._chunks) >= self.max_chunks:
+                    self._chunks.popleft()
+                    self.dropped_chunks += 1
+                self._chunks.append(samples[start:start + self._chunk_size])
+            self._condition.notify()
+
+    def push_pcm16(self, data: bytes) -> None:
+        """Queue little-endian 16-bit PCM"""
+        self.push(np.frombuffer(data, dtype="<i2").astype(np.float32) * (1.0 / 32768.0))
+
+    def start_stream(self) -> None:
+        pass
+
+    @property
+    def overflow_count(self) -> int:
+        return self.dropped_chunks
+
+    def read_chunks(self, max_chunks: int, block: bool = True) -> np.ndarray:
+        """Every queued chunk up to `max_chunks`; silence once closed"""
+        with self._condition:
+            while block and not self._chunks and not self.closed:
+                self._condition.wait()
+            if not self._chunks:
+                return self._silence[np.newaxis] if block else np.empty((0, self._chunk_size), dtype=np.float32)
+            count = min(len(self._chunks), max_chunks)
+            return np.stack([self._chunks.popleft() for _ in range(count)])
+
+    def read_chunk(self) -> np.ndarray:
+        """Block until a chunk is available; silence once closed"""
+        with self._condition:
+            while not self._chunks and not self.closed:
+                self._condition.wait()
+            if self._chunks:
+                return self._chunks.popleft()
+            return self._silence
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def stop_stream(self) -> None:
+        self.close()
+
+    def cleanup(self) -> None:
+        self.close()
+        self._chunks.clear()
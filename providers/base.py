@@ -1,5 +1,8 @@
 # providers/base.py
 from abc import ABC, abstractmethod
+import copy
+import threading
+from typing import Callable, Iterator, Optional
 import numpy as np
 
 class AudioProvider(ABC):
@@ -25,6 +28,29 @@ class AudioProvider(ABC):
         """Read a chunk of audio data"""
         pass
 
+    def read_chunks(self, max_chunks: int, block: bool = True) -> np.ndarray:
+        """Up to `max_chunks` chunks already captured, as a (n, chunk_size) array. With
+        block=True waits for at least one; providers without their own buffer return
+        a single read_chunk()"""
+        if not block:
+            return np.empty((0, self.chunk_size), dtype=np.float32)
+        return self.read_chunk()[np.newaxis]
+
+    @property
+    def overflow_count(self) -> int:
+        """Chunks lost because the consumer fell behind the device"""
+        return 0
+
+    @property
+    def underflow_count(self) -> int:
+        """Reads that found no audio in time and returned silence"""
+        return 0
+
+    @property
+    def capture_time(self) -> Optional[float]:
+        """perf_counter() time the last chunk read was captured (its first sample), if known"""
+        return None
+
     @abstractmethod
     def stop_stream(self) -> None:
         """Stop the audio stream"""
@@ -41,6 +67,28 @@ class VADProvider(ABC):
         """Determine if audio chunk contains speech"""
         pass
 
+    def speech_probs(self, chunks: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Speech probability of each consecutive chunk of a (n_chunks, chunk_size) array"""
+        return np.array(
+            [1.0 if self.is_speech(chunk, sample_rate) else 0.0 for chunk in np.atleast_2d(chunks)],
+            dtype=np.float32
+        )
+
+    def reset_states(self) -> None:
+        """Forget the recurrent state carried between calls"""
+        pass
+
+    def warmup(self) -> None:
+        """Run a dummy inference so the first real chunk doesn't pay for lazy initialisation"""
+        self.speech_probs(np.zeros((2, 512), dtype=np.float32), 16000)
+        self.reset_states()
+
+    def fork(self) -> "VADProvider":
+        """A provider with its own stream state for another audio stream"""
+        vad = copy.deepcopy(self)
+        vad.reset_states()
+        return vad
+
     @abstractmethod
     def cleanup(self) -> None:
         """Cleanup resources"""
@@ -52,30 +100,156 @@ class TranscriptionProvider(ABC):
         """Convert audio to text"""
         pass
 
+    def transcribe_batch(self, audio_batch: list[np.ndarray]) -> list[str]:
+        """Convert several utterances to text in one call"""
+        return [self.transcribe(audio_data) for audio_data in audio_batch]
+
+    def transcribe_cancellable(self, audio_data: np.ndarray, cancel: threading.Event) -> Optional[str]:
+        """Like transcribe, but None once `cancel` is set; providers that can stop
+        decoding early override it, the default only checks before and after"""
+        if cancel.is_set():
+            return None
+        text = self.transcribe(audio_data)
+        return None if cancel.is_set() else text
+
+    def transcribe_with_language(self, audio_data: np.ndarray) -> tuple[str, Optional[str]]:
+        """Text and the language code it was spoken in; None when the provider doesn't
+        detect the language"""
+        return self.transcribe(audio_data), None
+
+    def transcribe_batch_with_language(self, audio_batch: list[np.ndarray]) -> list[tuple[str, Optional[str]]]:
+        """transcribe_with_language for several utterances in one call"""
+        return [self.transcribe_with_language(audio_data) for audio_data in audio_batch]
+
+    def warmup(self) -> None:
+        """Run a dummy inference before the first utterance"""
+        pass
+
     @abstractmethod
     def cleanup(self) -> None:
         """Cleanup resources"""
         pass
 
+class TranscriptionStream(ABC):
+    """Incremental transcription of an utterance that is still being spoken"""
+
+    @abstractmethod
+    def feed(self, audio_chunk: np.ndarray) -> None:
+        """Append audio to the utterance in progress"""
+        pass
+
+    @property
+    @abstractmethod
+    def partial(self) -> str:
+        """Current hypothesis: committed prefix plus tentative tail"""
+        pass
+
+    @abstractmethod
+    def finish(self) -> str:
+        """Decode the audio that is not committed yet and return the full text"""
+        pass
+
+    @abstractmethod
+    def cancel(self) -> None:
+        """Discard the utterance"""
+        pass
+
+    @property
+    def language(self) -> Optional[str]:
+        """Language code detected by finish(), if the provider detects it"""
+        return None
+
+class StreamingTranscriptionProvider(TranscriptionProvider):
+    """Optional extension for providers that can transcribe while the user speaks"""
+
+    @abstractmethod
+    def begin_stream(self, on_partial: Optional[Callable[[str], None]] = None) -> TranscriptionStream:
+        """Start transcribing a new utterance"""
+        pass
+
 class LLMProvider(ABC):
     @abstractmethod
     def get_response(self, text: str, system_prompt: str) -> str:
         """Get response from LLM"""
         pass
 
+    def stream_response(self, text: str, system_prompt: str, record: bool = True) -> Iterator[str]:
+        """Yield the response in chunks as it is generated. Closing the iterator cancels
+        the request; with record=False a provider with memory leaves the turn out of the
+        conversation (see record_turn)"""
+        yield self.get_response(text, system_prompt)
+
+    def warmup(self) -> None:
+        """Load the model before the first request"""
+        pass
+
+    def record_turn(self, text: str, response: str) -> None:
+        """Add a turn answered elsewhere (e.g. from a cache) to the conversation"""
+        pass
+
+    def fork(self) -> "LLMProvider":
+        """A provider for a separate conversation; stateless providers return themselves"""
+        return self
+
 class TextFilterProvider(ABC):
     @abstractmethod
     def filter(self, text: str) -> str:
         """Filter text to remove unwanted elements"""
         pass
 
+class TextFilterStream(ABC):
+    """Incremental filtering of text that arrives in chunks"""
+
+    @abstractmethod
+    def feed(self, chunk: str) -> str:
+        """Add a chunk and return the filtered text that can no longer change"""
+        pass
+
+    @abstractmethod
+    def flush(self) -> str:
+        """Filter and return whatever is still held back"""
+        pass
+
+class StreamingTextFilterProvider(TextFilterProvider):
+    """Optional extension for filters that can process a token stream"""
+
+    @abstractmethod
+    def begin_stream(self) -> TextFilterStream:
+        """Start filtering a new stream of text"""
+        pass
+
 class TTSProvider(ABC):
     @abstractmethod
     def speak(self, text: str, language: str) -> None:
         """Convert text to speech"""
         pass
 
+    def stop(self) -> None:
+        """Interrupt playback in progress (barge-in)"""
+        pass
+
+    def prewarm(self, texts: list[str], language: str) -> None:
+        """Synthesize texts ahead of time so they can be spoken without delay"""
+        pass
+
+    def warmup(self) -> None:
+        """Load voices and run a dummy synthesis before the first reply"""
+        pass
+
     @abstractmethod
     def cleanup(self) -> None:
         """Cleanup resources"""
         pass
+
+class StreamingTTSProvider(TTSProvider):
+    """Optional extension for providers that synthesize to PCM incrementally"""
+
+    @abstractmethod
+    def output_sample_rate(self, language: str) -> int:
+        """Sample rate of the PCM produced for a language"""
+        pass
+
+    @abstractmethod
+    def synthesize_stream(self, text: str, language: str) -> Iterator[np.ndarray]:
+        """Yield 16-bit mono PCM blocks as soon as they are decoded"""
+        pass
@@ -1,46 +1,128 @@
 import re
-from ..base import TextFilterProvider
+from ..base import StreamingTextFilterProvider, TextFilterStream
 
-class SpeechFilter(TextFilterProvider):
-    def filter(self, text: str) -> str:
-        """Rimuove elementi non pronunciabili dal testo."""
+# Pattern da rimuovere, in ordine di priorità
+_PATTERNS = [
+    # Emoji Unicode (range esteso)
+    r'[\U00010000-\U0010ffff]',
+
+    # Emoticon comuni
+    r'[:;=]-?[)(/\\|dpDP]',  # :) :-) ;) ;-) =) :-D :p ecc.
+    r'[xX]-?[dD]',           # xD X-D
+    r':[oO]',                # :o :O
+    r'\^[_-]?\^',           # ^^ ^_^ ^-^
+    r'>?[_-]?<',            # >< >_< >-
+    r'[oO][._][oO]',        # o.o O.O
+
+    # Testo tra asterischi (azioni/emozioni)
+    r'\*[^*]+\*',
+
+    # Emoji testuali (:smile:). The lookaheads reject shortcodes that contain or are
+    # followed by an emoticon, which the emoticon patterns above remove first
+    r':(?![a-zA-Z_]*?(?:[xX][dD]|[oO]_[oO]))[a-zA-Z_]+:(?!-?[)(/\\|dpDP]|[oO])',
+
+    # Emoji testuali comuni
+    r'<3',                   # cuore
+    r'</3',                  # cuore spezzato
+    r'\(y\)',                # thumbs up
+    r'\(n\)',                # thumbs down
+]
+
+# Every pattern starts with one of these characters. The lookahead lets the scan skip
+# all other positions without entering the alternation
+_FIRST_CHARS = r'[\U00010000-\U0010ffff:;=xX^>_\-<oO*(]'
+
+# One alternation scanned once, left to right. At any position the alternatives are
+# tried in priority order, which gives the same result as applying the patterns one
+# after the other
+_MATCHER = re.compile(
+    f'(?={_FIRST_CHARS})(?:' + '|'.join(f'(?:{pattern})' for pattern in _PATTERNS) + ')'
+)
+_STAR = re.compile(r'\*')
 
-        # Lista di pattern da rimuovere
-        patterns = [
-            # Emoji Unicode (range esteso)
-            r'[\U00010000-\U0010ffff]',
+class SpeechFilterStream(TextFilterStream):
+    """Filters LLM tokens as they arrive.
 
-            # Emoticon comuni
-            r'[:;=]-?[)(/\\|dpDP]',  # :) :-) ;) ;-) =) :-D :p ecc.
-            r'[xX]-?[dD]',           # xD X-D
-            r':[oO]',                # :o :O
-            r'\^[_-]?\^',           # ^^ ^_^ ^-^
-            r'>?[_-]?<',            # >< >_< >-
-            r'[oO][._][oO]',        # o.o O.O
+    Text is released up to the last whitespace that is not inside an `*action*` span
+    and precedes any unmatched `*`: no pattern can match across such a point, so the
+    released text filters exactly as it would as part of the whole reply. Only the
+    trailing partial word, or an open action span, is held back.
+    """
 
-            # Testo tra asterischi (azioni/emozioni)
-            r'\*[^*]+\*',
+    def __init__(self, speech_filter: "SpeechFilter"):
+        self._filter = speech_filter
+        self._buffer = ""
+        self._emitted = False
 
-            # Emoji testuali
-            r':[a-zA-Z_]+:',
+    def _last_space(self, end: int) -> int:
+        """Index of the last whitespace before `end`, or -1"""
+        i = end - 1
+        while i >= 0 and not self._buffer[i].isspace():
+            i -= 1
+        return i
 
-            # Emoji testuali comuni
-            r'<3',                   # cuore
-            r'</3',                  # cuore spezzato
-            r'\(y\)',                # thumbs up
-            r'\(n\)',                # thumbs down
+    def _safe_cut(self) -> int:
+        buffer = self._buffer
+        if "*" not in buffer:
+            return self._last_space(len(buffer)) + 1
 
-            # Pulizia spazi multipli
-            r'\s+'
-        ]
+        limit = len(buffer)
+        spans = []
+        stars = [m.start() for m in _STAR.finditer(buffer)]
+        k = 0
+        while k < len(stars):
+            if k + 1 == len(stars):
+                # Unmatched '*': it may still open an action span
+                limit = stars[k]
+                break
+            if stars[k + 1] > stars[k] + 1:
+                spans.append((stars[k], stars[k + 1]))
+                k += 2
+            else:
+                # "**" cannot open a span; the second star may
+                k += 1
 
-        # Applica tutti i pattern
-        for pattern in patterns:
-            text = re.sub(pattern, ' ', text)
+        cut = self._last_space(limit)
+        while cut >= 0:
+            span = next((start for start, end in spans if start < cut < end), None)
+            if span is None:
+                return cut + 1
+            cut = self._last_space(span)
+        return 0
+
+    def _emit(self, text: str) -> str:
+        filtered = self._filter.filter(text)
+        if not filtered:
+            return ""
+        if self._emitted:
+            filtered = " " + filtered
+        self._emitted = True
+        return filtered
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        cut = self._safe_cut()
+        if cut == 0:
+            return ""
+        text, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return self._emit(text)
+
+    def flush(self) -> str:
+        text, self._buffer = self._buffer, ""
+        return self._emit(text)
+
+class SpeechFilter(StreamingTextFilterProvider):
+    def filter(self, text: str) -> str:
+        """Rimuove elementi non pronunciabili dal testo."""
+
+        # Un solo passaggio con il pattern precompilato
+        text = _MATCHER.sub(' ', text)
 
         # Pulisci spazi in eccesso e trimma
-        text = ' '.join(text.split())
-        return text.strip()
+        return ' '.join(text.split())
+
+    def begin_stream(self) -> SpeechFilterStream:
+        return SpeechFilterStream(self)
 
     def print_filtered(self, text: str) -> None:
         """Stampa il testo prima e dopo il filtraggio per debug"""
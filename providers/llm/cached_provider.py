@@ -0,0 +1,283 @@
+# providers/llm/cached_provider.py
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from time import monotonic, perf_counter
+from typing import Callable, Iterator, Optional
+import numpy as np
+from config.language_config import LANGUAGE_CONFIGS
+from core.metrics import Metrics
+from ..base import LLMProvider
+
+# Partition of each known system prompt
+_PROMPT_LANGUAGES = {config.llm_system_prompt: config.code for config in LANGUAGE_CONFIGS.values()}
+_FOLLOWUP_PATTERNS = {
+    config.code: re.compile(config.followup_pattern, re.IGNORECASE)
+    for config in LANGUAGE_CONFIGS.values() if config.followup_pattern
+}
+_VOLATILE_PATTERNS = {
+    config.code: re.compile(config.volatile_pattern, re.IGNORECASE)
+    for config in LANGUAGE_CONFIGS.values() if config.volatile_pattern
+}
+
+def normalize_query(text: str) -> str:
+    """Lowercase, without punctuation and with single spaces"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = "".join(" " if unicodedata.category(c).startswith("P") else c for c in text)
+    return " ".join(text.split())
+
+def ollama_embedder(model: str = "nomic-embed-text",
+                    base_url: str = "http://localhost:11434") -> Callable[[str], np.ndarray]:
+    """Query embeddings from a local Ollama server"""
+    from langchain_community.embeddings import OllamaEmbeddings
+
+    embeddings = OllamaEmbeddings(model=model, base_url=base_url)
+    return lambda text: np.asarray(embeddings.embed_query(text), dtype=np.float32)
+
+class _Partition:
+    """Entries of one language: an LRU of normalized queries, plus their unit embedding
+    vectors in one preallocated matrix, so a lookup is a single matrix-vector product"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # query -> (response, expiry, row of the vector matrix or -1)
+        self.entries: OrderedDict[str, tuple[str, float, int]] = OrderedDict()
+        self.vectors: Optional[np.ndarray] = None
+        self.row_queries: list[Optional[str]] = [None] * max_entries
+        self.free_rows = list(range(max_entries - 1, -1, -1))
+
+    def remove(self, query: str) -> None:
+        _, _, row = self.entries.pop(query)
+        if row >= 0:
+            self.vectors[row] = 0.0
+            self.row_queries[row] = None
+            self.free_rows.append(row)
+
+    def add(self, query: str, response: str, expiry: float, vector: Optional[np.ndarray]) -> None:
+        if query in self.entries:
+            self.remove(query)
+        while len(self.entries) >= self.max_entries:
+            self.remove(next(iter(self.entries)))
+        row = -1
+        if vector is not None:
+            if self.vectors is None:
+                self.vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            row = self.free_rows.pop()
+            self.vectors[row] = vector
+            self.row_queries[row] = query
+        self.entries[query] = (response, expiry, row)
+
+    def nearest(self, vector: np.ndarray) -> tuple[Optional[str], float]:
+        if self.vectors is None or len(self.free_rows) == self.max_entries:
+            return None, 0.0
+        # Free rows are zero, so they score 0
+        similarities = self.vectors @ vector
+        row = int(np.argmax(similarities))
+        return self.row_queries[row], float(similarities[row])
+
+class ResponseCache:
+    """LLM replies keyed by normalized query and partitioned by language.
+
+    Exact matches are looked up first; with an `embed` function, a miss falls back to
+    the most similar cached query above `similarity_threshold`. Entries expire after
+    `ttl_seconds` and each partition keeps at most `max_entries`, least recently used
+    first out. One cache can be shared by many sessions. Counters in `stats` are also
+    added to `metrics` with an `llm_cache_` prefix, so they reach the exporter.
+    """
+
+    def __init__(self,
+                 max_entries: int = 256,
+                 ttl_seconds: float = 3600.0,
+                 embed: Optional[Callable[[str], np.ndarray]] = None,
+                 similarity_threshold: float = 0.92,
+                 metrics: Optional[Metrics] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._partitions: dict[str, _Partition] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "expired": 0,
+            "saved_seconds": 0.0,
+        }
+        # Mean time of a full LLM reply, to estimate what a hit saves
+        self._miss_seconds = 0.0
+        self._timed_misses = 0
+
+    def _count(self, name: str, value: float = 1) -> None:
+        """Called with the lock held"""
+        self.stats[name] += value
+        self.metrics.increment(f"llm_cache_{name}", value)
+
+    @property
+    def hit_rate(self) -> float:
+        with self._lock:
+            hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+            lookups = hits + self.stats["misses"]
+        return hits / lookups if lookups else 0.0
+
+    def _vector(self, query: str) -> Optional[np.ndarray]:
+        if self.embed is None:
+            return None
+        try:
+            vector = np.asarray(self.embed(query), dtype=np.float32)
+        except Exception as e:
+            print(f"Error embedding query: {e}")
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    def _live(self, partition: _Partition, query: Optional[str], now: float) -> Optional[str]:
+        """Response for query unless it expired (expired entries are removed)"""
+        if query is None or query not in partition.entries:
+            return None
+        response, expiry, _ = partition.entries[query]
+        if expiry < now:
+            partition.remove(query)
+            self._count("expired")
+            return None
+        partition.entries.move_to_end(query)
+        return response
+
+    def get(self, language: str, query: str) -> tuple[Optional[str], Optional[np.ndarray]]:
+        """Cached response, or None and the query vector to store with the reply"""
+        now = monotonic()
+        with self._lock:
+            partition = self._partitions.get(language)
+            response = self._live(partition, query, now) if partition else None
+            if response is not None:
+                self._count("exact_hits")
+                return response, None
+
+        vector = self._vector(query)
+        if vector is not None:
+            with self._lock:
+                partition = self._partitions.get(language)
+                if partition is not None:
+                    match, similarity = partition.nearest(vector)
+                    if similarity >= self.similarity_threshold:
+                        response = self._live(partition, match, now)
+                        if response is not None:
+                            self._count("semantic_hits")
+                            return response, None
+
+        with self._lock:
+            self._count("misses")
+        return None, vector
+
+    def put(self, language: str, query: str, response: str, vector: Optional[np.ndarray] = None) -> None:
+        with self._lock:
+            partition = self._partitions.get(language)
+            if partition is None:
+                partition = self._partitions[language] = _Partition(self.max_entries)
+            partition.add(query, response, monotonic() + self.ttl_seconds, vector)
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self._count("bypassed")
+
+    def record_miss_time(self, seconds: float) -> None:
+        with self._lock:
+            self._timed_misses += 1
+            self._miss_seconds += (seconds - self._miss_seconds) / self._timed_misses
+
+    def record_hit_time(self, seconds: float) -> None:
+        with self._lock:
+            self._count("saved_seconds", max(self._miss_seconds - seconds, 0.0))
+
+class CachedLLM(LLMProvider):
+    """Answers repeated queries from a ResponseCache instead of the wrapped LLM.
+
+    The partition is the language of the system prompt (LanguageConfig.code). Queries
+    longer than `max_query_words`, or matching the language's `followup_pattern`
+    ("repeat that", "why?"), depend on the conversation, and queries matching its
+    `volatile_pattern` ("what time is it?") on the moment: they always go to the LLM.
+    The wrapped LLM's `fallback_response`, said when it produced nothing, is not cached.
+    Cached answers are still recorded in the wrapped LLM's conversation memory.
+    """
+
+    def __init__(self, llm: LLMProvider, cache: Optional[ResponseCache] = None, max_query_words: int = 12):
+        self.llm = llm
+        self.cache = cache if cache is not None else ResponseCache()
+        self.max_query_words = max_query_words
+
+    def fork(self) -> "CachedLLM":
+        """A new conversation that shares the cache"""
+        return CachedLLM(self.llm.fork(), self.cache, self.max_query_words)
+
+    @staticmethod
+    def _language(system_prompt: str) -> str:
+        language = _PROMPT_LANGUAGES.get(system_prompt)
+        if language is None:
+            language = "prompt-" + hashlib.sha1(system_prompt.encode("utf-8")).hexdigest()[:12]
+        return language
+
+    def _cacheable(self, language: str, query: str) -> bool:
+        if not query or len(query.split()) > self.max_query_words:
+            return False
+        patterns = (_FOLLOWUP_PATTERNS.get(language), _VOLATILE_PATTERNS.get(language))
+        return not any(pattern is not None and pattern.search(query) for pattern in patterns)
+
+    def get_response(self, text: str, system_prompt: str) -> str:
+        return "".join(self.stream_response(text, system_prompt))
+
+    def stream_response(self, text: str, system_prompt: str, record: bool = True) -> Iterator[str]:
+        start = perf_counter()
+        language = self._language(system_prompt)
+        query = normalize_query(text)
+        if not self._cacheable(language, query):
+            self.cache.record_bypass()
+            yield from self.llm.stream_response(text, system_prompt, record)
+            return
+
+        response, vector = self.cache.get(language, query)
+        if response is not None:
+            if record:
+                self.llm.record_turn(text, response)
+            self.cache.record_hit_time(perf_counter() - start)
+            yield response
+            return
+
+        # Only the wrapped LLM's time counts: the consumer may hold this generator
+        # suspended at yield, e.g. while the TTS queue is full
+        generation = perf_counter() - start
+        chunks = []
+        stream = self.llm.stream_response(text, system_prompt, record)
+        try:
+            while True:
+                resumed = perf_counter()
+                try:
+                    chunk = next(stream)
+                except StopIteration:
+                    break
+                finally:
+                    generation += perf_counter() - resumed
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            stream.close()
+        # Only complete replies get here: a stream closed early is not cached
+        self.cache.record_miss_time(generation)
+        response = "".join(chunks).strip()
+        if response and response != getattr(self.llm, "fallback_response", None):
+            self.cache.put(language, query, response, vector)
+
+    def warmup(self) -> None:
+        self.llm.warmup()
+
+    def record_turn(self, text: str, response: str) -> None:
+        self.llm.record_turn(text, response)
+
+    def cleanup(self) -> None:
+        print(f"LLM cache stats: {self.cache.stats}, hit rate {self.cache.hit_rate:.1%}")
+        cleanup = getattr(self.llm, "cleanup", None)
+        if cleanup is not None:
+            cleanup()
@@ -0,0 +1,101 @@
+# providers/llm/conversation_memory.py
+import threading
+from typing import Callable, Optional
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English and Italian)"""
+    return (len(text) + 3) // 4
+
+class BoundedConversationMemory:
+    """Conversation history under a hard token budget.
+
+    Turns are kept verbatim and only appended, so the prompt prefix (system prompt,
+    summary, older turns) stays identical from one turn to the next and the server's
+    prompt cache stays warm. When the history grows past `summarize_at` of the budget,
+    every turn but the last `recent_turns` is folded into a running summary by
+    `summarize(summary, turns)` on a background thread; the prefix changes only then.
+    If the budget is reached before the summary is ready, history() leaves out the
+    oldest turns, so the budget holds even when summarization is slow or fails.
+    """
+
+    def __init__(self,
+                 summarize: Optional[Callable[[str, list[tuple[str, str]]], str]] = None,
+                 max_tokens: int = 1024,
+                 recent_turns: int = 4,
+                 summarize_at: float = 0.75,
+                 count_tokens: Callable[[str], int] = estimate_tokens):
+        self.summarize = summarize
+        self.max_tokens = max_tokens
+        self.recent_turns = recent_turns
+        self.summarize_at = summarize_at
+        self.count_tokens = count_tokens
+        self.summary = ""
+        # (user, assistant, tokens)
+        self._turns: list[tuple[str, str, int]] = []
+        self._folding = 0
+        # Bumped by clear(), so a summary of a cleared conversation is discarded
+        self._epoch = 0
+        self._summarizer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _turn_tokens(self, human: str, ai: str) -> int:
+        return self.count_tokens(human) + self.count_tokens(ai)
+
+    @property
+    def tokens(self) -> int:
+        """Tokens of the summary plus every verbatim turn"""
+        with self._lock:
+            return self.count_tokens(self.summary) + sum(tokens for _, _, tokens in self._turns)
+
+    def add_turn(self, human: str, ai: str) -> None:
+        with self._lock:
+            self._turns.append((human, ai, self._turn_tokens(human, ai)))
+            total = self.count_tokens(self.summary) + sum(tokens for _, _, tokens in self._turns)
+            if (self._folding or total <= self.max_tokens * self.summarize_at
+                    or len(self._turns) <= self.recent_turns):
+                return
+            self._folding = len(self._turns) - self.recent_turns
+            fold = [(human, ai) for human, ai, _ in self._turns[:self._folding]]
+            summary = self.summary
+            epoch = self._epoch
+
+        self._summarizer = threading.Thread(
+            target=self._fold, args=(summary, fold, epoch), name="memory-summary", daemon=True
+        )
+        self._summarizer.start()
+
+    def _fold(self, summary: str, turns: list[tuple[str, str]], epoch: int) -> None:
+        """Replace the oldest turns with an updated summary, off the critical path"""
+        new_summary = summary
+        if self.summarize is not None:
+            try:
+                new_summary = self.summarize(summary, turns)
+            except Exception as e:
+                # The turns are dropped anyway: memory must stay bounded
+                print(f"Error summarizing conversation: {e}")
+        with self._lock:
+            if self._folding and epoch == self._epoch:
+                self.summary = new_summary
+                del self._turns[:self._folding]
+                self._folding = 0
+
+    def history(self) -> tuple[str, list[tuple[str, str]]]:
+        """Summary and verbatim turns that fit in the token budget"""
+        with self._lock:
+            summary = self.summary
+            budget = self.max_tokens - self.count_tokens(summary)
+            if budget < 0:
+                # Only a runaway summary gets here
+                summary, budget = "", self.max_tokens
+            start = len(self._turns)
+            while start > 0 and self._turns[start - 1][2] <= budget:
+                start -= 1
+                budget -= self._turns[start][2]
+            return summary, [(human, ai) for human, ai, _ in self._turns[start:]]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.summary = ""
+            self._turns.clear()
+            self._folding = 0
+            self._epoch += 1
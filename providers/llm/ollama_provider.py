@@ -1,57 +1,150 @@
-from typing import List, Optional
+from collections import deque
+from time import perf_counter
+from typing import Any, Iterator, List, Optional
 from langchain.chat_models import ChatOllama
-from langchain.memory import ConversationBufferMemory
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder, SystemMessagePromptTemplate
-from langchain.chains import ConversationChain
-from langchain.schema import SystemMessage, HumanMessage
-from langchain.prompts.chat import BaseMessagePromptTemplate
+from langchain.schema import AIMessage, BaseMessage, SystemMessage, HumanMessage
 from ..base import LLMProvider
+from .conversation_memory import BoundedConversationMemory
+
+SUMMARY_PROMPT = (
+    "You maintain the memory of a voice assistant. Merge the new conversation lines into "
+    "the current summary. Keep names, facts, preferences and open requests; drop small "
+    "talk. Answer with the updated summary only, in at most 150 words."
+)
 
 class OllamaLLM(LLMProvider):
-    def __init__(self, model_name: str = "llama2"):
+    # Said when the model returns nothing; never worth caching
+    fallback_response = self.fallback_response
+
+    def __init__(self,
+                 model_name: str = "llama2",
+                 chat: Optional[ChatOllama] = None,
+                 max_history_tokens: int = 1024,
+                 recent_turns: int = 4):
         # Inizializza il modello chat
-        self.chat = ChatOllama(
+        self.chat = chat or ChatOllama(
             model=model_name,
             base_url="http://localhost:11434"
         )
 
-        # Inizializza la memoria
-        self.memory = ConversationBufferMemory(
-            return_messages=True,
-            memory_key="chat_history"
+        # Memoria con budget di token: turni recenti verbatim, i più vecchi riassunti
+        self.max_history_tokens = max_history_tokens
+        self.recent_turns = recent_turns
+        self.memory = BoundedConversationMemory(
+            summarize=self._summarize,
+            max_tokens=max_history_tokens,
+            recent_turns=recent_turns
         )
 
-        # Crea il template del prompt
-        self.prompt = ChatPromptTemplate.from_messages([
-            SystemMessage(content="You are a helpful voice assistant. Be concise and natural in your responses."),
-            MessagesPlaceholder(variable_name="chat_history"),
-            ("human", "{input}")
-        ])
+        # Prompt size of every turn, to check that latency stays flat in long sessions
+        self.prompt_stats: deque = deque(maxlen=1000)
+        self._turn_count = 0
 
-        # Crea la catena di conversazione
-        self.conversation = ConversationChain(
-            memory=self.memory,
-            prompt=self.prompt,
-            llm=self.chat
+    def fork(self) -> "OllamaLLM":
+        """A new conversation with its own memory on the same Ollama client"""
+        return OllamaLLM(
+            chat=self.chat,
+            max_history_tokens=self.max_history_tokens,
+            recent_turns=self.recent_turns
         )
 
+    def _build_messages(self, text: str, system_prompt: str) -> List[BaseMessage]:
+        """System prompt first and unchanged, so the server can reuse its prompt cache"""
+        summary, turns = self.memory.history()
+        messages: List[BaseMessage] = [SystemMessage(content=system_prompt)]
+        if summary:
+            messages.append(SystemMessage(content=f"Summary of the earlier conversation: {summary}"))
+        for human, ai in turns:
+            messages.append(HumanMessage(content=human))
+            messages.append(AIMessage(content=ai))
+        messages.append(HumanMessage(content=text))
+        return messages
+
+    def _summarize(self, summary: str, turns: list[tuple[str, str]]) -> str:
+        lines = "\n".join(f"User: {human}\nAssistant: {ai}" for human, ai in turns)
+        result = self.chat.invoke([
+            SystemMessage(content=SUMMARY_PROMPT),
+            HumanMessage(content=f"Current summary: {summary or '(empty)'}\n\nNew conversation lines:\n{lines}")
+        ])
+        return str(result.content).strip()
+
+    def _record_turn(self, text: str, response: str, messages: List[BaseMessage],
+                     metadata: dict[str, Any], first_token: Optional[float]) -> None:
+        self._turn_count += 1
+        prompt_eval_ns = metadata.get("prompt_eval_duration")
+        self.prompt_stats.append({
+            "turn": self._turn_count,
+            "prompt_tokens": sum(self.memory.count_tokens(str(m.content)) for m in messages),
+            # Reported by Ollama when available; lower than prompt_tokens on a cache hit
+            "prompt_eval_count": metadata.get("prompt_eval_count"),
+            "prompt_eval_ms": prompt_eval_ns / 1e6 if prompt_eval_ns else None,
+            "first_token_ms": first_token * 1000 if first_token is not None else None,
+            "history_tokens": self.memory.tokens,
+        })
+        self.memory.add_turn(text, response)
+
+    def warmup(self) -> None:
+        """Make Ollama load the model; the exchange is not kept in memory"""
+        self.chat.invoke([HumanMessage(content="Hi")])
+
+    def record_turn(self, text: str, response: str) -> None:
+        self.memory.add_turn(text, response)
+
     def get_response(self, text: str, system_prompt: str) -> str:
         try:
-            # Aggiorna il system prompt se necessario
-            self.prompt.messages[0] = SystemMessage(content=system_prompt)
+            messages = self._build_messages(text, system_prompt)
+            start = perf_counter()
+            result = self.chat.invoke(messages)
+            response = str(result.content).strip()
 
-            # Ottieni la risposta
-            response = self.conversation.predict(input=text)
+            if not response:
+                response = self.fallback_response
 
-            if response is None:
-                return "I apologize, I couldn't generate a response."
-
-            return response.strip()
+            self._record_turn(text, response, messages,
+                              getattr(result, "response_metadata", None) or {},
+                              perf_counter() - start)
+            return response
 
         except Exception as e:
             print(f"Error getting LLM response: {e}")
             raise
 
+    def stream_response(self, text: str, system_prompt: str, record: bool = True) -> Iterator[str]:
+        try:
+            messages = self._build_messages(text, system_prompt)
+
+            # Stream the tokens, then record the full reply in memory
+            chunks = []
+            metadata: dict[str, Any] = {}
+            start = perf_counter()
+            first_token: Optional[float] = None
+            stream = self.chat.stream(messages)
+            try:
+                for chunk in stream:
+                    # The final chunk carries Ollama's prompt_eval_count
+                    metadata.update(getattr(chunk, "response_metadata", None) or {})
+                    if chunk.content:
+                        if first_token is None:
+                            first_token = perf_counter() - start
+                        chunks.append(chunk.content)
+                        yield chunk.content
+            finally:
+                # Closed early (barge-in, discarded speculation): drop the HTTP stream
+                # now, so Ollama stops generating
+                stream.close()
+
+            response = "".join(chunks).strip()
+            if not response:
+                response = self.fallback_response
+                yield response
+
+            if record:
+                self._record_turn(text, response, messages, metadata, first_token)
+
+        except Exception as e:
+            print(f"Error streaming LLM response: {e}")
+            raise
+
     def cleanup(self) -> None:
         if self.memory is not None:
             self.memory.clear()
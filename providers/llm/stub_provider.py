@@ -0,0 +1,44 @@
+# providers/llm/stub_provider.py
+from time import sleep
+from typing import Iterator, Optional
+from ..base import LLMProvider
+
+class StubLLM(LLMProvider):
+    """Deterministic LLM for offline replay: fixed replies with configurable delays"""
+
+    def __init__(self,
+                 response: str = "This is a test response. It is spoken in two sentences.",
+                 responses: Optional[dict[str, str]] = None,
+                 first_token_delay: float = 0.3,
+                 token_delay: float = 0.02):
+        self.response = response
+        self.responses = responses or {}
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.history: list[tuple[str, str]] = []
+
+    def fork(self) -> "StubLLM":
+        return StubLLM(self.response, self.responses, self.first_token_delay, self.token_delay)
+
+    def _reply(self, text: str) -> str:
+        return self.responses.get(text.strip().lower(), self.response)
+
+    def get_response(self, text: str, system_prompt: str) -> str:
+        return "".join(self.stream_response(text, system_prompt))
+
+    def stream_response(self, text: str, system_prompt: str, record: bool = True) -> Iterator[str]:
+        reply = self._reply(text)
+        sleep(self.first_token_delay)
+        words = reply.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+        if record:
+            self.history.append((text, reply))
+
+    def record_turn(self, text: str, response: str) -> None:
+        self.history.append((text, response))
+
+    def cleanup(self) -> None:
+        self.history.clear()
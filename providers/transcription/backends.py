@@ -0,0 +1,33 @@
+# providers/transcription/backends.py
+from config.whisper_config import WhisperConfig
+from ..base import StreamingTranscriptionProvider
+
+def create_whisper(config: WhisperConfig, sample_rate: int = 16000) -> StreamingTranscriptionProvider:
+    """Whisper provider for the configured backend; each backend's runtime is imported
+    only when it is selected"""
+    cache_dir = config.cache_dir or None
+    if config.backend == "ctranslate2":
+        from .faster_whisper_provider import FasterWhisperProvider
+        return FasterWhisperProvider(
+            language=config.whisper_language,
+            device=config.device,
+            sample_rate=sample_rate,
+            model=config.model or config.model_size,
+            cache_dir=cache_dir,
+            compute_type="int8" if config.compute_type == "default" else config.compute_type,
+            intra_op_threads=config.intra_op_threads,
+            inter_op_threads=config.inter_op_threads
+        )
+
+    from .whisper_provider import WhisperProvider
+    return WhisperProvider(
+        language=config.whisper_language,
+        device=config.device,
+        sample_rate=sample_rate,
+        model=config.model_id,
+        cache_dir=cache_dir,
+        quantize=config.backend == "torch-int8",
+        compute_type=config.compute_type,
+        intra_op_threads=config.intra_op_threads,
+        inter_op_threads=config.inter_op_threads
+    )
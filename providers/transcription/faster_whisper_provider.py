@@ -0,0 +1,111 @@
+# providers/transcription/faster_whisper_provider.py
+import threading
+from typing import Callable, Optional
+import numpy as np
+from faster_whisper import WhisperModel
+from ..base import StreamingTranscriptionProvider, TranscriptionStream
+from .whisper_stream import WhisperStream
+
+class FasterWhisperProvider(StreamingTranscriptionProvider):
+    """Whisper on CTranslate2 through faster-whisper (the "ctranslate2" backend).
+
+    `model` is a size ("base", "small", ...), a converted model on the Hugging Face
+    Hub or a local directory. compute_type "int8" quantizes the weights on load; on CPU
+    `intra_op_threads` sets CTranslate2's threads per decode and `inter_op_threads` the
+    number of decodes that can run in parallel from different threads, so there is no
+    global lock as with the torch pipeline. With language=None the language of every
+    utterance is detected by the model.
+    """
+
+    def __init__(self, language: Optional[str] = "en", device: str = "cpu", sample_rate: int = 16000,
+                 stream_step_seconds: float = 1.0, model: str = "base",
+                 cache_dir: Optional[str] = None, compute_type: str = "int8",
+                 intra_op_threads: int = 0, inter_op_threads: int = 1, beam_size: int = 1):
+        self.sample_rate = sample_rate
+        self.stream_step_seconds = stream_step_seconds
+        self.language = language
+        self.beam_size = beam_size
+
+        print("Initializing Whisper (CTranslate2)...")
+        # CTranslate2 has no mps device
+        self.device = "cuda" if device in ("auto", "cuda") and _has_cuda() else "cpu"
+        self.model = WhisperModel(
+            model,
+            device=self.device,
+            compute_type=compute_type,
+            cpu_threads=intra_op_threads,
+            num_workers=max(inter_op_threads, 1),
+            download_root=cache_dir
+        )
+
+    def _decode(self, audio_data: np.ndarray, language: Optional[str] = None):
+        """Lazy segments and the TranscriptionInfo (with the detected language)"""
+        audio = np.ascontiguousarray(audio_data, dtype=np.float32)
+        return self.model.transcribe(
+            audio,
+            language=language or self.language,
+            task="transcribe",
+            beam_size=self.beam_size,
+            condition_on_previous_text=False,
+            vad_filter=False
+        )
+
+    def _segments(self, audio_data: np.ndarray, cancel: Optional[threading.Event] = None):
+        # Segments are decoded lazily, 30 s window by 30 s window
+        segments, _ = self._decode(audio_data)
+        for segment in segments:
+            if cancel is not None and cancel.is_set():
+                return
+            yield segment
+
+    def warmup(self) -> None:
+        self.transcribe(np.zeros(self.sample_rate, dtype=np.float32))
+
+    def transcribe(self, audio_data: np.ndarray) -> str:
+        try:
+            return " ".join(segment.text.strip() for segment in self._segments(audio_data)).strip()
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return ""
+
+    def transcribe_with_language(self, audio_data: np.ndarray) -> tuple[str, Optional[str]]:
+        try:
+            segments, info = self._decode(audio_data)
+            return " ".join(segment.text.strip() for segment in segments).strip(), info.language
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return "", None
+
+    def transcribe_cancellable(self, audio_data: np.ndarray, cancel: threading.Event) -> Optional[str]:
+        """Checked between 30 s windows"""
+        if cancel.is_set():
+            return None
+        try:
+            text = " ".join(segment.text.strip() for segment in self._segments(audio_data, cancel)).strip()
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return ""
+        return None if cancel.is_set() else text
+
+    def decode_segments(self, audio_data: np.ndarray) -> list[tuple[float, Optional[float], str]]:
+        return self.decode_segments_with_language(audio_data)[0]
+
+    def decode_segments_with_language(self, audio_data: np.ndarray, language: Optional[str] = None
+                                      ) -> tuple[list[tuple[float, Optional[float], str]], Optional[str]]:
+        """`language` is imposed on this decode, otherwise the provider's or the detected one"""
+        try:
+            segments, info = self._decode(audio_data, language)
+            return [(segment.start, segment.end, segment.text.strip()) for segment in segments], info.language
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return [], language or self.language
+
+    def begin_stream(self, on_partial: Optional[Callable[[str], None]] = None) -> TranscriptionStream:
+        return WhisperStream(self, on_partial=on_partial, step_seconds=self.stream_step_seconds)
+
+    def cleanup(self) -> None:
+        pass  # The model is released with the provider
+
+def _has_cuda() -> bool:
+    import ctranslate2
+    return ctranslate2.get_cuda_device_count() > 0
@@ -0,0 +1,109 @@
+# providers/transcription/process_provider.py
+import threading
+from typing import Any, Callable, Optional
+import numpy as np
+from core.metrics import Metrics
+from core.process_stage import StageBudget, StageWorker
+from ..base import StreamingTranscriptionProvider, TranscriptionStream
+from .whisper_stream import WhisperStream
+
+class ProcessTranscriber(StreamingTranscriptionProvider):
+    """A transcriber running in its own worker process (see core/process_stage.py).
+
+    `builder` creates the transcriber in the worker, with `budget` applied there; audio
+    reaches it through shared memory. Its torch threads and GIL are then separate from
+    the capture loop's. Streams are decoded with WhisperStream on this side, so the
+    wrapped transcriber must provide decode_segments_with_language(). If the worker crashes, it is
+    restarted and the utterance it was decoding transcribes to "".
+    """
+
+    def __init__(self,
+                 builder: Callable[[], Any],
+                 budget: StageBudget = StageBudget(),
+                 sample_rate: int = 16000,
+                 stream_step_seconds: float = 1.0,
+                 buffer_seconds: float = 300.0,
+                 call_timeout: Optional[float] = 600.0,
+                 metrics: Optional[Metrics] = None):
+        print("Starting the transcription worker process...")
+        self.sample_rate = sample_rate
+        self.stream_step_seconds = stream_step_seconds
+        self.worker = StageWorker(
+            "transcription",
+            builder,
+            budget,
+            buffer_samples=int(buffer_seconds * sample_rate),
+            call_timeout=call_timeout,
+            metrics=metrics
+        )
+
+    def warmup(self) -> None:
+        self.worker.call("warmup")
+
+    def transcribe(self, audio_data: np.ndarray) -> str:
+        try:
+            return self.worker.call("transcribe", audio_data)
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return ""
+
+    def transcribe_batch(self, audio_batch: list[np.ndarray]) -> list[str]:
+        if not audio_batch:
+            return []
+        try:
+            return self.worker.call("transcribe_batch", list(audio_batch))
+        except Exception as e:
+            print(f"Error transcribing audio batch: {e}")
+            return [""] * len(audio_batch)
+
+    def transcribe_with_language(self, audio_data: np.ndarray) -> tuple[str, Optional[str]]:
+        try:
+            return self.worker.call("transcribe_with_language", audio_data)
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return "", None
+
+    def transcribe_batch_with_language(self, audio_batch: list[np.ndarray]) -> list[tuple[str, Optional[str]]]:
+        if not audio_batch:
+            return []
+        try:
+            return self.worker.call("transcribe_batch_with_language", list(audio_batch))
+        except Exception as e:
+            print(f"Error transcribing audio batch: {e}")
+            return [("", None)] * len(audio_batch)
+
+    def transcribe_cancellable(self, audio_data: np.ndarray, cancel: threading.Event) -> Optional[str]:
+        """`cancel` is mirrored to the worker while it decodes"""
+        if cancel.is_set():
+            return None
+        try:
+            text = self.worker.call("transcribe_cancellable", audio_data, cancel)
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return ""
+        return None if cancel.is_set() else text
+
+    def decode_segments(self, audio_data: np.ndarray) -> list[tuple[float, Optional[float], str]]:
+        try:
+            return self.worker.call("decode_segments", audio_data)
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return []
+
+    def decode_segments_with_language(self, audio_data: np.ndarray, language: Optional[str] = None
+                                      ) -> tuple[list[tuple[float, Optional[float], str]], Optional[str]]:
+        try:
+            return self.worker.call("decode_segments_with_language", audio_data, language)
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return [], language
+
+    def begin_stream(self, on_partial: Optional[Callable[[str], None]] = None) -> TranscriptionStream:
+        return WhisperStream(self, on_partial=on_partial, step_seconds=self.stream_step_seconds)
+
+    def cleanup(self) -> None:
+        try:
+            self.worker.call("cleanup")
+        except Exception as e:
+            print(f"Error cleaning up the transcription worker: {e}")
+        self.worker.close()
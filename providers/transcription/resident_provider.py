@@ -0,0 +1,64 @@
+# providers/transcription/resident_provider.py
+import threading
+from typing import Any, Callable, Optional
+import numpy as np
+from core.residency import ModelResidencyManager
+from ..base import StreamingTranscriptionProvider, TranscriptionProvider, TranscriptionStream
+from .whisper_stream import WhisperStream
+
+class ResidentTranscriber(StreamingTranscriptionProvider):
+    """A transcriber whose model a ModelResidencyManager may unload when it is idle or
+    over budget; the next call reloads it with `builder`. Streams are decoded with
+    WhisperStream on this side, so the wrapped transcriber must provide
+    decode_segments_with_language()."""
+
+    def __init__(self,
+                 manager: ModelResidencyManager,
+                 name: str,
+                 builder: Callable[[], TranscriptionProvider],
+                 sample_rate: int = 16000,
+                 stream_step_seconds: float = 1.0,
+                 pinned: bool = False):
+        self.manager = manager
+        self.name = name
+        self.sample_rate = sample_rate
+        self.stream_step_seconds = stream_step_seconds
+        manager.register(name, builder, pinned)
+
+    def _call(self, method: str, *args: Any) -> Any:
+        with self.manager.use(self.name) as transcriber:
+            return getattr(transcriber, method)(*args)
+
+    def warmup(self) -> None:
+        self._call("warmup")
+
+    def transcribe(self, audio_data: np.ndarray) -> str:
+        return self._call("transcribe", audio_data)
+
+    def transcribe_batch(self, audio_batch: list[np.ndarray]) -> list[str]:
+        return self._call("transcribe_batch", audio_batch)
+
+    def transcribe_cancellable(self, audio_data: np.ndarray, cancel: threading.Event) -> Optional[str]:
+        if cancel.is_set():
+            return None
+        return self._call("transcribe_cancellable", audio_data, cancel)
+
+    def transcribe_with_language(self, audio_data: np.ndarray) -> tuple[str, Optional[str]]:
+        return self._call("transcribe_with_language", audio_data)
+
+    def transcribe_batch_with_language(self, audio_batch: list[np.ndarray]) -> list[tuple[str, Optional[str]]]:
+        return self._call("transcribe_batch_with_language", audio_batch)
+
+    def decode_segments(self, audio_data: np.ndarray) -> list[tuple[float, Optional[float], str]]:
+        return self._call("decode_segments", audio_data)
+
+    def decode_segments_with_language(self, audio_data: np.ndarray, language: Optional[str] = None
+                                      ) -> tuple[list[tuple[float, Optional[float], str]], Optional[str]]:
+        return self._call("decode_segments_with_language", audio_data, language)
+
+    def begin_stream(self, on_partial: Optional[Callable[[str], None]] = None) -> TranscriptionStream:
+        return WhisperStream(self, on_partial=on_partial, step_seconds=self.stream_step_seconds)
+
+    def cleanup(self) -> None:
+        """Unloads the model and forgets it"""
+        self.manager.unregister(self.name)
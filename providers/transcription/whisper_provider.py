@@ -1,38 +1,237 @@
 import warnings
 from transformers import logging
 
+import threading
 import numpy as np
-from transformers import pipeline
-from scipy.io import wavfile
-import tempfile
-from typing import Any
-from ..base import TranscriptionProvider
-
-class WhisperProvider(TranscriptionProvider):
-    def __init__(self, language: str = "en", device: str = "mps"):
+import torch
+from transformers import pipeline, StoppingCriteria, StoppingCriteriaList
+from typing import Any, Callable, Optional
+from ..base import StreamingTranscriptionProvider, TranscriptionStream
+from .whisper_stream import WhisperStream
+
+def resolve_model(model: str, cache_dir: Optional[str] = None) -> str:
+    """Local snapshot of a Hugging Face model, downloaded only if it is not cached yet.
+
+    Only the configuration, tokenizer and safetensors weights are fetched.
+    """
+    from huggingface_hub import snapshot_download
+
+    patterns = ["*.json", "*.txt", "*.safetensors"]
+    try:
+        return snapshot_download(model, cache_dir=cache_dir, allow_patterns=patterns, local_files_only=True)
+    except Exception:
+        print(f"Downloading {model}...")
+        return snapshot_download(model, cache_dir=cache_dir, allow_patterns=patterns)
+
+def resolve_device(device: str) -> str:
+    """"auto": cuda, then mps, then cpu"""
+    if device != "auto":
+        return device
+    if torch.cuda.is_available():
+        return "cuda"
+    if getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+def set_torch_threads(intra_op_threads: int = 0, inter_op_threads: int = 0) -> None:
+    """0 keeps torch's default. The inter-op pool can only be sized before it is used"""
+    if intra_op_threads > 0:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads > 0:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as e:
+            print(f"Cannot set inter-op threads: {e}")
+
+def language_code(name: Optional[str]) -> Optional[str]:
+    """Whisper's language name ("italian") or code as an ISO code ("it")"""
+    if not name:
+        return None
+    from transformers.models.whisper.tokenization_whisper import LANGUAGES, TO_LANGUAGE_CODE
+    name = name.strip("<|>").lower()
+    return name if name in LANGUAGES else TO_LANGUAGE_CODE.get(name)
+
+class _CancelCriteria(StoppingCriteria):
+    """Stops generate() at the next token once the event is set"""
+
+    def __init__(self, cancel: threading.Event):
+        self.cancel = cancel
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.cancel.is_set(), dtype=torch.bool, device=input_ids.device)
+
+class WhisperProvider(StreamingTranscriptionProvider):
+    """Whisper on a transformers pipeline (the "torch" and "torch-int8" backends).
+
+    With quantize=True the Linear layers, where nearly all of Whisper's compute is, are
+    dynamically quantized to int8; that runs on CPU only. compute_type="float16" loads
+    half-precision weights for GPUs.
+
+    With language=None Whisper detects the language of every utterance itself, from the
+    language token it decodes first; transcribe_with_language() returns it.
+    """
+
+    def __init__(self, language: Optional[str] = "en", device: str = "auto", sample_rate: int = 16000,
+                 stream_step_seconds: float = 1.0, model: str = "openai/whisper-base",
+                 cache_dir: Optional[str] = None, quantize: bool = False,
+                 compute_type: str = "default", intra_op_threads: int = 0,
+                 inter_op_threads: int = 0):
+        self.sample_rate = sample_rate
+        self.stream_step_seconds = stream_step_seconds
+        # The pipeline is shared by the transcription worker and the streaming decoders
+        self._lock = threading.Lock()
+
         # Disabilita i warning di transformers
         warnings.filterwarnings("ignore", category=FutureWarning)
         logging.set_verbosity_error()  # Mostra solo errori, non warning
 
         print("Initializing Whisper...")
+        set_torch_threads(intra_op_threads, inter_op_threads)
+        device = resolve_device(device)
+        if quantize and device != "cpu":
+            print(f"int8 dynamic quantization runs on CPU only, not on {device}: using the CPU")
+            device = "cpu"
+        self.device = device
+        self.language = language
+        self.generate_kwargs = {"task": "transcribe"}
+        if language is not None:
+            self.generate_kwargs["language"] = language
         self.stt = pipeline(
             "automatic-speech-recognition",
-            model="openai/whisper-base",
+            model=resolve_model(model, cache_dir),
             device=device,
-            generate_kwargs={
-                "language": language,
-                "task": "transcribe"
-            }
+            torch_dtype=torch.float16 if compute_type == "float16" else torch.float32,
+            generate_kwargs=self.generate_kwargs
         )
+        if quantize:
+            self.stt.model = torch.ao.quantization.quantize_dynamic(
+                self.stt.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+    def warmup(self) -> None:
+        self.transcribe(np.zeros(self.sample_rate, dtype=np.float32))
 
     def transcribe(self, audio_data: np.ndarray) -> str:
         try:
-            wavfile.write("temp.wav", 16000, audio_data)
-            result = self.stt("temp.wav", batch_size=1)
+            # Feed the samples straight to the pipeline: no temp file and no re-decode.
+            # ascontiguousarray is a no-op for the float32 buffers we get from capture
+            audio = np.ascontiguousarray(audio_data, dtype=np.float32)
+            with self._lock:
+                result = self.stt({"raw": audio, "sampling_rate": self.sample_rate}, batch_size=1)
             return result["text"].strip()
         except Exception as e:
             print(f"Error transcribing audio: {e}")
             return ""
 
+    def transcribe_with_language(self, audio_data: np.ndarray) -> tuple[str, Optional[str]]:
+        """The language is read from the decoded language token: no extra model pass"""
+        if self.language is not None:
+            return self.transcribe(audio_data), self.language
+        try:
+            audio = np.ascontiguousarray(audio_data, dtype=np.float32)
+            with self._lock:
+                result = self.stt(
+                    {"raw": audio, "sampling_rate": self.sample_rate},
+                    batch_size=1,
+                    return_language=True
+                )
+            languages = [chunk.get("language") for chunk in result.get("chunks", [])]
+            return result["text"].strip(), language_code(next(filter(None, languages), None))
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return "", None
+
+    def transcribe_cancellable(self, audio_data: np.ndarray, cancel: threading.Event) -> Optional[str]:
+        """Decoding stops at the next token once `cancel` is set"""
+        if cancel.is_set():
+            return None
+        try:
+            audio = np.ascontiguousarray(audio_data, dtype=np.float32)
+            # Call-time generate_kwargs replace the pipeline's: language and task again
+            generate_kwargs = {
+                **self.generate_kwargs,
+                "stopping_criteria": StoppingCriteriaList([_CancelCriteria(cancel)])
+            }
+            with self._lock:
+                if cancel.is_set():
+                    return None
+                result = self.stt(
+                    {"raw": audio, "sampling_rate": self.sample_rate},
+                    batch_size=1,
+                    generate_kwargs=generate_kwargs
+                )
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return ""
+        return None if cancel.is_set() else result["text"].strip()
+
+    def transcribe_batch(self, audio_batch: list[np.ndarray]) -> list[str]:
+        """One batched forward pass; Whisper pads every input to 30 s anyway"""
+        if not audio_batch:
+            return []
+        try:
+            inputs = [
+                {"raw": np.ascontiguousarray(audio, dtype=np.float32), "sampling_rate": self.sample_rate}
+                for audio in audio_batch
+            ]
+            with self._lock:
+                results = self.stt(inputs, batch_size=len(inputs))
+            return [result["text"].strip() for result in results]
+        except Exception as e:
+            print(f"Error transcribing audio batch: {e}")
+            return [""] * len(audio_batch)
+
+    def transcribe_batch_with_language(self, audio_batch: list[np.ndarray]) -> list[tuple[str, Optional[str]]]:
+        """One batched forward pass, each utterance with its own language token"""
+        if self.language is not None:
+            return [(text, self.language) for text in self.transcribe_batch(audio_batch)]
+        if not audio_batch:
+            return []
+        try:
+            inputs = [
+                {"raw": np.ascontiguousarray(audio, dtype=np.float32), "sampling_rate": self.sample_rate}
+                for audio in audio_batch
+            ]
+            with self._lock:
+                results = self.stt(inputs, batch_size=len(inputs), return_language=True)
+            transcripts = []
+            for result in results:
+                languages = [chunk.get("language") for chunk in result.get("chunks", [])]
+                transcripts.append((result["text"].strip(), language_code(next(filter(None, languages), None))))
+            return transcripts
+        except Exception as e:
+            print(f"Error transcribing audio batch: {e}")
+            return [("", None)] * len(audio_batch)
+
+    def decode_segments(self, audio_data: np.ndarray) -> list[tuple[float, Optional[float], str]]:
+        """Transcribe with segment timestamps as (start, end, text); end is None for an open segment"""
+        return self.decode_segments_with_language(audio_data)[0]
+
+    def decode_segments_with_language(self, audio_data: np.ndarray, language: Optional[str] = None
+                                      ) -> tuple[list[tuple[float, Optional[float], str]], Optional[str]]:
+        """decode_segments() and the language: `language` is imposed on this decode,
+        otherwise the provider's own, otherwise it is read from the language token"""
+        language = language or self.language
+        try:
+            audio = np.ascontiguousarray(audio_data, dtype=np.float32)
+            options: dict[str, Any] = {"return_timestamps": True}
+            if language is None:
+                options["return_language"] = True
+            elif language != self.language:
+                # Call-time generate_kwargs replace the pipeline's: task again
+                options["generate_kwargs"] = {**self.generate_kwargs, "language": language}
+            with self._lock:
+                result = self.stt({"raw": audio, "sampling_rate": self.sample_rate}, batch_size=1, **options)
+            chunks = result.get("chunks", [])
+            if language is None:
+                language = language_code(next(filter(None, (chunk.get("language") for chunk in chunks)), None))
+            return [(chunk["timestamp"][0], chunk["timestamp"][1], chunk["text"].strip()) for chunk in chunks], language
+        except Exception as e:
+            print(f"Error transcribing audio: {e}")
+            return [], language
+
+    def begin_stream(self, on_partial: Optional[Callable[[str], None]] = None) -> TranscriptionStream:
+        return WhisperStream(self, on_partial=on_partial, step_seconds=self.stream_step_seconds)
+
     def cleanup(self) -> None:
         pass  # Nothing to cleanup for Whisper
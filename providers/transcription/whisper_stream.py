@@ -0,0 +1,140 @@
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+import numpy as np
+from ..base import TranscriptionStream
+
+if TYPE_CHECKING:
+    from .whisper_provider import WhisperProvider
+
+class WhisperStream(TranscriptionStream):
+    """Re-decodes the growing uncommitted window in the background.
+
+    Whisper segments that two consecutive decodes agree on, and that end at least
+    `commit_margin` seconds before the end of the window, are committed: their text is
+    final and their audio is never decoded again. At end-of-utterance only the
+    uncommitted tail is left to transcribe.
+
+    Without a fixed language, the first decode of at least `language_seconds` of audio
+    that yields text sets the stream's language; every later decode, and the tail, is
+    decoded in it, so committed segments can't switch language.
+    """
+
+    def __init__(self,
+                 provider: "WhisperProvider",
+                 on_partial: Optional[Callable[[str], None]] = None,
+                 step_seconds: float = 1.0,
+                 commit_margin: float = 1.0,
+                 min_tail_seconds: float = 0.1,
+                 language_seconds: float = 1.0):
+        self.provider = provider
+        self.on_partial = on_partial
+        self.sample_rate = provider.sample_rate
+        self.step_samples = int(step_seconds * self.sample_rate)
+        self.commit_margin = commit_margin
+        self.min_tail_samples = int(min_tail_seconds * self.sample_rate)
+        self.language_samples = int(language_seconds * self.sample_rate)
+
+        self._audio = np.zeros(self.sample_rate * 10, dtype=np.float32)
+        self._length = 0
+        self._decoded_length = 0
+        self._committed_samples = 0
+        self._committed_text: list[str] = []
+        self._previous: list[tuple[float, Optional[float], str]] = []
+        self._tentative = ""
+        self._language: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._decode_loop, name="whisper-stream", daemon=True)
+        self._thread.start()
+
+    def feed(self, audio_chunk: np.ndarray) -> None:
+        with self._lock:
+            end = self._length + len(audio_chunk)
+            if end > len(self._audio):
+                # Grow geometrically; a decode in progress keeps its view of the old buffer
+                grown = np.zeros(max(end, 2 * len(self._audio)), dtype=np.float32)
+                grown[:self._length] = self._audio[:self._length]
+                self._audio = grown
+            self._audio[self._length:end] = audio_chunk
+            self._length = end
+            if self._length - self._decoded_length >= self.step_samples:
+                self._wakeup.set()
+
+    @property
+    def language(self) -> Optional[str]:
+        return self._language
+
+    @property
+    def partial(self) -> str:
+        with self._lock:
+            return " ".join(self._committed_text + [self._tentative]).strip()
+
+    def _decode_loop(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._closed.is_set():
+                return
+
+            with self._lock:
+                offset = self._committed_samples
+                window = self._audio[offset:self._length]
+                self._decoded_length = self._length
+            segments, language = self.provider.decode_segments_with_language(window, self._language)
+            if self._closed.is_set():
+                return
+
+            with self._lock:
+                if (self._language is None and offset + len(window) >= self.language_samples
+                        and any(text for _, _, text in segments)):
+                    self._language = language
+                self._commit(segments, offset, len(window) / self.sample_rate)
+                partial = " ".join(self._committed_text + [self._tentative]).strip()
+            if self.on_partial is not None and partial:
+                self.on_partial(partial)
+
+    def _commit(self, segments: list[tuple[float, Optional[float], str]], offset: int, duration: float) -> None:
+        """Local agreement: commit the stable prefix shared with the previous decode"""
+        committed = 0
+        for previous, current in zip(self._previous, segments):
+            start, end, text = current
+            if end is None or end > duration - self.commit_margin:
+                break
+            if previous[2] != text or previous[1] is None or abs(previous[1] - end) > 0.2:
+                break
+            self._committed_text.append(text)
+            committed += 1
+
+        remaining = segments[committed:]
+        if committed:
+            shift = segments[committed - 1][1] or 0.0
+            self._committed_samples = offset + int(shift * self.sample_rate)
+            remaining = [
+                (start - shift, None if end is None else end - shift, text)
+                for start, end, text in remaining
+            ]
+        self._previous = remaining
+        self._tentative = " ".join(text for _, _, text in remaining)
+
+    def finish(self) -> str:
+        self._closed.set()
+        self._wakeup.set()
+        self._thread.join()
+
+        with self._lock:
+            tail = self._audio[self._committed_samples:self._length]
+            committed = list(self._committed_text)
+        if len(tail) >= self.min_tail_samples:
+            if self._language is None:
+                text, self._language = self.provider.transcribe_with_language(tail)
+            else:
+                segments, _ = self.provider.decode_segments_with_language(tail, self._language)
+                text = " ".join(text for _, _, text in segments)
+            committed.append(text)
+        return " ".join(committed).strip()
+
+    def cancel(self) -> None:
+        self._closed.set()
+        self._wakeup.set()
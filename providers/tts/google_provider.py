@@ -1,32 +1,107 @@
 # providers/tts/google_provider.py
 from gtts import gTTS
-import pygame
-import tempfile
-import os
-from ..base import TTSProvider
+import miniaudio
+import numpy as np
+import io
+import threading
+from typing import Iterator, Optional
+from ..base import StreamingTTSProvider
+from .playback import StreamingPlayer
+from .tts_cache import TTSCache
 
-class GoogleTTS(TTSProvider):
-    def __init__(self):
-        pygame.mixer.init()
+# gTTS returns 24 kHz mono MP3
+GTTS_SAMPLE_RATE = 24000
+
+class _ChunkSource(miniaudio.StreamableSource):
+    """Hands MP3 bytes to the decoder as gTTS delivers them"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def read(self, num_bytes: int) -> bytes:
+        while len(self._buffer) < num_bytes:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+        data, self._buffer = self._buffer[:num_bytes], self._buffer[num_bytes:]
+        return data
+
+class GoogleTTS(StreamingTTSProvider):
+    def __init__(self, cache: Optional[TTSCache] = None, tld: str = "com", block_frames: int = 1024):
+        self._interrupted = threading.Event()
+        # gTTS voices are selected by the Google Translate domain (accent)
+        self.tld = tld
+        self.cache = cache if cache is not None else TTSCache()
+        self.block_frames = block_frames
+        self.player = StreamingPlayer(block_frames=block_frames)
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        """MP3 bytes for text, from the cache when possible"""
+        key = self.cache.key(text, language, self.tld)
+        audio = self.cache.get(key)
+        if audio is None:
+            buffer = io.BytesIO()
+            gTTS(text=text, lang=language, tld=self.tld).write_to_fp(buffer)
+            audio = buffer.getvalue()
+            self.cache.put(key, audio)
+        return audio
+
+    def output_sample_rate(self, language: str) -> int:
+        return GTTS_SAMPLE_RATE
+
+    def synthesize_stream(self, text: str, language: str) -> Iterator[np.ndarray]:
+        """Decode MP3 to PCM in memory while it is still being downloaded"""
+        key = self.cache.key(text, language, self.tld)
+        cached = self.cache.get(key)
+        parts: list[bytes] = []
+
+        def download() -> Iterator[bytes]:
+            for part in gTTS(text=text, lang=language, tld=self.tld).stream():
+                parts.append(part)
+                yield part
+
+        chunks = iter([cached]) if cached is not None else download()
+        decoder = miniaudio.stream_any(
+            _ChunkSource(chunks),
+            source_format=miniaudio.FileFormat.MP3,
+            output_format=miniaudio.SampleFormat.SIGNED16,
+            nchannels=1,
+            sample_rate=GTTS_SAMPLE_RATE,
+            frames_to_read=self.block_frames
+        )
+        for frames in decoder:
+            if len(frames):
+                yield np.frombuffer(frames, dtype=np.int16)
+
+        # Only complete downloads reach this point (an interrupted stream is closed early)
+        if cached is None and parts:
+            self.cache.put(key, b"".join(parts))
+
+    def prewarm(self, texts: list[str], language: str) -> None:
+        for text in texts:
+            try:
+                self.synthesize(text, language)
+            except Exception as e:
+                print(f"Error prewarming TTS cache: {e}")
 
     def speak(self, text: str, language: str) -> None:
+        self._interrupted.clear()
         try:
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-                tts = gTTS(text=text, lang=language)
-                tts.save(temp_file.name)
-                
-                pygame.mixer.music.load(temp_file.name)
-                pygame.mixer.music.play()
-                
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)
-                    
-                pygame.mixer.music.unload()
-            os.unlink(temp_file.name)
-            
+            self.player.play(
+                self.synthesize_stream(text, language),
+                GTTS_SAMPLE_RATE,
+                self._interrupted
+            )
         except Exception as e:
             print(f"Error in TTS: {e}")
             raise
 
+    def stop(self) -> None:
+        self._interrupted.set()
+        self.player.stop()
+
     def cleanup(self) -> None:
-        pygame.mixer.quit()
+        print(f"TTS cache stats: {self.cache.stats}")
+        self.player.cleanup()
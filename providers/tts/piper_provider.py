@@ -0,0 +1,62 @@
+# providers/tts/piper_provider.py
+import threading
+import numpy as np
+from piper.voice import PiperVoice
+from typing import Iterator
+from ..base import StreamingTTSProvider
+from .playback import StreamingPlayer
+
+class PiperTTS(StreamingTTSProvider):
+    """Offline neural TTS with Piper; audio is played sentence by sentence as it is synthesized"""
+
+    def __init__(self, model_paths: dict[str, str], block_frames: int = 1024):
+        # One voice model (.onnx, with its .onnx.json next to it) per language code
+        self.model_paths = model_paths
+        self.voices: dict[str, PiperVoice] = {}
+        self._lock = threading.Lock()
+        self._interrupted = threading.Event()
+        self.player = StreamingPlayer(block_frames=block_frames)
+
+    def _voice(self, language: str) -> PiperVoice:
+        with self._lock:
+            voice = self.voices.get(language)
+            if voice is None:
+                if language not in self.model_paths:
+                    raise ValueError(f"No Piper voice configured for language {language}")
+                print(f"Loading Piper voice for {language}...")
+                voice = PiperVoice.load(self.model_paths[language])
+                self.voices[language] = voice
+            return voice
+
+    def output_sample_rate(self, language: str) -> int:
+        return self._voice(language).config.sample_rate
+
+    def synthesize_stream(self, text: str, language: str) -> Iterator[np.ndarray]:
+        for audio_bytes in self._voice(language).synthesize_stream_raw(text):
+            yield np.frombuffer(audio_bytes, dtype=np.int16)
+
+    def warmup(self) -> None:
+        """Load every configured voice and synthesize a word with each"""
+        for language in self.model_paths:
+            for _ in self.synthesize_stream("Ok.", language):
+                pass
+
+    def speak(self, text: str, language: str) -> None:
+        self._interrupted.clear()
+        try:
+            self.player.play(
+                self.synthesize_stream(text, language),
+                self.output_sample_rate(language),
+                self._interrupted
+            )
+        except Exception as e:
+            print(f"Error in TTS: {e}")
+            raise
+
+    def stop(self) -> None:
+        self._interrupted.set()
+        self.player.stop()
+
+    def cleanup(self) -> None:
+        self.player.cleanup()
+        self.voices.clear()
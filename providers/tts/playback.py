@@ -0,0 +1,101 @@
+# providers/tts/playback.py
+import collections
+import threading
+import numpy as np
+import pyaudio
+from typing import Iterable, Optional
+
+class StreamingPlayer:
+    """Plays 16-bit mono PCM blocks through a callback-driven PyAudio output stream.
+
+    Output starts as soon as the first block is available while the producer keeps
+    decoding; completion is signalled by the stream callback through an event, and
+    stop() ends playback at the next callback.
+    """
+
+    def __init__(self, block_frames: int = 1024, audio: Optional[pyaudio.PyAudio] = None):
+        self.block_frames = block_frames
+        self.audio = audio or pyaudio.PyAudio()
+        self.underruns = 0
+        self._pending: collections.deque = collections.deque()
+        self._current = b""
+        self._offset = 0
+        self._queued_frames = 0
+        self._producer_done = threading.Event()
+        self._done = threading.Event()
+        self._stopped = threading.Event()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        needed = frame_count * 2
+        out = bytearray()
+        while len(out) < needed and not self._stopped.is_set():
+            if self._offset >= len(self._current):
+                if not self._pending:
+                    break
+                self._current = self._pending.popleft()
+                self._offset = 0
+            take = min(needed - len(out), len(self._current) - self._offset)
+            out += self._current[self._offset:self._offset + take]
+            self._offset += take
+
+        finished = self._stopped.is_set() or (
+            len(out) < needed and self._producer_done.is_set() and not self._pending
+        )
+        if len(out) < needed:
+            if not finished:
+                # The decoder is behind: fill with silence rather than block the device
+                self.underruns += 1
+            out += bytes(needed - len(out))
+        if finished:
+            self._done.set()
+            return bytes(out), pyaudio.paComplete
+        return bytes(out), pyaudio.paContinue
+
+    def play(self, blocks: Iterable[np.ndarray], sample_rate: int, interrupted: threading.Event) -> bool:
+        """Play int16 blocks as they are produced; return False if interrupted"""
+        self._pending.clear()
+        self._current = b""
+        self._offset = 0
+        self._queued_frames = 0
+        self._producer_done.clear()
+        self._done.clear()
+        self._stopped.clear()
+
+        stream = None
+        try:
+            for block in blocks:
+                if interrupted.is_set():
+                    break
+                if len(block) == 0:
+                    continue
+                self._pending.append(np.ascontiguousarray(block, dtype=np.int16).tobytes())
+                self._queued_frames += len(block)
+                if stream is None:
+                    stream = self.audio.open(
+                        format=pyaudio.paInt16,
+                        channels=1,
+                        rate=sample_rate,
+                        output=True,
+                        frames_per_buffer=self.block_frames,
+                        stream_callback=self._callback
+                    )
+            self._producer_done.set()
+
+            if stream is not None:
+                # Woken by the callback; the timeout only guards against a dead device
+                self._done.wait(timeout=self._queued_frames / sample_rate + 5.0)
+                # Returns once the buffers already handed to the device have been played
+                stream.stop_stream()
+        finally:
+            close = getattr(blocks, "close", None)
+            if close is not None:
+                close()
+            if stream is not None:
+                stream.close()
+        return not interrupted.is_set()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def cleanup(self) -> None:
+        self.audio.terminate()
@@ -0,0 +1,67 @@
+# providers/tts/remote_provider.py
+import threading
+from time import perf_counter
+from typing import Callable, Optional
+import numpy as np
+from ..base import StreamingTTSProvider, TTSProvider
+
+class RemoteTTS(TTSProvider):
+    """Speaks through a remote client instead of a sound card.
+
+    PCM comes from a StreamingTTSProvider that may be shared by many sessions and is
+    handed to `send_audio` block by block. Sending is paced to stay at most
+    `lead_seconds` ahead of the client's playback, and speak() returns when the client
+    has finished playing, so barge-in and backpressure behave as with local playback.
+    """
+
+    def __init__(self,
+                 synthesizer: StreamingTTSProvider,
+                 send_audio: Callable[[np.ndarray], None],
+                 on_speech: Optional[Callable[[int], None]] = None,
+                 on_stop: Optional[Callable[[], None]] = None,
+                 lead_seconds: float = 0.5):
+        self.synthesizer = synthesizer
+        self.send_audio = send_audio
+        self.on_speech = on_speech
+        self.on_stop = on_stop
+        self.lead_seconds = lead_seconds
+        self._interrupted = threading.Event()
+
+    def speak(self, text: str, language: str) -> None:
+        self._interrupted.clear()
+        sample_rate = self.synthesizer.output_sample_rate(language)
+        blocks = self.synthesizer.synthesize_stream(text, language)
+        sent = 0
+        start: Optional[float] = None
+        try:
+            for block in blocks:
+                if self._interrupted.is_set():
+                    return
+                if start is None:
+                    start = perf_counter()
+                    if self.on_speech is not None:
+                        self.on_speech(sample_rate)
+                self.send_audio(block)
+                sent += len(block)
+                ahead = sent / sample_rate - (perf_counter() - start) - self.lead_seconds
+                if ahead > 0 and self._interrupted.wait(ahead):
+                    return
+            if start is not None:
+                remaining = sent / sample_rate - (perf_counter() - start)
+                if remaining > 0:
+                    self._interrupted.wait(remaining)
+        finally:
+            close = getattr(blocks, "close", None)
+            if close is not None:
+                close()
+
+    def prewarm(self, texts: list[str], language: str) -> None:
+        self.synthesizer.prewarm(texts, language)
+
+    def stop(self) -> None:
+        self._interrupted.set()
+        if self.on_stop is not None:
+            self.on_stop()
+
+    def cleanup(self) -> None:
+        pass  # The synthesizer belongs to the server
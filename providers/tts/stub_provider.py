@@ -0,0 +1,47 @@
+# providers/tts/stub_provider.py
+import threading
+from time import sleep
+from typing import Iterator
+import numpy as np
+from ..base import StreamingTTSProvider
+
+class StubTTS(StreamingTTSProvider):
+    """Silent TTS for offline replay: waits for a synthesis delay, then "plays" for a
+    duration proportional to the text length"""
+
+    def __init__(self,
+                 synthesis_delay: float = 0.1,
+                 seconds_per_char: float = 0.06,
+                 sample_rate: int = 16000,
+                 block_frames: int = 1024):
+        self.synthesis_delay = synthesis_delay
+        self.seconds_per_char = seconds_per_char
+        self.sample_rate = sample_rate
+        self.block_frames = block_frames
+        self.spoken: list[tuple[str, str]] = []
+        self._interrupted = threading.Event()
+
+    def output_sample_rate(self, language: str) -> int:
+        return self.sample_rate
+
+    def synthesize_stream(self, text: str, language: str) -> Iterator[np.ndarray]:
+        """Silence as long as the text would take to speak"""
+        sleep(self.synthesis_delay)
+        remaining = int(len(text) * self.seconds_per_char * self.sample_rate)
+        while remaining > 0:
+            frames = min(self.block_frames, remaining)
+            yield np.zeros(frames, dtype=np.int16)
+            remaining -= frames
+
+    def speak(self, text: str, language: str) -> None:
+        self._interrupted.clear()
+        sleep(self.synthesis_delay)
+        self.spoken.append((text, language))
+        # Playback ends early on stop()
+        self._interrupted.wait(len(text) * self.seconds_per_char)
+
+    def stop(self) -> None:
+        self._interrupted.set()
+
+    def cleanup(self) -> None:
+        self.spoken.clear()
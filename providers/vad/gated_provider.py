@@ -0,0 +1,140 @@
+# providers/vad/gated_provider.py
+from typing import Optional
+import numpy as np
+from ..base import VADProvider
+
+def frame_features(chunks: np.ndarray, sample_rate: int,
+                   band: tuple[float, float] = (300.0, 3400.0)) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Level in dBFS, zero-crossing rate and share of energy in the speech band of every
+    row of a (n_chunks, chunk_size) array"""
+    chunks = np.atleast_2d(np.asarray(chunks, dtype=np.float32))
+    power = np.einsum("ij,ij->i", chunks, chunks) / chunks.shape[1]
+    level_db = 10.0 * np.log10(np.maximum(power, 1e-10))
+    signs = np.signbit(chunks)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (chunks.shape[1] - 1)
+    spectrum = np.abs(np.fft.rfft(chunks, axis=1)) ** 2
+    freqs = np.fft.rfftfreq(chunks.shape[1], 1.0 / sample_rate)
+    in_band = (freqs >= band[0]) & (freqs <= band[1])
+    band_ratio = spectrum[:, in_band].sum(axis=1) / np.maximum(spectrum.sum(axis=1), 1e-12)
+    return level_db, zcr, band_ratio
+
+class GatedVAD(VADProvider):
+    """Energy/spectral pre-gate in front of a neural VAD.
+
+    A chunk is scored 0 without running the wrapped VAD when it is clearly silent:
+    below `silence_db`, within half of `margin_db` of the adaptive noise floor, or within
+    `margin_db` of it without a speech-like spectrum (less than `min_band_ratio` of its
+    energy in 300-3400 Hz, or a zero-crossing rate above `max_zcr`, i.e. hiss). Louder
+    or speech-like chunks near the margin are borderline and passed through, and so is
+    everything during the first `calibration_chunks` and for `hangover_chunks` after
+    speech, so onsets and endpointing still see the network.
+
+    The noise floor follows non-speech chunks: down quickly, up slowly.
+    """
+
+    def __init__(self,
+                 vad: VADProvider,
+                 margin_db: float = 9.0,
+                 silence_db: float = -65.0,
+                 min_band_ratio: float = 0.5,
+                 max_zcr: float = 0.35,
+                 hangover_chunks: int = 8,
+                 calibration_chunks: int = 16,
+                 floor_attack: float = 0.3,
+                 floor_release: float = 0.02):
+        self.vad = vad
+        self.margin_db = margin_db
+        self.silence_db = silence_db
+        self.min_band_ratio = min_band_ratio
+        self.max_zcr = max_zcr
+        self.hangover_chunks = hangover_chunks
+        self.calibration_chunks = calibration_chunks
+        self.floor_attack = floor_attack
+        self.floor_release = floor_release
+        self.noise_floor_db: Optional[float] = None
+        self._seen = 0
+        self._hangover = 0
+        self.stats = {"chunks": 0, "skipped": 0}
+
+    @property
+    def threshold(self) -> float:
+        return getattr(self.vad, "threshold", 0.5)
+
+    @property
+    def skip_rate(self) -> float:
+        return self.stats["skipped"] / self.stats["chunks"] if self.stats["chunks"] else 0.0
+
+    def fork(self) -> "GatedVAD":
+        return GatedVAD(
+            self.vad.fork(), self.margin_db, self.silence_db, self.min_band_ratio, self.max_zcr,
+            self.hangover_chunks, self.calibration_chunks, self.floor_attack, self.floor_release
+        )
+
+    def _looks_silent(self, level_db: float, zcr: float, band_ratio: float) -> bool:
+        """Features only"""
+        if level_db < self.silence_db or level_db < self.noise_floor_db + self.margin_db / 2:
+            return True
+        speech_like = band_ratio >= self.min_band_ratio and zcr <= self.max_zcr
+        return level_db < self.noise_floor_db + self.margin_db and not speech_like
+
+    def _skip(self, level_db: float, zcr: float, band_ratio: float) -> bool:
+        if self._seen < self.calibration_chunks or self._hangover > 0 or self.noise_floor_db is None:
+            return False
+        return self._looks_silent(level_db, zcr, band_ratio)
+
+    def _track_floor(self, level_db: float) -> None:
+        """Called for every non-speech chunk"""
+        if self.noise_floor_db is None:
+            self.noise_floor_db = level_db
+        else:
+            rate = self.floor_attack if level_db < self.noise_floor_db else self.floor_release
+            self.noise_floor_db += rate * (level_db - self.noise_floor_db)
+
+    def speech_probs(self, chunks: np.ndarray, sample_rate: int) -> np.ndarray:
+        chunks = np.atleast_2d(np.asarray(chunks, dtype=np.float32))
+        levels, zcrs, band_ratios = frame_features(chunks, sample_rate)
+        probs = np.zeros(len(chunks), dtype=np.float32)
+        threshold = self.threshold
+        i = 0
+        while i < len(chunks):
+            self._seen += 1
+            if self._skip(levels[i], zcrs[i], band_ratios[i]):
+                self.stats["skipped"] += 1
+                self._track_floor(float(levels[i]))
+                i += 1
+                continue
+
+            # Everything up to the next chunk that looks silent goes to the network in
+            # one call; the hangover is then decided on its output
+            if self._seen <= self.calibration_chunks or self.noise_floor_db is None:
+                # No floor yet: only up to the end of the calibration
+                end = min(i + max(self.calibration_chunks - self._seen + 1, 1), len(chunks))
+            else:
+                end = i + 1
+                while end < len(chunks) and not self._looks_silent(levels[end], zcrs[end], band_ratios[end]):
+                    end += 1
+            self._seen += end - i - 1
+            probs[i:end] = self.vad.speech_probs(chunks[i:end], sample_rate)
+            for level, prob in zip(levels[i:end], probs[i:end]):
+                if prob > threshold:
+                    self._hangover = self.hangover_chunks
+                else:
+                    self._hangover = max(self._hangover - 1, 0)
+                    self._track_floor(float(level))
+            i = end
+        self.stats["chunks"] += len(chunks)
+        return probs
+
+    def is_speech(self, audio_chunk: np.ndarray, sample_rate: int) -> bool:
+        return bool(self.speech_probs(audio_chunk, sample_rate)[0] > self.threshold)
+
+    def reset_states(self) -> None:
+        # The noise floor belongs to the room, not to the stream: it is kept
+        self.vad.reset_states()
+        self._hangover = 0
+
+    def warmup(self) -> None:
+        self.vad.warmup()
+
+    def cleanup(self) -> None:
+        self.vad.cleanup()
@@ -0,0 +1,103 @@
+# providers/vad/process_provider.py
+import copy
+import functools
+import itertools
+from typing import Callable, Optional
+import numpy as np
+from core.metrics import Metrics
+from core.process_stage import StageBudget, StageWorker
+from ..base import VADProvider
+
+class _VADStreams:
+    """Worker side: the VAD and one fork of it per stream, created on first use"""
+
+    def __init__(self, builder: Callable[[], VADProvider]):
+        self.vad = builder()
+        self.streams: dict[int, VADProvider] = {0: self.vad}
+
+    def _stream(self, stream: int) -> VADProvider:
+        if stream not in self.streams:
+            self.streams[stream] = self.vad.fork()
+        return self.streams[stream]
+
+    def threshold(self) -> float:
+        return getattr(self.vad, "threshold", 0.5)
+
+    def speech_probs(self, stream: int, chunks: np.ndarray, sample_rate: int) -> np.ndarray:
+        return self._stream(stream).speech_probs(chunks, sample_rate)
+
+    def reset_states(self, stream: int) -> None:
+        self._stream(stream).reset_states()
+
+    def warmup(self) -> None:
+        self.vad.warmup()
+
+    def drop(self, stream: int) -> None:
+        self.streams.pop(stream, None)
+
+class ProcessVAD(VADProvider):
+    """A VAD running in its own worker process (see core/process_stage.py).
+
+    `builder` creates the VAD in the worker, with `budget` applied there; chunks reach
+    it through shared memory. fork() doesn't start another process: the worker keeps a
+    fork of the VAD, with its own recurrent state, for every stream. If the worker
+    crashes, it is restarted with fresh state and the chunks it was scoring count as
+    silence. Put a GatedVAD in front of it, so clearly silent chunks never leave the
+    capture process.
+    """
+
+    def __init__(self,
+                 builder: Callable[[], VADProvider],
+                 budget: StageBudget = StageBudget(threads=1),
+                 sample_rate: int = 16000,
+                 buffer_seconds: float = 300.0,
+                 call_timeout: Optional[float] = 10.0,
+                 metrics: Optional[Metrics] = None):
+        print("Starting the VAD worker process...")
+        self.worker = StageWorker(
+            "vad",
+            functools.partial(_VADStreams, builder),
+            budget,
+            buffer_samples=int(buffer_seconds * sample_rate),
+            call_timeout=call_timeout,
+            metrics=metrics
+        )
+        self.threshold = self.worker.call("threshold")
+        self._stream = 0
+        self._stream_ids = itertools.count(1)
+
+    def fork(self) -> "ProcessVAD":
+        """Same worker, new stream"""
+        vad = copy.copy(self)
+        vad._stream = next(self._stream_ids)
+        return vad
+
+    def is_speech(self, audio_chunk: np.ndarray, sample_rate: int) -> bool:
+        return bool(self.speech_probs(audio_chunk, sample_rate)[0] > self.threshold)
+
+    def speech_probs(self, chunks: np.ndarray, sample_rate: int) -> np.ndarray:
+        chunks = np.atleast_2d(chunks)
+        try:
+            return self.worker.call("speech_probs", self._stream, chunks, sample_rate)
+        except Exception as e:
+            print(f"Error scoring audio: {e}")
+            return np.zeros(len(chunks), dtype=np.float32)
+
+    def reset_states(self) -> None:
+        try:
+            self.worker.call("reset_states", self._stream)
+        except Exception as e:
+            print(f"Error resetting VAD state: {e}")
+
+    def warmup(self) -> None:
+        self.worker.call("warmup")
+
+    def cleanup(self) -> None:
+        """A fork only drops its stream; the original stops the worker"""
+        if self._stream:
+            try:
+                self.worker.call("drop", self._stream)
+            except Exception as e:
+                print(f"Error dropping VAD stream: {e}")
+        else:
+            self.worker.close()
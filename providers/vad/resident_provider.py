@@ -0,0 +1,55 @@
+# providers/vad/resident_provider.py
+import itertools
+from typing import Callable
+import numpy as np
+from core.residency import ModelResidencyManager
+from ..base import VADProvider
+
+class ResidentVAD(VADProvider):
+    """A VAD whose model a ModelResidencyManager may unload when it is idle or over
+    budget; the next call reloads it with `builder`, with fresh recurrent state. The
+    reload runs on the caller's thread, the capture loop at a speech onset, so the VAD
+    is usually registered pinned. A fork is registered as "<name>/<n>" and built with
+    the loaded model's fork(), so it unloads on its own and shares whatever the model's
+    fork() shares."""
+
+    def __init__(self,
+                 manager: ModelResidencyManager,
+                 name: str,
+                 builder: Callable[[], VADProvider],
+                 pinned: bool = False):
+        self.manager = manager
+        self.name = name
+        self.pinned = pinned
+        self._fork_ids = itertools.count(1)
+        manager.register(name, builder, pinned)
+        with manager.use(name) as vad:
+            self.threshold = getattr(vad, "threshold", 0.5)
+
+    def _fork_model(self) -> VADProvider:
+        with self.manager.use(self.name) as vad:
+            return vad.fork()
+
+    def fork(self) -> "ResidentVAD":
+        return ResidentVAD(self.manager, f"{self.name}/{next(self._fork_ids)}", self._fork_model, self.pinned)
+
+    def is_speech(self, audio_chunk: np.ndarray, sample_rate: int) -> bool:
+        return bool(self.speech_probs(audio_chunk, sample_rate)[0] > self.threshold)
+
+    def speech_probs(self, chunks: np.ndarray, sample_rate: int) -> np.ndarray:
+        with self.manager.use(self.name) as vad:
+            return vad.speech_probs(chunks, sample_rate)
+
+    def reset_states(self) -> None:
+        # An unloaded model comes back with fresh state: don't reload it just for this
+        if self.manager.is_loaded(self.name):
+            with self.manager.use(self.name) as vad:
+                vad.reset_states()
+
+    def warmup(self) -> None:
+        with self.manager.use(self.name) as vad:
+            vad.warmup()
+
+    def cleanup(self) -> None:
+        """Unloads the model and forgets it"""
+        self.manager.unregister(self.name)
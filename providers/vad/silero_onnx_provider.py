@@ -0,0 +1,89 @@
+# providers/vad/silero_onnx_provider.py
+import copy
+import os
+import urllib.request
+import numpy as np
+import onnxruntime as ort
+from typing import Optional
+from ..base import VADProvider
+
+SILERO_ONNX_URL = "https://github.com/snakers4/silero-vad/raw/master/src/silero_vad/data/silero_vad.onnx"
+DEFAULT_MODEL_PATH = os.path.join(os.path.expanduser("~"), ".cache", "silero-vad", "silero_vad.onnx")
+
+class SileroOnnxVAD(VADProvider):
+    """Silero VAD on ONNX Runtime (CPU), without loading torch.
+
+    The recurrent state and the audio context that Silero v5 prepends to every chunk are
+    kept explicitly in numpy arrays and carried across calls.
+    """
+
+    def __init__(self,
+                 model_path: Optional[str] = None,
+                 threshold: float = 0.5,
+                 intra_op_threads: int = 1,
+                 inter_op_threads: int = 1):
+        print("Initializing Silero VAD (ONNX Runtime)...")
+        self.threshold = threshold
+        model_path = model_path or DEFAULT_MODEL_PATH
+        if not os.path.exists(model_path):
+            os.makedirs(os.path.dirname(model_path), exist_ok=True)
+            urllib.request.urlretrieve(SILERO_ONNX_URL, model_path)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+
+        self._sample_rate = 0
+        self._input = np.zeros((1, 0), dtype=np.float32)
+        self.reset_states()
+
+    def reset_states(self) -> None:
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._input[:] = 0.0
+
+    def _prepare(self, sample_rate: int, chunk_size: int) -> None:
+        """(Re)allocate the input buffer: [context | chunk]"""
+        if sample_rate not in (8000, 16000):
+            raise ValueError(f"Silero VAD supports 8000 and 16000 Hz, got {sample_rate}")
+        self._context_size = 64 if sample_rate == 16000 else 32
+        if sample_rate != self._sample_rate or self._input.shape[1] != self._context_size + chunk_size:
+            self._sample_rate = sample_rate
+            self._sr = np.array(sample_rate, dtype=np.int64)
+            self._input = np.zeros((1, self._context_size + chunk_size), dtype=np.float32)
+            self._state = np.zeros((2, 1, 128), dtype=np.float32)
+
+    def fork(self) -> "SileroOnnxVAD":
+        """Share the InferenceSession (run() is thread-safe) with fresh stream state"""
+        vad = copy.copy(self)
+        vad._input = np.zeros_like(self._input)
+        vad.reset_states()
+        return vad
+
+    def is_speech(self, audio_chunk: np.ndarray, sample_rate: int) -> bool:
+        return bool(self.speech_probs(audio_chunk, sample_rate)[0] > self.threshold)
+
+    def speech_probs(self, chunks: np.ndarray, sample_rate: int) -> np.ndarray:
+        chunks = np.atleast_2d(chunks)
+        self._prepare(sample_rate, chunks.shape[1])
+        probs = np.empty(len(chunks), dtype=np.float32)
+        context = self._context_size
+        for i, chunk in enumerate(chunks):
+            self._input[0, context:] = chunk
+            out, self._state = self.session.run(
+                None,
+                {"input": self._input, "state": self._state, "sr": self._sr}
+            )
+            probs[i] = out[0, 0]
+            # The tail of this chunk is the context of the next one
+            self._input[0, :context] = self._input[0, -context:]
+        return probs
+
+    def cleanup(self) -> None:
+        pass  # The session is released with the provider
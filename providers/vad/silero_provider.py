@@ -1,19 +1,28 @@
+import os
 import torch
 import numpy as np
-from typing import Union, Any, cast
+from typing import Union, Any, Optional, cast
 from torch import nn
 from ..base import VADProvider
 
+SILERO_REPO = "snakers4/silero-vad"
+
+def _load_model(hub_dir: Optional[str]) -> Any:
+    """Load from the torch hub cache when the repo is there, so no network is needed;
+    download it only the first time"""
+    if hub_dir is not None:
+        torch.hub.set_dir(hub_dir)
+    local_repo = os.path.join(torch.hub.get_dir(), SILERO_REPO.replace("/", "_") + "_master")
+    if os.path.isdir(local_repo):
+        return torch.hub.load(repo_or_dir=local_repo, model="silero_vad", source="local")
+    return torch.hub.load(repo_or_dir=SILERO_REPO, model="silero_vad", trust_repo=True)
+
 class SileroVAD(VADProvider):
-    def __init__(self):
+    def __init__(self, threshold: float = 0.5, hub_dir: Optional[str] = None):
         print("Initializing Silero VAD...")
+        self.threshold = threshold
         # Usiamo Any per il valore restituito da torch.hub.load e poi facciamo il cast
-        vad_model: Any = torch.hub.load(
-            repo_or_dir="snakers4/silero-vad",
-            model="silero_vad",
-            force_reload=True,
-            trust_repo=True
-        )
+        vad_model: Any = _load_model(hub_dir)
 
         self.model: nn.Module
         # Verifichiamo il tipo e facciamo il cast appropriato
@@ -26,11 +35,28 @@ class SileroVAD(VADProvider):
         self.model.eval()
 
     def is_speech(self, audio_chunk: np.ndarray, sample_rate: int) -> bool:
-        with torch.no_grad():
-            # Crea una copia writeable dell'array
-            audio_data = np.array(audio_chunk, dtype=np.float32, copy=True)
-            tensor = torch.FloatTensor(audio_data)
-            return self.model(tensor, sample_rate).item() > 0.5
+        return bool(self.speech_probs(audio_chunk, sample_rate)[0] > self.threshold)
+
+    def speech_probs(self, chunks: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Score consecutive chunks in one call.
+
+        The recurrent state lives in the JIT model and carries over between calls, so
+        frames must be passed in order; call reset_states() between unrelated streams.
+        """
+        chunks = np.atleast_2d(np.asarray(chunks, dtype=np.float32))
+        if not chunks.flags.writeable:
+            # torch.from_numpy warns on read-only arrays (np.frombuffer capture buffers)
+            chunks = chunks.copy()
+        probs = np.empty(len(chunks), dtype=np.float32)
+        with torch.inference_mode():
+            # Zero-copy view of the whole batch; each row is one recurrent step
+            tensor = torch.from_numpy(chunks)
+            for i in range(len(chunks)):
+                probs[i] = self.model(tensor[i], sample_rate).item()
+        return probs
+
+    def reset_states(self) -> None:
+        self.model.reset_states()
 
     def cleanup(self) -> None:
         pass  # Nothing to cleanup for Silero VAD
@@ -0,0 +1,222 @@
+from time import perf_counter
+START = perf_counter()
+
+import argparse
+import asyncio
+import functools
+
+from config.whisper_config import WHISPER_BACKENDS, WhisperConfig
+from core.assistant import LogLevel
+from core.metrics import Metrics, MetricsExporter
+from core.process_stage import StageBudget, apply_budget
+from core.residency import ModelResidencyManager
+from core.server import AssistantServer, SharedModels
+from core.startup import load_parallel
+from providers.filter.speech_filter import SpeechFilter
+
+def cpu_list(value: str) -> tuple[int, ...]:
+    return tuple(int(cpu) for cpu in value.split(",") if cpu)
+
+def build_local_vad(args: argparse.Namespace):
+    if args.vad == "onnx":
+        from providers.vad.silero_onnx_provider import SileroOnnxVAD
+        return SileroOnnxVAD()
+    from providers.vad.silero_provider import SileroVAD
+    return SileroVAD()
+
+def build_vad(args: argparse.Namespace, metrics: Metrics, residency: ModelResidencyManager):
+    if args.multiprocess:
+        from providers.vad.process_provider import ProcessVAD
+        vad = ProcessVAD(
+            functools.partial(build_local_vad, args),
+            StageBudget(cpus=args.vad_cpus, threads=1),
+            metrics=metrics
+        )
+    else:
+        from providers.vad.resident_provider import ResidentVAD
+        # Pinned unless asked: a reload would run on a session's capture loop at a speech onset
+        vad = ResidentVAD(
+            residency, "vad", functools.partial(build_local_vad, args), pinned=not args.unpin_vad
+        )
+    if args.vad_gate:
+        from providers.vad.gated_provider import GatedVAD
+        return GatedVAD(vad)
+    return vad
+
+def build_transcriber(args: argparse.Namespace, metrics: Metrics, residency: ModelResidencyManager):
+    from providers.transcription.backends import create_whisper
+    config = WhisperConfig(
+        backend=args.whisper_backend,
+        model_size=args.whisper_model,
+        device=args.device,
+        compute_type=args.compute_type,
+        intra_op_threads=args.intra_op_threads,
+        inter_op_threads=args.inter_op_threads,
+        language=args.language
+    )
+    if args.multiprocess:
+        from providers.transcription.process_provider import ProcessTranscriber
+        transcriber = ProcessTranscriber(
+            functools.partial(create_whisper, config),
+            StageBudget(cpus=args.whisper_cpus, threads=args.intra_op_threads),
+            # A batch of full-length utterances; shared memory pages are only touched when used
+            buffer_seconds=(args.max_utterance_seconds + 1) * max(args.batch_size, 1),
+            metrics=metrics
+        )
+    else:
+        from providers.transcription.resident_provider import ResidentTranscriber
+        transcriber = ResidentTranscriber(
+            residency, "whisper", functools.partial(create_whisper, config), pinned=args.pin_whisper
+        )
+    # CTranslate2 decodes concurrent callers in parallel (--inter-op-threads) instead
+    if args.batch_size > 1 and not args.streaming_transcription and args.whisper_backend != "ctranslate2":
+        # Utterances that end together in different sessions share one forward pass
+        from core.batching import BatchingTranscriber
+        return BatchingTranscriber(
+            transcriber,
+            max_batch_size=args.batch_size,
+            max_wait_ms=args.batch_wait_ms,
+            metrics=metrics
+        )
+    return transcriber
+
+def build_llm(args: argparse.Namespace, metrics: Metrics):
+    if args.llm == "stub":
+        from providers.llm.stub_provider import StubLLM
+        llm = StubLLM()
+    else:
+        from providers.llm.ollama_provider import OllamaLLM
+        llm = OllamaLLM()
+    if args.llm_cache:
+        from providers.llm.cached_provider import CachedLLM, ResponseCache, ollama_embedder
+        # One cache for every session: users ask the same short things
+        embed = ollama_embedder(args.llm_cache_embeddings) if args.llm_cache_embeddings else None
+        llm = CachedLLM(llm, ResponseCache(embed=embed, metrics=metrics))
+    return llm
+
+def build_tts(args: argparse.Namespace):
+    if args.tts == "stub":
+        from providers.tts.stub_provider import StubTTS
+        return StubTTS()
+    from providers.tts.google_provider import GoogleTTS
+    return GoogleTTS()
+
+def load_models(args: argparse.Namespace, metrics: Metrics, residency: ModelResidencyManager) -> SharedModels:
+    """Load and warm up every model once, in parallel; sessions share them"""
+    models = load_parallel({
+        "vad": lambda: build_vad(args, metrics, residency),
+        "whisper": lambda: build_transcriber(args, metrics, residency),
+        "llm": lambda: build_llm(args, metrics),
+        "tts": lambda: build_tts(args),
+    }, metrics)
+    return SharedModels(
+        vad=models["vad"],
+        transcriber=models["whisper"],
+        llm=models["llm"],
+        text_filter=SpeechFilter(),
+        tts=models["tts"]
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Voice assistant server for concurrent sessions")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-sessions", type=int, default=8)
+    parser.add_argument("--language", default="en",
+                        help="Whisper transcription language, or auto to detect it for every utterance")
+    parser.add_argument("--device", default="auto", help="cpu, cuda, mps or auto")
+    parser.add_argument("--whisper-backend", choices=WHISPER_BACKENDS, default="torch")
+    parser.add_argument("--whisper-model", default="base", help="Whisper model size")
+    parser.add_argument("--compute-type", default="default",
+                        help="float16 for the torch backend on GPU; int8, int8_float32, float32 ... for ctranslate2")
+    parser.add_argument("--intra-op-threads", type=int, default=0, help="threads per decode, 0 for the default")
+    parser.add_argument("--inter-op-threads", type=int, default=0,
+                        help="torch inter-op threads, or parallel decodes for ctranslate2")
+    parser.add_argument("--vad", choices=["torch", "onnx"], default="onnx")
+    parser.add_argument("--vad-gate", action="store_true",
+                        help="skip the neural VAD on chunks that are clearly silent")
+    parser.add_argument("--llm", choices=["ollama", "stub"], default="ollama")
+    parser.add_argument("--llm-cache", action="store_true", help="answer repeated queries from a cache")
+    parser.add_argument("--llm-cache-embeddings", metavar="MODEL",
+                        help="also match similar queries with this Ollama embedding model")
+    parser.add_argument("--tts", choices=["gtts", "stub"], default="gtts")
+    parser.add_argument("--streaming-transcription", action="store_true",
+                        help="transcribe while users speak (disables batching)")
+    parser.add_argument("--speculative", action="store_true",
+                        help="start transcribing on short pauses, before the endpoint")
+    parser.add_argument("--speculative-llm", action="store_true",
+                        help="with --speculative, also start the LLM reply on short pauses")
+    parser.add_argument("--barge-in", action="store_true",
+                        help="let users interrupt replies (clients with headphones or echo cancellation)")
+    parser.add_argument("--long-form", action="store_true",
+                        help="split utterances longer than one Whisper window at pauses")
+    parser.add_argument("--max-utterance-seconds", type=float, default=30.0)
+    parser.add_argument("--multiprocess", action="store_true",
+                        help="run the VAD and Whisper in worker processes, with audio in shared memory")
+    parser.add_argument("--vad-cpus", type=cpu_list, default=(), help="cores of the VAD worker, e.g. 1")
+    parser.add_argument("--whisper-cpus", type=cpu_list, default=(), help="cores of the Whisper worker, e.g. 2,3,4,5")
+    parser.add_argument("--server-cpus", type=cpu_list, default=(), help="cores of the sessions and event loop")
+    parser.add_argument("--batch-size", type=int, default=8, help="max utterances per Whisper batch, 1 to disable")
+    parser.add_argument("--batch-wait-ms", type=float, default=50.0, help="max time an utterance waits for a batch")
+    parser.add_argument("--memory-budget-mb", type=float, default=0,
+                        help="unload the least recently used models above this size, 0 for no budget")
+    parser.add_argument("--idle-unload-seconds", type=float, default=0,
+                        help="unload a model unused for this long, 0 to keep it loaded (not with --multiprocess)")
+    parser.add_argument("--pin-after-uses", type=int, default=20,
+                        help="keep loaded a model used this many times within --idle-unload-seconds")
+    parser.add_argument("--pin-whisper", action="store_true", help="never unload Whisper")
+    parser.add_argument("--unpin-vad", action="store_true",
+                        help="let the VAD be unloaded too; its reload delays the next speech onset")
+    args = parser.parse_args()
+
+    metrics = Metrics()
+    exporter = MetricsExporter(
+        metrics,
+        jsonl_path="voice_assistant_metrics.jsonl",
+        prometheus_path="voice_assistant_metrics.prom"
+    )
+    residency = ModelResidencyManager(
+        budget_mb=args.memory_budget_mb,
+        idle_seconds=args.idle_unload_seconds,
+        pin_after_uses=args.pin_after_uses,
+        metrics=metrics
+    )
+    models = load_models(args, metrics, residency)
+    # After the workers started: they would inherit these cores
+    apply_budget(StageBudget(cpus=args.server_cpus))
+    server = AssistantServer(
+        models,
+        host=args.host,
+        port=args.port,
+        max_sessions=args.max_sessions,
+        streaming_transcription=args.streaming_transcription,
+        speculative=args.speculative,
+        speculative_llm=args.speculative_llm,
+        barge_in=args.barge_in,
+        long_form=args.long_form,
+        # Sessions are transcribed in Whisper's language
+        language="en" if args.language == "auto" else args.language,
+        detect_language=args.language == "auto",
+        max_utterance_seconds=args.max_utterance_seconds,
+        log_level=LogLevel.INFO,
+        metrics=metrics
+    )
+
+    time_to_ready = perf_counter() - START
+    metrics.record_ready(time_to_ready)
+    print(f"Ready in {time_to_ready:.1f}s")
+
+    exporter.start()
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        exporter.stop()
+        models.transcriber.cleanup()
+        models.vad.cleanup()
+        models.tts.cleanup()
+        residency.close()
+
+if __name__ == "__main__":
+    main()